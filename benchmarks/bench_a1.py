@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Micro-benchmark of the A1 notation helpers of sheetfu.helpers, against the
+    previous implementation (copied below), on the conversions done for every
+    range creation.
+
+    Run from the repository root: python benchmarks/bench_a1.py
+"""
+
+import math
+import os
+import random
+import string
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sheetfu.helpers import (  # noqa: E402
+    convert_a1_to_coordinates, convert_coordinates_to_a1, convert_column_to_letter, convert_letter_to_column,
+    RangeCoordinates)
+
+
+def legacy_convert_coordinates_to_a1(row, column, number_of_row=1, number_of_column=1, sheet_name=None):
+    notation = legacy_convert_column_to_letter(column) + str(row)
+    if number_of_row > 1 or number_of_column > 1:
+        last_column_index = column + number_of_column - 1
+        last_row_index = row + number_of_row - 1
+        last_cell_range = legacy_convert_column_to_letter(last_column_index) + str(last_row_index)
+        notation += ":" + last_cell_range
+    if sheet_name:
+        return sheet_name + "!" + notation
+    return notation
+
+
+def legacy_convert_a1_to_coordinates(a1_string):
+    sheet_name = None
+    if '!' in a1_string:
+        sheet_name, a1_string = a1_string.split('!')
+    first_cell = a1_string.split(':')[0]
+    column, row = legacy_split_letters_numbers(first_cell)
+    number_of_rows = 1
+    number_of_columns = 1
+    if ":" in a1_string:
+        last_cell = a1_string.split(':')[1]
+        last_column, last_row = legacy_split_letters_numbers(last_cell)
+        number_of_rows = last_row - row + 1
+        number_of_columns = last_column - column + 1
+    return RangeCoordinates(
+        row=row,
+        column=column,
+        number_of_rows=number_of_rows,
+        number_of_columns=number_of_columns,
+        sheet_name=sheet_name
+    )
+
+
+def legacy_split_letters_numbers(a1_fragment):
+    for i, character in enumerate(a1_fragment):
+        if character in '123456789':
+            return legacy_convert_letter_to_column(a1_fragment[0:i]), int(a1_fragment[i:])
+    return a1_fragment
+
+
+def legacy_convert_column_to_letter(column_index):
+    column_index = column_index - 1
+    letters = string.ascii_uppercase
+    if column_index < len(letters):
+        return letters[column_index]
+    first_letter_index = column_index / len(letters) - 1
+    second_letter_index = column_index % len(letters)
+    return letters[int(first_letter_index)] + letters[int(second_letter_index)]
+
+
+def legacy_convert_letter_to_column(letters_string):
+    if len(letters_string) == 1:
+        return string.ascii_uppercase.index(letters_string.capitalize()) + 1
+    column_number = 0
+    for i, letter in enumerate(letters_string):
+        letter_index = string.ascii_uppercase.index(letter.capitalize()) + 1
+        power = len(letters_string) - (i + 1)
+        column_number += letter_index * math.pow(len(string.ascii_uppercase), power)
+    return int(column_number)
+
+
+def make_workload(size=10000, seed=0):
+    """
+    :return: List of (row, column, number of rows, number of columns) tuples
+        of ranges within the columns supported by the legacy helpers, a few
+        hundred distinct ranges being used over and over as in table jobs.
+    """
+    generator = random.Random(seed)
+    distinct = [
+        (generator.randint(1, 5000), generator.randint(1, 650), generator.randint(1, 50), generator.randint(1, 50))
+        for _ in range(500)
+    ]
+    return [generator.choice(distinct) for _ in range(size)]
+
+
+def bench(label, function, repeat=5, number=1):
+    best = min(timeit.repeat(function, repeat=repeat, number=number))
+    print("{:<48} {:>9.2f} ms".format(label, best * 1000))
+    return best
+
+
+def main():
+    workload = make_workload()
+    a1_strings = [convert_coordinates_to_a1(*coordinates, sheet_name='Sheet1') for coordinates in workload]
+    columns = [coordinates[1] for coordinates in workload]
+    letters = [convert_column_to_letter(column) for column in columns]
+
+    # both implementations must agree on the workload
+    for coordinates, a1_string in zip(workload, a1_strings):
+        assert legacy_convert_coordinates_to_a1(*coordinates, sheet_name='Sheet1') == a1_string
+        assert legacy_convert_a1_to_coordinates(a1_string) == convert_a1_to_coordinates(a1_string)
+
+    print("{} conversions per run, best of 5 runs".format(len(workload)))
+    results = [
+        (
+            "column -> letters",
+            bench("legacy column -> letters", lambda: [legacy_convert_column_to_letter(c) for c in columns]),
+            bench("column -> letters", lambda: [convert_column_to_letter(c) for c in columns]),
+        ),
+        (
+            "letters -> column",
+            bench("legacy letters -> column", lambda: [legacy_convert_letter_to_column(l) for l in letters]),
+            bench("letters -> column", lambda: [convert_letter_to_column(l) for l in letters]),
+        ),
+        (
+            "coordinates -> A1",
+            bench("legacy coordinates -> A1",
+                  lambda: [legacy_convert_coordinates_to_a1(*c, sheet_name='Sheet1') for c in workload]),
+            bench("coordinates -> A1", lambda: [convert_coordinates_to_a1(*c, sheet_name='Sheet1') for c in workload]),
+        ),
+    ]
+    legacy_parse_time = bench(
+        "legacy A1 -> coordinates", lambda: [legacy_convert_a1_to_coordinates(a) for a in a1_strings])
+    results.append((
+        "A1 -> coordinates (cached)",
+        legacy_parse_time,
+        bench("A1 -> coordinates (cached)", lambda: [convert_a1_to_coordinates(a) for a in a1_strings]),
+    ))
+    results.append((
+        "A1 -> coordinates (uncached)",
+        legacy_parse_time,
+        bench("A1 -> coordinates (uncached)", lambda: [convert_a1_to_coordinates.__wrapped__(a) for a in a1_strings]),
+    ))
+    print()
+    for label, legacy_time, time in results:
+        print("{:<48} {:>9.1f}x".format("speedup " + label, legacy_time / time))
+
+
+if __name__ == '__main__':
+    main()
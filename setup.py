@@ -40,6 +40,12 @@ setup(
         'dev': [
             'pytest>=3',
             'coverage'
+        ],
+        'async': [
+            'aiohttp>=3'
+        ],
+        'pandas': [
+            'pandas>=1'
         ]
     },
     classifiers=[
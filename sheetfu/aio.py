@@ -0,0 +1,307 @@
+# -*- coding: utf-8 -*-
+
+"""
+    sheetfu.aio
+    ~~~~~~~~~~~
+
+    Implement the asyncio client: the requests of the sheetfu model are sent
+    with an async HTTP transport, so that many sheets can be read and written
+    concurrently from a single thread.
+    :copyright: © 2018 by Social Point Labs.
+    :license: MIT, see LICENSE for more details.
+"""
+
+import asyncio
+import socket
+
+from httplib2 import Response
+from googleapiclient.errors import HttpError
+
+from sheetfu.client import SpreadsheetApp
+from sheetfu.exceptions import BatchCommitError
+from sheetfu.executor import RETRY_STATUSES
+from sheetfu.model import (
+    Spreadsheet, GRID_FIELDS, MAX_BATCH_REQUESTS, MAX_BATCH_PAYLOAD_BYTES, MAX_RANGES_PER_REQUEST,
+    prepare_batches, get_grid_fields_names, get_grid_fields_mask)
+from sheetfu.modules.table import Table
+
+
+class AiohttpTransport:
+    """
+    Async transport sending the requests with an aiohttp client session. The
+    aiohttp package must be installed (pip install sheetfu[async]).
+    """
+
+    def __init__(self, session=None):
+        """
+        :param session: (Optional) aiohttp ClientSession to send the requests
+            with. A session is created on the first request otherwise.
+        """
+        try:
+            import aiohttp
+        except ImportError:
+            raise ImportError(
+                "The aiohttp package is required by the default async transport. "
+                "Install it with: pip install aiohttp"
+            )
+        self.aiohttp = aiohttp
+        self.session = session
+
+    async def request(self, method, uri, headers=None, body=None):
+        """
+        :return: Tuple of the status, headers and content of the response.
+        """
+        if self.session is None:
+            self.session = self.aiohttp.ClientSession()
+        async with self.session.request(method, uri, headers=headers, data=body) as response:
+            content = await response.read()
+            return response.status, dict(response.headers), content
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+
+class AsyncSpreadsheetApp:
+    """
+    Asyncio version of the SpreadsheetApp client. Spreadsheet, Sheet, Range and
+    Table objects are the usual model objects (their methods stay blocking),
+    and the client offers awaitable versions of the methods sending requests.
+    Requests are rate limited and retried like the requests of the blocking
+    client (see RequestExecutor).
+    """
+
+    def __init__(
+            self,
+            path_to_secret=None,
+            http=None,
+            from_env=False,
+            executor=None,
+            transport=None,
+            sleep=asyncio.sleep,
+            cache=None
+    ):
+        """
+        :param path_to_secret: Absolute path where your service to service
+        secret json credentials is located.
+        :param http: Cache requests content (for mocks requests). Only used to
+        build the services.
+        :param from_env: bool to specify if config should be retrieved from ENV
+        variables
+        :param executor: (Optional) RequestExecutor whose rate limits, retries
+        and delays are applied to the requests.
+        :param transport: (Optional) Async transport sending the requests: an
+        object with an awaitable request(method, uri, headers, body) method
+        returning the status, headers and content of the response. Defaults to
+        an AiohttpTransport.
+        :param sleep: Coroutine function waiting for a number of seconds.
+        :param cache: (Optional) RangeCache caching the range reads.
+        """
+        self.client = SpreadsheetApp(
+            path_to_secret=path_to_secret, http=http, from_env=from_env, executor=executor, cache=cache)
+        self.transport = transport if transport is not None else AiohttpTransport()
+        self.sleep = sleep
+
+    async def close(self):
+        close = getattr(self.transport, 'close', None)
+        if close is not None:
+            await close()
+
+    async def execute(self, request, retry_statuses=RETRY_STATUSES):
+        """
+        Send a request with the async transport, retrying it while it fails
+        with a retryable error (see RequestExecutor.get_retry_statuses).
+        :param request: A googleapiclient HttpRequest.
+        :param retry_statuses: HTTP statuses of the errors to retry.
+        :return: The response of the request.
+        :raise HttpError: the error of the last try.
+        """
+        executor = self.client.executor
+        limiter = executor.get_limiter(request)
+        idempotent = executor.is_idempotent(request)
+        retry_statuses = executor.get_retry_statuses(request, retry_statuses)
+        for retry in range(executor.max_retries + 1):
+            if limiter is not None:
+                wait = limiter.reserve()
+                if wait > 0:
+                    await self.sleep(wait)
+            try:
+                return await self.send(request)
+            except HttpError as error:
+                if error.resp.status not in retry_statuses or retry == executor.max_retries:
+                    raise
+                retry_after = error.resp.get('retry-after')
+            except (asyncio.TimeoutError, socket.timeout, ConnectionError):
+                if not idempotent or retry == executor.max_retries:
+                    raise
+                retry_after = None
+            await self.sleep(executor.get_delay(retry, retry_after))
+
+    async def send(self, request):
+        """
+        Send a request once with the async transport.
+        :return: The deserialized response of the request.
+        :raise HttpError: if the response is an error.
+        """
+        headers = dict(request.headers)
+        if self.client.credentials is not None:
+            # refreshing the token is blocking, so it runs in the default executor
+            # get_running_loop is only available from Python 3.7
+            loop = getattr(asyncio, 'get_running_loop', asyncio.get_event_loop)()
+            token_info = await loop.run_in_executor(None, self.client.credentials.get_access_token)
+            headers['authorization'] = 'Bearer ' + token_info.access_token
+        status, response_headers, content = await self.transport.request(
+            request.method, request.uri, headers=headers, body=request.body)
+        response = Response(dict(response_headers, status=status))
+        return request.postproc(response, content)
+
+    async def open_by_id(self, spreadsheet_id):
+        """
+        Open a spreadsheet for a given spreadsheet ID.
+        :param spreadsheet_id.
+        :return: Spreadsheet instance.
+        """
+        request = self.client.sheet_service.spreadsheets().get(
+            spreadsheetId=spreadsheet_id, includeGridData=False
+        )
+        metadata = await self.execute(request)
+        return Spreadsheet(client=self.client, spreadsheet_id=spreadsheet_id, metadata=metadata)
+
+    async def open_by_url(self, url):
+        """
+        Open a spreadsheet for a given url.
+        :param url: The url of the target spreadsheet.
+        :return: Spreadsheet instance.
+        """
+        url = url.replace("https://docs.google.com/spreadsheets/d/", "")
+        return await self.open_by_id(url[0: url.index('/')])
+
+    async def get_data(self, target_range, values=True, notes=False, backgrounds=False, font_colors=False,
+                       formulas=False):
+        """
+        Get multiple dimensions of a Range with a single request (see
+        Range.get_data).
+        :return: Dictionary of 2D matrices keyed by dimension name.
+        """
+        names = get_grid_fields_names(
+            values=values, notes=notes, backgrounds=backgrounds, font_colors=font_colors, formulas=formulas)
+        field_mask = get_grid_fields_mask(names)
+        cell_parsers = {name: GRID_FIELDS[name][2] for name in names}
+        grid_data = target_range.get_cached_grid_data(field_mask)
+        if grid_data is not None:
+            return target_range.parse_grid_data(grid_data, cell_parsers)
+        version = None
+        cache = self.client.cache
+        if cache is not None and cache.revalidate:
+            version = await self.get_version(target_range.sheet.spreadsheet)
+            grid_data = target_range.get_cached_grid_data(field_mask, version)
+            if grid_data is not None:
+                return target_range.parse_grid_data(grid_data, cell_parsers)
+        response = await self.execute(target_range.grid_data_request(field_mask))
+        grid_data = response["sheets"][0]["data"]
+        target_range.cache_grid_data(field_mask, grid_data, version)
+        return target_range.parse_grid_data(grid_data, cell_parsers)
+
+    async def get_version(self, spreadsheet):
+        """
+        :return: The version of the spreadsheet file (see
+            Spreadsheet.get_version), as last checked by the client cache if
+            any.
+        """
+        cache = self.client.cache
+        version = cache.get_version(spreadsheet.id) if cache is not None else None
+        if version is None:
+            response = await self.execute(spreadsheet.version_request())
+            version = response["version"]
+            if cache is not None:
+                cache.set_version(spreadsheet.id, version)
+        return version
+
+    async def get_ranges(self, spreadsheet, ranges, values=True, notes=False, backgrounds=False, font_colors=False,
+                         formulas=False, max_ranges_per_request=MAX_RANGES_PER_REQUEST):
+        """
+        Get multiple dimensions of many ranges of a spreadsheet (see
+        Spreadsheet.get_ranges). The chunks of ranges are requested concurrently.
+        :return: List of the data of every range, in the ranges order.
+        """
+        names = get_grid_fields_names(
+            values=values, notes=notes, backgrounds=backgrounds, font_colors=font_colors, formulas=formulas)
+        chunks = spreadsheet.get_ranges_chunks(ranges, max_ranges_per_request)
+        responses = await asyncio.gather(*[
+            self.execute(spreadsheet.ranges_request(chunk, names)) for chunk in chunks
+        ])
+        data = list()
+        for chunk, response in zip(chunks, responses):
+            data.extend(spreadsheet.parse_ranges_response(chunk, response, names))
+        return data
+
+    async def get_values(self, target_range):
+        """
+        :return: 2D matrix of the values of the range (see Range.get_values).
+        """
+        data = await self.get_data(target_range, values=True)
+        return data["values"]
+
+    async def load_table(self, full_range, notes=False, backgrounds=False, font_colors=False, header_row=1,
+                         columnar=False):
+        """
+        Read a Table with a single request (see Table).
+        :param full_range: Range containing the header row and the items.
+        :return: Table object.
+        """
+        header_range = Table.get_header_range(full_range, header_row)
+        data = await self.get_data(
+            header_range, values=True, notes=notes, backgrounds=backgrounds, font_colors=font_colors)
+        return Table(
+            full_range,
+            notes=notes,
+            backgrounds=backgrounds,
+            font_colors=font_colors,
+            header_row=header_row,
+            columnar=columnar,
+            data=data
+        )
+
+    async def batch_update(self, spreadsheet, requests, max_requests=MAX_BATCH_REQUESTS,
+                           max_payload_bytes=MAX_BATCH_PAYLOAD_BYTES, coalesce=True):
+        """
+        Send batchUpdate requests to a spreadsheet (see Spreadsheet.batch_update).
+        :return: The batchUpdate response, with the replies of every chunk.
+        :raise BatchCommitError: if a chunk fails.
+        """
+        chunks = prepare_batches(
+            requests, max_requests=max_requests, max_payload_bytes=max_payload_bytes, coalesce=coalesce)
+        replies = list()
+        try:
+            for chunk_index, chunk in enumerate(chunks):
+                try:
+                    response = await self.execute(spreadsheet.batch_update_request(chunk))
+                except HttpError as error:
+                    pending_requests = [request for pending in chunks[chunk_index:] for request in pending]
+                    raise BatchCommitError(chunk_index, len(chunks), replies, pending_requests, error)
+                replies.extend(response.get('replies', []))
+        finally:
+            spreadsheet.invalidate_cache(requests)
+        return {'spreadsheetId': spreadsheet.id, 'replies': replies}
+
+    async def commit(self, batched):
+        """
+        Commit the batches of a Spreadsheet or a Table (see Table.commit).
+        :param batched: Spreadsheet or Table object.
+        :return: The batchUpdate response, or None if there was nothing to commit.
+        """
+        if len(batched.batches) == 0:
+            return
+        if isinstance(batched, Spreadsheet):
+            spreadsheet = batched
+        else:
+            spreadsheet = batched.full_range.sheet.spreadsheet
+        try:
+            response = await self.batch_update(spreadsheet, batched.batches)
+        except BatchCommitError as error:
+            # only keep what is left to commit, so that commit can be retried
+            batched.batches = error.pending_requests
+            raise
+        batched.batches = list()
+        return response
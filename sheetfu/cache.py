@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+
+"""
+    sheetfu.cache
+    ~~~~~~~~~~~~~
+
+    Implement the read-through cache of the range reads: the grid data of the
+    ranges is kept for a limited time, and dropped when an overlapping write is
+    sent by the client. Expired reads can be revalidated with the version of
+    the spreadsheet file instead of being downloaded again.
+    :copyright: © 2018 by Social Point Labs.
+    :license: MIT, see LICENSE for more details.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+def get_grid_range_bounds(grid_range):
+    """
+    :param grid_range: GridRange resource (0 based indexes, end indexes
+        excluded). Missing indexes are unbounded.
+    :return: Tuple of the start row, end row, start column and end column.
+    """
+    return (
+        grid_range.get('startRowIndex', 0),
+        grid_range.get('endRowIndex', float('inf')),
+        grid_range.get('startColumnIndex', 0),
+        grid_range.get('endColumnIndex', float('inf')),
+    )
+
+
+def bounds_overlap(bounds, other_bounds):
+    """
+    :return: True if the two grid bounds (see get_grid_range_bounds) share at
+        least one cell.
+    """
+    start_row, end_row, start_column, end_column = bounds
+    other_start_row, other_end_row, other_start_column, other_end_column = other_bounds
+    return (
+        start_row < other_end_row and other_start_row < end_row and
+        start_column < other_end_column and other_start_column < end_column
+    )
+
+
+class RangeCache:
+    """
+    Thread safe cache of the grid data of ranges, keyed by spreadsheet id, A1
+    notation and field mask. Entries expire after a time to live, and the least
+    recently used entries are evicted when the cache is full.
+
+    With revalidate, expired entries are kept along with the version of the
+    spreadsheet file they were read at: if the spreadsheet version did not
+    change (a cheap Drive metadata request, done once per spreadsheet and time
+    to live), they are valid for another time to live.
+    """
+
+    def __init__(self, ttl=60, max_entries=1000, clock=time.monotonic, revalidate=False):
+        """
+        :param ttl: Number of seconds an entry stays valid.
+        :param max_entries: Maximum number of entries of the cache.
+        :param clock: Function returning the current time in seconds.
+        :param revalidate: bool to revalidate the expired entries with the
+            version of their spreadsheet instead of dropping them.
+        """
+        if max_entries <= 0:
+            raise ValueError("The cache must hold at least one entry.")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.revalidate = revalidate
+        self.entries = OrderedDict()
+        self.versions = dict()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key, version=None):
+        """
+        :param key: Tuple of the spreadsheet id, A1 notation and field mask.
+        :param version: (Optional) Current version of the spreadsheet. An
+            expired entry read at that version is valid again.
+        :return: The cached value, or None if missing or expired.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            now = self.clock()
+            if now >= entry['expires']:
+                if version is None or entry['version'] != version:
+                    if not self.revalidate:
+                        del self.entries[key]
+                    return None
+                entry['expires'] = now + self.ttl
+            self.entries.move_to_end(key)
+            return entry['value']
+
+    def get_version(self, spreadsheet_id):
+        """
+        :return: The version of a spreadsheet checked less than a time to live
+            ago, or None.
+        """
+        with self.lock:
+            version = self.versions.get(spreadsheet_id)
+            if version is None or self.clock() >= version[1]:
+                return None
+            return version[0]
+
+    def set_version(self, spreadsheet_id, version):
+        """
+        Save the version of a spreadsheet, checked for a time to live. Entries
+        read at an older version are dropped.
+        :param spreadsheet_id: Id of the spreadsheet.
+        :param version: Version of the spreadsheet file.
+        """
+        with self.lock:
+            self.versions[spreadsheet_id] = (version, self.clock() + self.ttl)
+            for key, entry in list(self.entries.items()):
+                if key[0] == spreadsheet_id and entry['version'] not in (None, version):
+                    del self.entries[key]
+
+    def set(self, key, value, sheet=None, bounds=None, version=None):
+        """
+        Cache a value, evicting the least recently used entry if full.
+        :param key: Tuple of the spreadsheet id, A1 notation and field mask.
+        :param value: The value to cache.
+        :param sheet: (Optional) Sheet object of the range, to invalidate the
+            entry on writes to that sheet only.
+        :param bounds: (Optional) Grid bounds of the range (see
+            get_grid_range_bounds), to invalidate the entry on overlapping
+            writes only.
+        :param version: (Optional) Version of the spreadsheet checked before
+            reading the value, to revalidate the entry once expired.
+        """
+        with self.lock:
+            self.entries[key] = {
+                'value': value,
+                'expires': self.clock() + self.ttl,
+                'sheet': sheet,
+                'bounds': bounds,
+                'version': version,
+            }
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, spreadsheet_id, sheet_id=None, bounds=None):
+        """
+        Drop the entries of a spreadsheet which may overlap a written range.
+        Entries whose sheet id is not known yet are dropped on any write to the
+        spreadsheet.
+        :param spreadsheet_id: Id of the written spreadsheet.
+        :param sheet_id: (Optional) Id of the written sheet. All the sheets of
+            the spreadsheet otherwise.
+        :param bounds: (Optional) Grid bounds of the written range. The whole
+            sheet otherwise.
+        """
+        with self.lock:
+            # the write changes the spreadsheet version
+            self.versions.pop(spreadsheet_id, None)
+            for key, entry in list(self.entries.items()):
+                if key[0] != spreadsheet_id:
+                    continue
+                if sheet_id is not None and entry['sheet'] is not None:
+                    entry_sheet_id = entry['sheet']._sid
+                    if entry_sheet_id is not None and entry_sheet_id != sheet_id:
+                        continue
+                if bounds is not None and entry['bounds'] is not None:
+                    if not bounds_overlap(bounds, entry['bounds']):
+                        continue
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.versions.clear()
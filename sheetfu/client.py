@@ -10,14 +10,23 @@
 """
 
 
-from sheetfu.service import SheetsService, DriveService
+from sheetfu.service import SheetsService, DriveService, HttpPool
 from sheetfu.model import Spreadsheet
-import time
+from sheetfu.executor import RequestExecutor, RETRY_STATUSES
 
 
 class SpreadsheetApp:
 
-    def __init__(self, path_to_secret=None, http=None, from_env=False):
+    def __init__(
+            self,
+            path_to_secret=None,
+            http=None,
+            from_env=False,
+            executor=None,
+            thread_safe=False,
+            cache=None,
+            fast_values=False
+    ):
         """
         Client object which will slightly copy the API from the spreadsheet
         google app script API. This service assumes that you're connecting to
@@ -32,20 +41,71 @@ class SpreadsheetApp:
         :param from_env: bool to specify if config should be retrieved from ENV
         variables
         :param http: Cache requests content (for mocks requests).
-        This client creates 2 services:
+        :param executor: (Optional) RequestExecutor executing every request of
+        the client, with retries and (opt-in) rate limiting. Share one
+        executor between clients using the same credentials, as they share the
+        same quotas.
+        :param thread_safe: bool to share the client between threads. Requests
+        are then sent with one authorized Http object per thread instead of the
+        single Http object of the services.
+        :param cache: (Optional) RangeCache caching the range reads of the
+        client. Cached reads are dropped when the client writes to their cells.
+        :param fast_values: bool to read and write plain values with the values
+        endpoints, whose responses are much smaller than the grid data ones.
+        Dates are then read as serial numbers, and formulas and dates are still
+        written with the grid path.
+        This client uses 2 services:
             - One for spreadsheet manipulation.
             - One for Drive file and folder manipulation (mostly for giving
-            editor/reader accesses to users).
+            editor/reader accesses to users), only built when first used.
+        Only the discovery documents of the services are shared between the
+        clients.
 
         """
-        self.sheet_service = SheetsService(
-            path_to_secret=path_to_secret, from_env=from_env).build(http=http)
-        if not http:        # if not mock
-            self.drive_service = DriveService(
-                path_to_secret=path_to_secret, from_env=from_env).build()
-
+        sheets_service = SheetsService(path_to_secret=path_to_secret, from_env=from_env)
+        self.sheet_service = sheets_service.build(http=http)
+        self.credentials = sheets_service.credentials
+        self.path_to_secret = path_to_secret
+        self.from_env = from_env
+        self.http = http
+        self._drive_service = None
+
+        self.http_pool = None
+        if thread_safe:
+            # the sheets credentials scopes include the drive scope, so the
+            # pool can send the requests of both services.
+            self.http_pool = HttpPool(http_factory=(lambda: http) if http else sheets_service.build_http)
+
+        self.executor = executor if executor is not None else RequestExecutor()
+        self.cache = cache
+        self.fast_values = fast_values
         self.batches = list()
 
+    @property
+    def drive_service(self):
+        """
+        The drive service, built on first use.
+        """
+        if self._drive_service is None:
+            self._drive_service = DriveService(
+                path_to_secret=self.path_to_secret, from_env=self.from_env).build(http=self.http)
+        return self._drive_service
+
+    @drive_service.setter
+    def drive_service(self, drive_service):
+        self._drive_service = drive_service
+
+    def execute(self, request, retry_statuses=RETRY_STATUSES):
+        """
+        Execute a request with the client executor (and the Http object of the
+        current thread in thread safe mode).
+        :param request: A googleapiclient HttpRequest.
+        :param retry_statuses: HTTP statuses of the errors to retry.
+        :return: The response of the request.
+        """
+        http = self.http_pool.get() if self.http_pool is not None else None
+        return self.executor.execute(request, retry_statuses=retry_statuses, http=http)
+
     def create(self, name, editor=None):
         """
         Method to create a spreadsheet from scratch, given a name and an
@@ -58,14 +118,11 @@ class SpreadsheetApp:
         """
         spreadsheet_body = {"properties": {"title": name}}
         request = self.sheet_service.spreadsheets().create(body=spreadsheet_body)
-        response = request.execute()
+        response = self.execute(request)
         if editor is not None:
-            # the sleeping time below is needed to be sure the file is created
-            # and accessible via API (otherwise triggers 500).
-            time.sleep(3)
             self.add_permission(response["spreadsheetId"], editor)
         return Spreadsheet(
-            client=self, spreadsheet_id=response["spreadsheetId"])
+            client=self, spreadsheet_id=response["spreadsheetId"], metadata=response)
 
     def add_permission(self, file_id, default_owner):
         # todo: add multiple user types.
@@ -85,24 +142,31 @@ class SpreadsheetApp:
             body=user_permission,
             fields='id',
         )
-        response = request.execute()
+        # a file just created may not be accessible via API yet (triggers 404
+        # or 500), so those errors are retried with a backoff.
+        response = self.execute(request, retry_statuses=RETRY_STATUSES | {404})
         return response
 
-    def open_by_id(self, spreadsheet_id):
+    def open_by_id(self, spreadsheet_id, metadata=None):
         """
-        Open a spreadsheet for a given spreadsheet ID.
+        Open a spreadsheet for a given spreadsheet ID. No request is sent until
+        the spreadsheet sheets are needed.
         :param spreadsheet_id.
+        :param metadata: (Optional) Cached spreadsheet metadata (see
+        Spreadsheet.metadata), to skip the request of the sheets.
         :return: Spreadsheet instance.
         """
-        return Spreadsheet(client=self, spreadsheet_id=spreadsheet_id)
+        return Spreadsheet(client=self, spreadsheet_id=spreadsheet_id, metadata=metadata)
 
-    def open_by_url(self, url):
+    def open_by_url(self, url, metadata=None):
         """
         Open a spreadsheet for a given url.
         :param url: The url of the target spreadsheet.
+        :param metadata: (Optional) Cached spreadsheet metadata (see
+        Spreadsheet.metadata), to skip the request of the sheets.
         :return: Spreadsheet instance.
         """
         url = url.replace("https://docs.google.com/spreadsheets/d/", "")
         spreadsheet_id = url[0: url.index('/')]
-        return Spreadsheet(client=self, spreadsheet_id=spreadsheet_id)
+        return Spreadsheet(client=self, spreadsheet_id=spreadsheet_id, metadata=metadata)
 
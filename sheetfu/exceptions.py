@@ -23,3 +23,31 @@ class NoDataRangeError(Exception):
 
 class RowOrColumnEqualsZeroError(Exception):
     """Row or Column index starts at 1, not 0"""
+
+
+class BatchCommitError(Exception):
+    """A chunk of a batch update failed. The chunks sent before it were committed."""
+
+    def __init__(self, chunk_index, number_of_chunks, replies, pending_requests, error):
+        """
+        :param chunk_index: Index of the chunk that failed.
+        :param number_of_chunks: Number of chunks the batches were split into.
+        :param replies: Replies of the chunks committed before the failure.
+        :param pending_requests: Requests not committed (the failed chunk and
+            the following ones).
+        :param error: The error raised by the failed chunk.
+        """
+        super(BatchCommitError, self).__init__(
+            "Batch update chunk {} of {} failed ({} requests committed before the failure): {}".format(
+                chunk_index + 1, number_of_chunks, len(replies), error)
+        )
+        self.chunk_index = chunk_index
+        self.number_of_chunks = number_of_chunks
+        self.replies = replies
+        self.pending_requests = pending_requests
+        self.error = error
+
+
+class SnapshotFormatError(Exception):
+    """The file is not a valid table snapshot."""
+    pass
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+
+"""
+    sheetfu.executor
+    ~~~~~~~~~~~~~~~~
+
+    Implement the request executor used for every API call: requests are
+    retried with an exponential backoff when the API returns a rate limit or
+    server error, and can be rate limited to the API quotas.
+    :copyright: © 2018 by Social Point Labs.
+    :license: MIT, see LICENSE for more details.
+"""
+
+import random
+import socket
+import threading
+import time
+
+from googleapiclient.errors import HttpError
+
+
+# Default quotas of the sheets API, in requests per minute per user. Requests
+# are not rate limited unless these (or the quotas of the project) are given to
+# the RequestExecutor.
+READ_REQUESTS_PER_MINUTE = 60
+WRITE_REQUESTS_PER_MINUTE = 60
+
+# HTTP statuses of the errors worth retrying: rate limit and server errors.
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+# A non idempotent request (e.g. creating a spreadsheet or a permission) failing
+# with a server error or a connection error may have been applied, so it is only
+# retried when rate limited: a 429 error means it was not processed.
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'])
+NON_IDEMPOTENT_RETRY_STATUSES = frozenset([429])
+
+# Methods of the API sent as POST requests which only read data: they are read
+# requests, limited and retried as such.
+READ_POST_METHODS = (':getByDataFilter', ':batchGetByDataFilter')
+
+
+class TokenBucket:
+    """
+    Thread safe token bucket: tokens are refilled at a constant rate up to the
+    bucket capacity, and acquiring a token waits until one is available.
+    """
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic, sleep=time.sleep):
+        """
+        :param rate: Number of tokens refilled per second.
+        :param capacity: (Optional) Maximum number of tokens of the bucket,
+            i.e. the size of a burst. Defaults to one minute of tokens.
+        :param clock: Function returning the current time in seconds.
+        :param sleep: Function waiting for a number of seconds.
+        """
+        if rate <= 0:
+            raise ValueError("The token bucket rate must be positive.")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate * 60
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = self.capacity
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def reserve(self, tokens=1):
+        """
+        Take tokens from the bucket without waiting for them. The tokens are
+        reserved even if not available yet, so concurrent callers are served in
+        order.
+        :return: The number of seconds to wait before using the tokens.
+        """
+        with self.lock:
+            now = self.clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= tokens
+            return -self.tokens / self.rate if self.tokens < 0 else 0
+
+    def acquire(self, tokens=1):
+        """
+        Take tokens from the bucket, waiting for them if needed.
+        :return: The number of seconds waited.
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+
+class RequestExecutor:
+    """
+    Execute the API requests: the requests failing with a retryable error are
+    retried with an exponential backoff and jitter, and read (GET) and write
+    requests can be limited by two token buckets tuned to the API quotas.
+    Rate limiting is disabled by default: pass READ_REQUESTS_PER_MINUTE and
+    WRITE_REQUESTS_PER_MINUTE (or the quotas of your project) to enable it.
+    """
+
+    def __init__(
+            self,
+            max_retries=5,
+            base_delay=1.0,
+            max_delay=64.0,
+            read_requests_per_minute=None,
+            write_requests_per_minute=None,
+            clock=time.monotonic,
+            sleep=time.sleep
+    ):
+        """
+        :param max_retries: Maximum number of retries of a request.
+        :param base_delay: Delay in seconds before the first retry, doubled at
+            each retry.
+        :param max_delay: Maximum delay in seconds between two retries.
+        :param read_requests_per_minute: (Optional) Read quota. Defaults to
+            None, which disables the limit.
+        :param write_requests_per_minute: (Optional) Write quota. Defaults to
+            None, which disables the limit.
+        :param clock: Function returning the current time in seconds.
+        :param sleep: Function waiting for a number of seconds.
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.sleep = sleep
+        self.read_limiter = self._make_limiter(read_requests_per_minute, clock, sleep)
+        self.write_limiter = self._make_limiter(write_requests_per_minute, clock, sleep)
+
+    @staticmethod
+    def _make_limiter(requests_per_minute, clock, sleep):
+        if requests_per_minute is None:
+            return None
+        return TokenBucket(rate=requests_per_minute / 60.0, capacity=requests_per_minute, clock=clock, sleep=sleep)
+
+    def execute(self, request, retry_statuses=RETRY_STATUSES, http=None):
+        """
+        Execute a request, retrying it while it fails with a retryable error
+        (see get_retry_statuses).
+        :param request: A googleapiclient HttpRequest.
+        :param retry_statuses: HTTP statuses of the errors to retry.
+        :param http: (Optional) Http object to send the request with, instead
+            of the Http object of the service that built the request.
+        :return: The response of the request.
+        :raise HttpError: the error of the last try.
+        """
+        limiter = self.get_limiter(request)
+        idempotent = self.is_idempotent(request)
+        retry_statuses = self.get_retry_statuses(request, retry_statuses)
+        for retry in range(self.max_retries + 1):
+            if limiter is not None:
+                limiter.acquire()
+            try:
+                if http is None:
+                    return request.execute()
+                return request.execute(http=http)
+            except HttpError as error:
+                if error.resp.status not in retry_statuses or retry == self.max_retries:
+                    raise
+                retry_after = error.resp.get('retry-after')
+            except (socket.timeout, ConnectionError):
+                if not idempotent or retry == self.max_retries:
+                    raise
+                retry_after = None
+            self.sleep(self.get_delay(retry, retry_after))
+
+    @staticmethod
+    def is_read(request):
+        """
+        :return: True if the request only reads data: a GET request, or a POST
+            request of one of the READ_POST_METHODS (e.g. getByDataFilter).
+        """
+        method = getattr(request, 'method', 'GET')
+        if method == 'GET':
+            return True
+        path = getattr(request, 'uri', '').split('?')[0]
+        return method == 'POST' and path.endswith(READ_POST_METHODS)
+
+    def is_idempotent(self, request):
+        """
+        :return: True if sending the request twice has the same effect as
+            sending it once (i.e. it is not a POST request, or only reads data).
+        """
+        return getattr(request, 'method', 'GET') in IDEMPOTENT_METHODS or self.is_read(request)
+
+    def get_retry_statuses(self, request, retry_statuses=RETRY_STATUSES):
+        """
+        :param retry_statuses: HTTP statuses of the errors to retry.
+        :return: The HTTP statuses of the errors to retry for the request: non
+            idempotent requests are only retried when rate limited.
+        """
+        if self.is_idempotent(request):
+            return retry_statuses
+        return retry_statuses & NON_IDEMPOTENT_RETRY_STATUSES
+
+    def get_limiter(self, request):
+        """
+        :return: The token bucket limiting the request (see is_read), or None
+            if it is not limited.
+        """
+        return self.read_limiter if self.is_read(request) else self.write_limiter
+
+    def get_delay(self, retry, retry_after=None):
+        """
+        :param retry: Number of the retry, starting at 0.
+        :param retry_after: (Optional) Value of the Retry-After header of the
+            error, in seconds.
+        :return: Delay in seconds before the retry: an exponential backoff with
+            up to one base delay of random jitter.
+        """
+        delay = min(self.max_delay, self.base_delay * 2 ** retry) + random.uniform(0, self.base_delay)
+        if retry_after is not None:
+            try:
+                delay = max(delay, float(retry_after))
+            except ValueError:
+                pass
+        return delay
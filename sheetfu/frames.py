@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+
+"""
+    sheetfu.frames
+    ~~~~~~~~~~~~~~
+
+    Implement the pandas bridge: typed DataFrame columns are built directly
+    from the cells returned by the API (dates converted from their serial
+    numbers in one vectorized operation), and DataFrames are serialized
+    straight into updateCells rows.
+    :copyright: © 2018 by Social Point Labs.
+    :license: MIT, see LICENSE for more details.
+"""
+
+from datetime import datetime
+
+from sheetfu.helpers import serial_number_to_datetime
+from sheetfu.parsers import CellParsers, VALUE_TYPES, DATE_FORMAT_TYPES
+
+
+# Google Sheets date serial numbers are days since this date.
+SHEETS_EPOCH = datetime(1899, 12, 30)
+
+EMPTY_CELL = {"userEnteredValue": {"stringValue": ''}}
+
+
+def import_pandas():
+    """
+    :return: Tuple of the numpy and pandas modules.
+    """
+    try:
+        import numpy
+        import pandas
+    except ImportError:
+        raise ImportError(
+            "The pandas package is required to use DataFrames. "
+            "Install it with: pip install sheetfu[pandas]"
+        )
+    return numpy, pandas
+
+
+def get_raw_value(cell):
+    """
+    :param cell: CellData resource of the API.
+    :return: Tuple of the effective value of the cell (None if empty), and
+        whether it is a date serial number.
+    """
+    value_body = cell.get("effectiveValue")
+    if value_body is None:
+        return None, False
+    for value_type in VALUE_TYPES:
+        value = value_body.get(value_type)
+        if value is not None:
+            format_type = cell.get('effectiveFormat', {}).get("numberFormat", {}).get("type")
+            return value, format_type in DATE_FORMAT_TYPES
+    return None, False
+
+
+def is_empty(cell):
+    return cell is None or (type(cell) is str and cell == '')
+
+
+def make_frame_column(cells, dates=None, categorical=False):
+    """
+    Build a typed column from cells: numbers are stored as float64 (empty
+    cells being NaN), dates as datetime64 (empty cells being NaT), booleans
+    as bool, and strings as object, or category if categorical. Columns
+    mixing types keep python objects.
+    :param cells: List of the cells values. Empty cells are None or ''.
+    :param dates: (Optional) List of the flags of the numbers to convert from
+        date serial numbers.
+    :param categorical: if True, string columns are categorical.
+    :return: numpy array or pandas array of the column.
+    """
+    numpy, pandas = import_pandas()
+    types = set(type(cell) for cell in cells if not is_empty(cell))
+    if types and types <= {int, float}:
+        numbers = numpy.array([numpy.nan if is_empty(cell) else cell for cell in cells], dtype='float64')
+        date_flags = set(
+            flag for cell, flag in zip(cells, dates or [False] * len(cells)) if not is_empty(cell))
+        if date_flags == {False}:
+            return numbers
+        if date_flags == {True}:
+            return pandas.to_datetime(numbers, unit='D', origin=pandas.Timestamp(SHEETS_EPOCH)).to_numpy()
+    elif types == {datetime}:
+        return pandas.to_datetime([None if is_empty(cell) else cell for cell in cells]).to_numpy()
+    elif types == {bool} and not any(is_empty(cell) for cell in cells):
+        return numpy.array(cells, dtype=bool)
+    elif not types or types == {str}:
+        strings = numpy.array(['' if cell is None else cell for cell in cells], dtype=object)
+        return pandas.Categorical(strings) if categorical else strings
+
+    column = numpy.empty(len(cells), dtype=object)
+    for row, cell in enumerate(cells):
+        if is_empty(cell):
+            cell = ''
+        elif dates is not None and dates[row] and type(cell) in (int, float):
+            cell = serial_number_to_datetime(cell)
+        column[row] = cell
+    return column
+
+
+def make_frame(header, columns):
+    """
+    :param header: List of the column names.
+    :param columns: List of the typed columns (see make_frame_column).
+    :return: DataFrame.
+    """
+    _, pandas = import_pandas()
+    # built by position, as the header may have duplicated names
+    frame = pandas.DataFrame(dict(enumerate(columns)), columns=range(len(columns)))
+    frame.columns = list(header)
+    return frame
+
+
+def grid_data_to_frame(grid_data, number_of_rows, number_of_columns, header=True, categorical=False):
+    """
+    :param grid_data: The grid data of a range, as returned by the API.
+    :param number_of_rows: Number of rows of the range.
+    :param number_of_columns: Number of columns of the range.
+    :param header: if True, the first row holds the column names. The columns
+        are numbered otherwise.
+    :param categorical: if True, string columns are categorical.
+    :return: DataFrame of the values of the range.
+    """
+    rows_cells = [
+        row.get("values", ())[:number_of_columns]
+        for row in (grid_data[0].get("rowData", ()) if grid_data else ())[:number_of_rows]
+    ]
+    rows_cells.extend([()] * (number_of_rows - len(rows_cells)))
+
+    names = list(range(number_of_columns))
+    if header and rows_cells:
+        names = [get_raw_value(cell)[0] for cell in rows_cells[0]]
+        names = ['' if name is None else name for name in names]
+        names.extend([''] * (number_of_columns - len(names)))
+        rows_cells = rows_cells[1:]
+
+    values = [[None] * len(rows_cells) for _ in range(number_of_columns)]
+    dates = [[False] * len(rows_cells) for _ in range(number_of_columns)]
+    for row, cells in enumerate(rows_cells):
+        for column, cell in enumerate(cells):
+            values[column][row], dates[column][row] = get_raw_value(cell)
+
+    columns = [
+        make_frame_column(column_values, column_dates, categorical=categorical)
+        for column_values, column_dates in zip(values, dates)
+    ]
+    return make_frame(names, columns)
+
+
+def get_frame_cells(frame):
+    """
+    :param frame: DataFrame.
+    :return: List of the columns of the frame as python cells (empty cells
+        being '', dates being datetime objects).
+    """
+    numpy, pandas = import_pandas()
+    columns = list()
+    for position in range(len(frame.columns)):
+        series = frame.iloc[:, position]
+        if series.dtype.kind == 'M':
+            if getattr(series.dt, 'tz', None) is not None:
+                series = series.dt.tz_localize(None)
+            cells = ['' if pandas.isnull(cell) else cell.to_pydatetime() for cell in series]
+        elif series.dtype.kind == 'f':
+            cells = ['' if cell != cell else cell for cell in series.to_numpy().tolist()]
+        elif series.dtype.kind in 'iub':
+            cells = series.to_numpy().tolist()
+        else:
+            cells = list()
+            for cell in series.tolist():
+                if isinstance(cell, pandas.Timestamp):
+                    cell = '' if pandas.isnull(cell) else cell.to_pydatetime()
+                elif isinstance(cell, numpy.generic):
+                    cell = cell.item()
+                if cell is None or (isinstance(cell, float) and cell != cell):
+                    cell = ''
+                cells.append(cell)
+        columns.append(cells)
+    return columns
+
+
+def frame_to_values(frame, header=True):
+    """
+    :param frame: DataFrame.
+    :param header: if True, the first row is the column names, as strings
+        (as written by frame_to_rows).
+    :return: 2D matrix of the values of the frame.
+    """
+    values = [list(row) for row in zip(*get_frame_cells(frame))]
+    if header:
+        values.insert(0, [str(name) for name in frame.columns])
+    return values
+
+
+def frame_to_rows(frame, header=True):
+    """
+    Serialize a DataFrame into the rows of an updateCells request. Numbers,
+    booleans and dates are serialized column by column, dates being
+    converted to serial numbers in one vectorized operation.
+    :param frame: DataFrame.
+    :param header: if True, the first row is the column names.
+    :return: List of RowData resources.
+    """
+    numpy, pandas = import_pandas()
+    columns = list()
+    for position in range(len(frame.columns)):
+        series = frame.iloc[:, position]
+        kind = series.dtype.kind
+        if kind == 'M':
+            if getattr(series.dt, 'tz', None) is not None:
+                series = series.dt.tz_localize(None)
+            serials = ((series - pandas.Timestamp(SHEETS_EPOCH)) / pandas.Timedelta(days=1)).to_numpy()
+            cells = [
+                EMPTY_CELL if serial != serial else {
+                    "userEnteredValue": {"numberValue": serial},
+                    "userEnteredFormat": {"numberFormat": {"type": "DATE_TIME"}}
+                }
+                for serial in serials.tolist()
+            ]
+        elif kind in 'fiu':
+            cells = [
+                EMPTY_CELL if number != number else {"userEnteredValue": {"numberValue": number}}
+                for number in series.to_numpy().tolist()
+            ]
+        elif kind == 'b':
+            cells = [{"userEnteredValue": {"boolValue": cell}} for cell in series.to_numpy().tolist()]
+        else:
+            cells = [CellParsers.set_value(cell) for cell in get_frame_cells(frame.iloc[:, [position]])[0]]
+        columns.append(cells)
+
+    rows = [{'values': list(cells)} for cells in zip(*columns)]
+    if header:
+        rows.insert(0, {'values': [CellParsers.set_value(str(name)) for name in frame.columns]})
+    return rows
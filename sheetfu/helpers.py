@@ -10,14 +10,34 @@
 """
 
 
+import re
 import string
-import math
 from datetime import datetime, timedelta
 from collections import namedtuple
+from functools import lru_cache
+from itertools import product
 
 
 RangeCoordinates = namedtuple('RangeCoordinates', 'row column number_of_rows number_of_columns sheet_name')
 
+# Columns whose letters are precomputed: every column up to ZZZ, the maximum of
+# a Google sheet. Columns beyond are converted arithmetically.
+MAX_PRECOMPUTED_COLUMN = 18278
+
+# Number of parsed A1 notations kept by convert_a1_to_coordinates.
+A1_CACHE_SIZE = 4096
+
+COLUMN_LETTERS = [''] + [
+    ''.join(letters)
+    for length in (1, 2, 3)
+    for letters in product(string.ascii_uppercase, repeat=length)
+][:MAX_PRECOMPUTED_COLUMN]
+LETTERS_COLUMNS = {letters: column for column, letters in enumerate(COLUMN_LETTERS) if letters}
+
+A1_FRAGMENT = re.compile(r'([A-Za-z]*)([0-9]*)')
+UNQUOTED_SHEET_NAME = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+CELL_REFERENCE = re.compile(r'[A-Za-z]{1,3}[0-9]+')
+
 
 def convert_coordinates_to_a1(
         row,
@@ -34,80 +54,147 @@ def convert_coordinates_to_a1(
         last_cell_range = convert_column_to_letter(last_column_index) + str(last_row_index)
         notation += ":" + last_cell_range
     if sheet_name:
-        return sheet_name + "!" + notation
+        return quote_sheet_name(sheet_name) + "!" + notation
     return notation
 
 
+@lru_cache(maxsize=256)
+def quote_sheet_name(sheet_name):
+    """
+    :return: The sheet name as written in A1 notations: quoted (with its
+        quotes doubled) unless it is only made of letters, digits and
+        underscores and can not be mistaken for a cell.
+    """
+    if UNQUOTED_SHEET_NAME.fullmatch(sheet_name) and not CELL_REFERENCE.fullmatch(sheet_name):
+        return sheet_name
+    return "'" + sheet_name.replace("'", "''") + "'"
+
+
+def split_sheet_name(a1_string):
+    """
+    :param a1_string: A1 notation, with or without sheet name. A quoted sheet
+        name may contain '!'.
+    :return: Tuple of the unquoted sheet name (None if missing) and the A1
+        notation of the cells.
+    """
+    if a1_string.startswith("'"):
+        end = 1
+        while True:
+            end = a1_string.find("'", end)
+            if end == -1:
+                raise ValueError("Unterminated sheet name quote in {}.".format(repr(a1_string)))
+            if a1_string[end + 1:end + 2] != "'":
+                break
+            end += 2
+        if a1_string[end + 1:end + 2] != "!":
+            raise ValueError("Expected '!' after the sheet name in {}.".format(repr(a1_string)))
+        return a1_string[1:end].replace("''", "'"), a1_string[end + 2:]
+    if '!' in a1_string:
+        sheet_name, _, cells_a1_string = a1_string.rpartition('!')
+        return sheet_name, cells_a1_string
+    return None, a1_string
+
+
 def append_sheet_name(a1_string, sheet_name):
     if sheet_name is None or sheet_name == "":
         raise ValueError(
             "Specified an invalid sheet name to append. (" + repr(sheet_name) + ")"
         )
-    if '!' in a1_string:
-        a1_sheet_name, cells_a1_string = a1_string.split('!')
-        if sheet_name != a1_sheet_name:
-            raise ValueError("Tried appending sheet name " + repr(sheet_name) + " to the A1 string " + repr(a1_string) +
-                             ", but it had already a different sheet name specified (" + repr(a1_sheet_name) + ").")
-    else:
-        a1_string = sheet_name + "!" + a1_string
-    return a1_string
+    a1_sheet_name, cells_a1_string = split_sheet_name(a1_string)
+    if a1_sheet_name is not None and sheet_name != a1_sheet_name:
+        raise ValueError("Tried appending sheet name " + repr(sheet_name) + " to the A1 string " + repr(a1_string) +
+                         ", but it had already a different sheet name specified (" + repr(a1_sheet_name) + ").")
+    return quote_sheet_name(sheet_name) + "!" + cells_a1_string
 
 
+@lru_cache(maxsize=A1_CACHE_SIZE)
 def convert_a1_to_coordinates(a1_string):
-    sheet_name = None
-    # in case the sheet name is in A1
-    if '!' in a1_string:
-        sheet_name, a1_string = a1_string.split('!')
-    first_cell = a1_string.split(':')[0]
+    """
+    Parse an A1 notation. Besides cells ('B2') and cell ranges ('B2:D10'), it
+    handles whole columns ('B:D'), columns from a row ('B5:D') and whole rows
+    ('2:10'), whose unbounded number of rows or columns is None. Parsed
+    notations are cached.
+    :param a1_string: A1 notation, with or without sheet name.
+    :return: RangeCoordinates.
+    """
+    sheet_name, cells_a1_string = split_sheet_name(a1_string)
+    first_cell, separator, last_cell = cells_a1_string.partition(':')
     column, row = split_letters_numbers(first_cell)
-    number_of_rows = 1
-    number_of_columns = 1
-    # in case the range is more than one cell (matrix)
-    if ":" in a1_string:
-        last_cell = a1_string.split(':')[1]
-        last_column, last_row = split_letters_numbers(last_cell)
-        number_of_rows = last_row - row + 1
-        number_of_columns = last_column - column + 1
+    if not separator:
+        if column is None or row is None:
+            raise ValueError("Invalid A1 notation {}.".format(repr(a1_string)))
+        return RangeCoordinates(
+            row=row, column=column, number_of_rows=1, number_of_columns=1, sheet_name=sheet_name)
+
+    last_column, last_row = split_letters_numbers(last_cell)
+    if column is not None and last_column is not None and (row is None) == (last_row is None):
+        # cells, or whole columns
+        number_of_rows = None if row is None else abs(last_row - row) + 1
+        row = 1 if row is None else min(row, last_row)
+    elif column is not None and row is not None and last_column is not None:
+        # columns from a row
+        number_of_rows = None
+    elif column is None and last_column is None and row is not None and last_row is not None:
+        # whole rows
+        return RangeCoordinates(
+            row=min(row, last_row),
+            column=1,
+            number_of_rows=abs(last_row - row) + 1,
+            number_of_columns=None,
+            sheet_name=sheet_name
+        )
+    else:
+        raise ValueError("Invalid A1 notation {}.".format(repr(a1_string)))
     return RangeCoordinates(
         row=row,
-        column=column,
+        column=min(column, last_column),
         number_of_rows=number_of_rows,
-        number_of_columns=number_of_columns,
+        number_of_columns=abs(last_column - column) + 1,
         sheet_name=sheet_name
     )
 
 
 def split_letters_numbers(a1_fragment):
-    for i, character in enumerate(a1_fragment):
-        if character in '123456789':
-            letter = a1_fragment[0:i]
-            number = int(a1_fragment[i:])
-            return convert_letter_to_column(letter), number
-    else:
-        return a1_fragment      # only letters = a whole column range
+    """
+    :param a1_fragment: A cell ('B2'), a column ('B') or a row ('2').
+    :return: Tuple of the column and row numbers, None when missing.
+    """
+    match = A1_FRAGMENT.fullmatch(a1_fragment)
+    if match is None or not a1_fragment:
+        raise ValueError("Invalid A1 cell {}.".format(repr(a1_fragment)))
+    letters, digits = match.groups()
+    row = int(digits) if digits else None
+    if row == 0:
+        raise ValueError("Invalid A1 cell {}: rows start at 1.".format(repr(a1_fragment)))
+    return (convert_letter_to_column(letters) if letters else None), row
 
 
 def convert_column_to_letter(column_index):
-    column_index = column_index - 1
-    letters = string.ascii_uppercase
-    if column_index < len(letters):
-        return letters[column_index]
-    first_letter_index = column_index / len(letters) - 1
-    second_letter_index = column_index % len(letters)
-    return letters[int(first_letter_index)] + letters[int(second_letter_index)]
+    if 0 < column_index <= MAX_PRECOMPUTED_COLUMN:
+        return COLUMN_LETTERS[column_index]
+    if column_index <= 0:
+        raise ValueError("Invalid column {}: columns start at 1.".format(column_index))
+    letters = ''
+    while column_index > 0:
+        column_index, remainder = divmod(column_index - 1, len(string.ascii_uppercase))
+        letters = string.ascii_uppercase[remainder] + letters
+    return letters
 
 
 def convert_letter_to_column(letters_string):
-    index_to_row_offset = 1
-    if len(letters_string) == 1:
-        return string.ascii_uppercase.index(letters_string.capitalize()) + index_to_row_offset
+    letters_string = letters_string.upper()
+    column_number = LETTERS_COLUMNS.get(letters_string)
+    if column_number is not None:
+        return column_number
     column_number = 0
-    for i, letter in enumerate(letters_string):
-        letter_index = string.ascii_uppercase.index(letter.capitalize()) + index_to_row_offset
-        power = len(letters_string) - (i + 1)
-        number_of_columns = letter_index * math.pow(len(string.ascii_uppercase), power)
-        column_number += number_of_columns
-    return int(column_number)
+    for letter in letters_string:
+        letter_index = string.ascii_uppercase.find(letter)
+        if letter_index == -1:
+            raise ValueError("Invalid column letters {}.".format(repr(letters_string)))
+        column_number = column_number * len(string.ascii_uppercase) + letter_index + 1
+    if column_number == 0:
+        raise ValueError("Invalid column letters {}.".format(repr(letters_string)))
+    return column_number
 
 
 def rgb_to_hex(red=0, green=0, blue=0):
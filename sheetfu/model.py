@@ -9,30 +9,458 @@
     :license: MIT, see LICENSE for more details.
 """
 
+import json
+from concurrent.futures import ThreadPoolExecutor
 
+from googleapiclient.errors import HttpError
+
+from sheetfu.cache import get_grid_range_bounds
 from sheetfu.helpers import (
-    convert_a1_to_coordinates, convert_coordinates_to_a1, append_sheet_name)
+    RangeCoordinates, convert_a1_to_coordinates, convert_coordinates_to_a1, convert_column_to_letter,
+    append_sheet_name, quote_sheet_name)
 from sheetfu.exceptions import (
     SheetNameNoMatchError, SheetIdNoMatchError, NoDataRangeError,
-    SizeNotMatchingException, RowOrColumnEqualsZeroError
+    SizeNotMatchingException, RowOrColumnEqualsZeroError, BatchCommitError
 )
+from sheetfu.frames import grid_data_to_frame, frame_to_rows
 from sheetfu.parsers import CellParsers
 
 
+# Field masks, top-level cell keys and cell parsers of every cell dimension
+# that can be read from a grid, keyed by the name used in Range.get_data().
+GRID_FIELDS = {
+    "values": (
+        "sheets/data/rowData/values/effectiveValue,sheets/data/rowData/values/effectiveFormat/numberFormat/type",
+        "effectiveValue",
+        CellParsers.get_value
+    ),
+    "notes": (
+        "sheets/data/rowData/values/note",
+        "note",
+        CellParsers.get_note
+    ),
+    "backgrounds": (
+        "sheets/data/rowData/values/effectiveFormat/backgroundColor",
+        "effectiveFormat",
+        CellParsers.get_background
+    ),
+    "font_colors": (
+        "sheets/data/rowData/values/effectiveFormat/textFormat/foregroundColor",
+        "effectiveFormat",
+        CellParsers.get_font_color
+    ),
+    "formulas": (
+        "sheets/data/rowData/values/userEnteredValue/formulaValue",
+        "userEnteredValue",
+        CellParsers.get_formula
+    ),
+}
+
+
+# Top-level cell key of the dimension parsed by each of the grid cell parsers.
+CELL_PARSER_KEYS = {cell_parser: key for _, key, cell_parser in GRID_FIELDS.values()}
+
+
+def get_grid_fields_names(values=True, notes=False, backgrounds=False, font_colors=False, formulas=False):
+    """
+    :return: List of the names of the requested grid fields (see GRID_FIELDS).
+    """
+    requested = {
+        "values": values,
+        "notes": notes,
+        "backgrounds": backgrounds,
+        "font_colors": font_colors,
+        "formulas": formulas,
+    }
+    names = [name for name, is_requested in requested.items() if is_requested]
+    if not names:
+        raise ValueError("At least one dimension must be requested.")
+    return names
+
+
+def get_grid_fields_mask(names):
+    """
+    :param names: List of grid fields names (see GRID_FIELDS).
+    :return: The field mask requesting every one of the grid fields.
+    """
+    return ",".join(GRID_FIELDS[name][0] for name in names)
+
+
+# Render options of the values endpoints, read by the clients in fast values
+# mode: the values are unformatted, and dates are returned as serial numbers.
+VALUES_RENDER_OPTIONS = {
+    "valueRenderOption": "UNFORMATTED_VALUE",
+    "dateTimeRenderOption": "SERIAL_NUMBER",
+}
+
+# Cache key field mask of the values read with the values endpoints.
+VALUES_CACHE_MASK = "values:UNFORMATTED_VALUE"
+
+
+def is_raw_value(cell):
+    """
+    :return: True if the value of a cell can be written as is with the values
+        endpoints (RAW value input), i.e. it is neither a formula nor a date.
+    """
+    if isinstance(cell, str):
+        return not cell.startswith("=")
+    return cell is None or isinstance(cell, (bool, int, float))
+
+
+def get_raw_values(values):
+    """
+    :param values: 2D array of values.
+    :return: The values to write with the values endpoints if they are all raw
+        values (see is_raw_value), empty cells being empty strings, or None.
+    """
+    raw_values = list()
+    for row in values:
+        for cell in row:
+            if not is_raw_value(cell):
+                return None
+        raw_values.append(["" if cell is None else cell for cell in row])
+    return raw_values
+
+
+# Maximum number of ranges read with one request by Spreadsheet.get_ranges (the
+# ranges are sent in the URL), and of such requests sent in parallel.
+MAX_RANGES_PER_REQUEST = 100
+MAX_PARALLEL_REQUESTS = 8
+
+# Number of rows read per request when computing the data range of a sheet: the
+# API has no endpoint for the data extent of a sheet, so its values are read, by
+# chunks to keep the memory bounded on very large sheets.
+DATA_RANGE_CHUNK_ROWS = 10000
+
+# Bounds of a single batchUpdate call. Batches committed at once are split into
+# chunks of at most that many requests and that many bytes of JSON payload.
+MAX_BATCH_REQUESTS = 1000
+MAX_BATCH_PAYLOAD_BYTES = 2 * 1024 * 1024
+
+
+def is_api_error(error, status, message):
+    """
+    :param error: HttpError raised by a request.
+    :return: True if the error has the HTTP status, and its content holds the
+        message (e.g. "Unable to parse range").
+    """
+    content = error.content
+    if isinstance(content, bytes):
+        content = content.decode("utf-8", "replace")
+    return error.resp.status == status and message in (content or "")
+
+
+def get_payload_size(payload):
+    return len(json.dumps(payload, separators=(',', ':'), default=str))
+
+
+def get_single_cell_update(request):
+    """
+    :return: Tuple of the (sheet id, fields) of a single cell updateCells
+        request, the (row index, column index) of the cell and the cell data,
+        or None if the request is not a single cell update.
+    """
+    update = request.get('updateCells')
+    if update is None or 'range' not in update or 'fields' not in update:
+        return None
+    grid_range = update['range']
+    try:
+        rows = update['rows']
+        if (grid_range['endRowIndex'] - grid_range['startRowIndex'] != 1 or
+                grid_range['endColumnIndex'] - grid_range['startColumnIndex'] != 1 or
+                len(rows) != 1 or len(rows[0]['values']) != 1):
+            return None
+    except (KeyError, TypeError):
+        return None
+    return (
+        (grid_range.get('sheetId', 0), update['fields']),
+        (grid_range['startRowIndex'], grid_range['startColumnIndex']),
+        rows[0]['values'][0]
+    )
+
+
+def field_masks_overlap(fields, other_fields):
+    """
+    :return: True if writing one of the field masks can change a field of the
+        other one (e.g. 'userEnteredFormat' and 'userEnteredFormat.backgroundColor').
+    """
+    for path in fields.split(','):
+        for other_path in other_fields.split(','):
+            if path == '*' or other_path == '*' or path == other_path:
+                return True
+            if path.startswith(other_path + '.') or other_path.startswith(path + '.'):
+                return True
+    return False
+
+
+# batchUpdate requests only changing the cells of their 'range' GridRange (or
+# of their 'start' GridCoordinate).
+CELLS_WRITE_REQUESTS = (
+    'updateCells', 'repeatCell', 'setDataValidation', 'updateBorders', 'mergeCells', 'unmergeCells'
+)
+
+
+def find_sheet_ids(resource):
+    """
+    :return: Set of the sheet ids found anywhere in a request resource.
+    """
+    sheet_ids = set()
+    if isinstance(resource, dict):
+        for key, value in resource.items():
+            if key == 'sheetId':
+                sheet_ids.add(value)
+            else:
+                sheet_ids.update(find_sheet_ids(value))
+    elif isinstance(resource, list):
+        for value in resource:
+            sheet_ids.update(find_sheet_ids(value))
+    return sheet_ids
+
+
+def get_written_ranges(request):
+    """
+    :param request: A batchUpdate request.
+    :return: List of the sheet id and grid bounds (see get_grid_range_bounds)
+        of the cells the request may change. The bounds are None when the whole
+        sheet may change (e.g. rows deletion), and the sheet id is None when
+        any sheet of the spreadsheet may change.
+    """
+    written_ranges = list()
+    for request_type, body in request.items():
+        if request_type in CELLS_WRITE_REQUESTS and 'range' in body:
+            written_ranges.append((body['range'].get('sheetId', 0), get_grid_range_bounds(body['range'])))
+        elif request_type in CELLS_WRITE_REQUESTS and 'start' in body:
+            start = body['start']
+            row = start.get('rowIndex', 0)
+            column = start.get('columnIndex', 0)
+            rows = body.get('rows', [])
+            number_of_columns = max([len(row_data.get('values', [])) for row_data in rows] or [0])
+            written_ranges.append(
+                (start.get('sheetId', 0), (row, row + len(rows), column, column + number_of_columns)))
+        else:
+            sheet_ids = find_sheet_ids(body)
+            if not sheet_ids:
+                return [(None, None)]
+            written_ranges.extend((sheet_id, None) for sheet_id in sheet_ids)
+    return written_ranges
+
+
+def build_update_cells_rectangles(sheet_id, fields, cells):
+    """
+    Merge single cell writes into updateCells requests on rectangles: cells are
+    first merged into horizontal segments, then segments of the same columns on
+    consecutive rows are merged together.
+    :param sheet_id: Sheet id of the cells.
+    :param fields: Field mask of the cells.
+    :param cells: Dictionary of (row index, column index) to cell data.
+    :return: List of updateCells requests.
+    """
+    segments = list()
+    for row_index, column_index in sorted(cells):
+        cell = cells[(row_index, column_index)]
+        if segments:
+            last_row_index, last_column_index, segment_cells = segments[-1]
+            if last_row_index == row_index and last_column_index + len(segment_cells) == column_index:
+                segment_cells.append(cell)
+                continue
+        segments.append((row_index, column_index, [cell]))
+
+    rectangles = list()
+    open_rectangles = dict()
+    for row_index, column_index, segment_cells in segments:
+        rectangle = open_rectangles.get((column_index, len(segment_cells)))
+        if rectangle is not None and rectangle[0] + len(rectangle[2]) == row_index:
+            rectangle[2].append(segment_cells)
+            continue
+        rectangle = (row_index, column_index, [segment_cells])
+        open_rectangles[(column_index, len(segment_cells))] = rectangle
+        rectangles.append(rectangle)
+
+    return [
+        {
+            'updateCells': {
+                'range': {
+                    'sheetId': sheet_id,
+                    'startRowIndex': row_index,
+                    'endRowIndex': row_index + len(rows),
+                    'startColumnIndex': column_index,
+                    'endColumnIndex': column_index + len(rows[0])
+                },
+                'fields': fields,
+                'rows': [{'values': row} for row in rows]
+            }
+        }
+        for row_index, column_index, rows in rectangles
+    ]
+
+
+def coalesce_update_cells(requests):
+    """
+    Coalesce the single cell updateCells requests (as batched by the Item
+    setters) into requests on rectangles of cells sharing the same field mask.
+    A write to a cell supersedes the previous writes to that cell with the same
+    mask. Any other request, or a write to a cell with a pending write on an
+    overlapping mask, first flushes the pending writes, so that the requests
+    order is preserved wherever it matters.
+    :param requests: List of batchUpdate requests.
+    :return: List of batchUpdate requests.
+    """
+    coalesced = list()
+    # (sheet id, fields) -> {(row index, column index): cell data}
+    groups = dict()
+    # (sheet id, row index, column index) -> field masks with a pending write
+    pending_cells = dict()
+
+    def flush():
+        for (sheet_id, fields), cells in groups.items():
+            coalesced.extend(build_update_cells_rectangles(sheet_id, fields, cells))
+        groups.clear()
+        pending_cells.clear()
+
+    for request in requests:
+        update = get_single_cell_update(request)
+        if update is None:
+            flush()
+            coalesced.append(request)
+            continue
+        (sheet_id, fields), (row_index, column_index), cell = update
+        cell_key = (sheet_id, row_index, column_index)
+        pending_fields = pending_cells.get(cell_key, ())
+        if any(other != fields and field_masks_overlap(fields, other) for other in pending_fields):
+            flush()
+        pending_cells.setdefault(cell_key, set()).add(fields)
+        groups.setdefault((sheet_id, fields), dict())[(row_index, column_index)] = cell
+    flush()
+    return coalesced
+
+
+def split_update_cells_request(request, max_payload_bytes):
+    """
+    Split an updateCells request whose payload is too big into several requests
+    on consecutive blocks of rows. Rows are never split, and any other request
+    is returned as is.
+    :param request: A batchUpdate request.
+    :param max_payload_bytes: Maximum payload size of each request.
+    :return: List of requests.
+    """
+    update = request.get('updateCells')
+    if update is None or 'range' not in update or len(update.get('rows', [])) < 2:
+        return [request]
+    if get_payload_size(request) <= max_payload_bytes:
+        return [request]
+
+    grid_range = update['range']
+    start_row_index = grid_range.get('startRowIndex', 0)
+    overhead = get_payload_size(dict(update, rows=[])) + len('{"updateCells":}')
+
+    blocks = list()
+    block, block_size = list(), overhead
+    for row in update['rows']:
+        # the rows of a block are separated by commas
+        row_size = get_payload_size(row) + (1 if block else 0)
+        if block and block_size + row_size > max_payload_bytes:
+            blocks.append(block)
+            block, block_size = list(), overhead
+            row_size -= 1
+        block.append(row)
+        block_size += row_size
+    blocks.append(block)
+
+    requests = list()
+    for rows in blocks:
+        block_range = dict(grid_range, startRowIndex=start_row_index, endRowIndex=start_row_index + len(rows))
+        requests.append({'updateCells': dict(update, range=block_range, rows=rows)})
+        start_row_index += len(rows)
+    return requests
+
+
+def split_batches(requests, max_requests=MAX_BATCH_REQUESTS, max_payload_bytes=MAX_BATCH_PAYLOAD_BYTES):
+    """
+    Split a list of batchUpdate requests into chunks that can each be sent in
+    one call, keeping the requests order.
+    :param requests: List of batchUpdate requests.
+    :param max_requests: Maximum number of requests of a chunk.
+    :param max_payload_bytes: Maximum JSON payload size of a chunk.
+    :return: List of chunks (lists of requests).
+    """
+    if max_requests <= 0 or max_payload_bytes <= 0:
+        raise ValueError("Batch chunks bounds must be positive.")
+    overhead = len('{"requests":[]}')
+
+    chunks = list()
+    chunk, chunk_size = list(), overhead
+    for request in requests:
+        for part in split_update_cells_request(request, max_payload_bytes - overhead):
+            # the requests of a chunk are separated by commas
+            part_size = get_payload_size(part) + (1 if chunk else 0)
+            if chunk and (len(chunk) >= max_requests or chunk_size + part_size > max_payload_bytes):
+                chunks.append(chunk)
+                chunk, chunk_size = list(), overhead
+                part_size -= 1
+            chunk.append(part)
+            chunk_size += part_size
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def prepare_batches(
+        requests,
+        max_requests=MAX_BATCH_REQUESTS,
+        max_payload_bytes=MAX_BATCH_PAYLOAD_BYTES,
+        coalesce=True
+):
+    """
+    Coalesce the single cell writes of batchUpdate requests (see
+    coalesce_update_cells), and split them into chunks (see split_batches).
+    :return: List of chunks (lists of requests), to be sent in order.
+    """
+    if coalesce:
+        requests = coalesce_update_cells(requests)
+    return split_batches(requests, max_requests=max_requests, max_payload_bytes=max_payload_bytes)
+
+
 class Spreadsheet:
     """Spreadsheet object from which we can access its sheets.
     """
 
-    def __init__(self, client, spreadsheet_id):
+    def __init__(self, client, spreadsheet_id, metadata=None):
         """
+        The sheets metadata is only requested on first access to the sheets.
         :param client: A SpreadsheetApp instance.
         :param spreadsheet_id: The spreadsheet ID
+        :param metadata: (Optional) The spreadsheet resource (as requested by
+            get_sheets_request), to create the sheets without any request.
         """
         self.client = client
         self.id = spreadsheet_id
-        self.sheets = self.get_sheets()
+        self.metadata = None
+        self._sheets = None
+        if metadata is not None:
+            self.load_metadata(metadata)
         self.batches = list()
 
+    @property
+    def sheets(self):
+        """
+        List of the sheets of the spreadsheet, requested on first access.
+        """
+        if self._sheets is None:
+            self.load_metadata(self.client.execute(self.get_sheets_request()))
+        return self._sheets
+
+    @sheets.setter
+    def sheets(self, sheets):
+        self._sheets = sheets
+
+    def load_metadata(self, metadata):
+        """
+        Set the sheets of the spreadsheet from its metadata.
+        :param metadata: The spreadsheet resource.
+        """
+        self.metadata = metadata
+        self._sheets = self.parse_sheets(metadata)
+
     def __repr__(self):
         return '<Spreadsheet object {}>'.format(self.id)
 
@@ -58,10 +486,22 @@ class Spreadsheet:
         Requests every sheets associated to spreadsheets
         :return List of sheets object
         """
-        request = self.client.sheet_service.spreadsheets().get(
+        response = self.client.execute(self.get_sheets_request())
+        return self.parse_sheets(response)
+
+    def get_sheets_request(self):
+        """
+        :return: The request of the spreadsheet resource, without grid data.
+        """
+        return self.client.sheet_service.spreadsheets().get(
             spreadsheetId=self.id, includeGridData=False
         )
-        response = request.execute()
+
+    def parse_sheets(self, response):
+        """
+        :param response: The spreadsheet resource.
+        :return: List of sheets object.
+        """
         sheets = [
             self.get_sheet(
                 name=sheet['properties']['title'],
@@ -84,6 +524,87 @@ class Spreadsheet:
         else:
             raise SheetNameNoMatchError
 
+    def open_sheet(self, name=None, sid=None):
+        """
+        Open a sheet by name or by id, without listing the sheets of the
+        spreadsheet. A sheet opened by name is created without any request: its
+        properties (id and grid properties) are only requested if they are
+        needed, for instance to write to it. A sheet opened by id is created
+        from its properties, requested alone (see get_sheet_properties_by_id).
+        :param name: (Optional) Name of the sheet.
+        :param sid: (Optional) Id of the sheet.
+        :return: Sheet object.
+        """
+        if (name is None) == (sid is None):
+            raise ValueError("Specify either the name or the id of the sheet to open.")
+        if self._sheets is not None:
+            return self.get_sheet_by_name(name) if sid is None else self.get_sheet_by_id(sid)
+        if sid is not None:
+            properties = self.get_sheet_properties_by_id(sid)
+            return self.get_sheet(
+                name=properties["title"], sid=properties["sheetId"], grid_properties=properties["gridProperties"])
+        return self.get_sheet(name=name, sid=None, grid_properties=None)
+
+    def get_sheet_properties(self, name):
+        """
+        Request the properties of one sheet, without the other sheets.
+        :param name: Name of the sheet.
+        :return: The sheet properties resource.
+        :raise SheetNameNoMatchError: if there is no sheet with this name.
+        """
+        request = self.client.sheet_service.spreadsheets().get(
+            spreadsheetId=self.id,
+            # quoted, so that a name like "Q1" is not read as a cell of the first sheet
+            ranges=[quote_sheet_name(name)],
+            fields="sheets/properties"
+        )
+        try:
+            response = self.client.execute(request)
+        except HttpError as error:
+            # the API can not parse the range of an unknown sheet
+            if is_api_error(error, 400, "Unable to parse range"):
+                raise SheetNameNoMatchError
+            raise
+        return response["sheets"][0]["properties"]
+
+    def get_sheet_properties_by_id(self, sid):
+        """
+        Request the properties of one sheet, without the other sheets: only
+        the sheet matching a data filter on its id is returned.
+        :param sid: Id of the sheet.
+        :return: The sheet properties resource.
+        :raise SheetIdNoMatchError: if there is no sheet with this id.
+        """
+        request = self.client.sheet_service.spreadsheets().getByDataFilter(
+            spreadsheetId=self.id,
+            body={"dataFilters": [{"gridRange": {"sheetId": sid}}], "includeGridData": False},
+            fields="sheets/properties"
+        )
+        try:
+            response = self.client.execute(request)
+        except HttpError as error:
+            if is_api_error(error, 400, "No grid with id"):
+                raise SheetIdNoMatchError
+            raise
+        for sheet in response.get("sheets", []):
+            if sheet["properties"]["sheetId"] == sid:
+                return sheet["properties"]
+        raise SheetIdNoMatchError
+
+    def get_version(self):
+        """
+        Request the version of the spreadsheet file, a cheap Drive metadata
+        request. The version increases on every change of the spreadsheet.
+        :return: The version of the spreadsheet.
+        """
+        return self.client.execute(self.version_request())["version"]
+
+    def version_request(self):
+        """
+        :return: The Drive request of the version of the spreadsheet file.
+        """
+        return self.client.drive_service.files().get(fileId=self.id, fields="version")
+
     def get_sheet_by_id(self, sid):
         """
         Find sheet by sheet id.
@@ -96,9 +617,201 @@ class Spreadsheet:
         else:
             raise SheetIdNoMatchError
 
+    def get_range_from_a1(self, a1_notation):
+        """
+        :param a1_notation: A1 notation of a range, including its sheet name
+            (e.g. 'people!A1:C10').
+        :return: Range object.
+        """
+        sheet_name = convert_a1_to_coordinates(a1_notation).sheet_name
+        if not sheet_name:
+            raise ValueError("The A1 notation {} must include the sheet name.".format(repr(a1_notation)))
+        return self.get_sheet_by_name(sheet_name).get_range_from_a1(a1_notation)
+
+    def get_ranges(
+            self,
+            ranges,
+            values=True,
+            notes=False,
+            backgrounds=False,
+            font_colors=False,
+            formulas=False,
+            max_ranges_per_request=MAX_RANGES_PER_REQUEST
+    ):
+        """
+        Get multiple dimensions of many ranges, across sheets, with as few
+        requests as possible: the ranges are read by chunks of
+        max_ranges_per_request ranges per request. With a thread safe client,
+        the chunks are requested in parallel.
+        :param ranges: List of Range objects, or of A1 notations including
+            their sheet name.
+        :param values: Whether to get the values.
+        :param notes: Whether to get the notes.
+        :param backgrounds: Whether to get the backgrounds.
+        :param font_colors: Whether to get the font colors.
+        :param formulas: Whether to get the formulas.
+        :param max_ranges_per_request: Maximum number of ranges of a request.
+        :return: List of the data of every range (see Range.get_data), in the
+            ranges order.
+        """
+        names = get_grid_fields_names(
+            values=values, notes=notes, backgrounds=backgrounds, font_colors=font_colors, formulas=formulas)
+        chunks = self.get_ranges_chunks(ranges, max_ranges_per_request)
+        fast_values = self.client.fast_values and names == ["values"]
+
+        def request_chunk(chunk):
+            if fast_values:
+                return self.client.execute(self.values_ranges_request(chunk))
+            return self.client.execute(self.ranges_request(chunk, names))
+
+        if self.client.http_pool is not None and len(chunks) > 1:
+            with ThreadPoolExecutor(max_workers=min(len(chunks), MAX_PARALLEL_REQUESTS)) as pool:
+                responses = list(pool.map(request_chunk, chunks))
+        else:
+            responses = [request_chunk(chunk) for chunk in chunks]
+
+        data = list()
+        for chunk, response in zip(chunks, responses):
+            if fast_values:
+                data.extend(self.parse_values_ranges_response(chunk, response))
+            else:
+                data.extend(self.parse_ranges_response(chunk, response, names))
+        return data
+
+    def get_ranges_chunks(self, ranges, max_ranges_per_request=MAX_RANGES_PER_REQUEST):
+        """
+        :return: The ranges (as Range objects) split in chunks of at most
+            max_ranges_per_request ranges.
+        """
+        if max_ranges_per_request <= 0:
+            raise ValueError("The maximum number of ranges per request must be positive.")
+        ranges = [
+            self.get_range_from_a1(target_range) if isinstance(target_range, str) else target_range
+            for target_range in ranges
+        ]
+        return [
+            ranges[start:start + max_ranges_per_request]
+            for start in range(0, len(ranges), max_ranges_per_request)
+        ]
+
+    def ranges_request(self, ranges, names):
+        """
+        :param ranges: List of Range objects.
+        :param names: List of the grid fields names to request (see GRID_FIELDS).
+        :return: The request of the grid data of every range.
+        """
+        return self.client.sheet_service.spreadsheets().get(
+            spreadsheetId=self.id,
+            includeGridData=True,
+            ranges=[target_range.a1 or target_range.sheet.name for target_range in ranges],
+            fields="sheets/properties/title,sheets/data/startRow,sheets/data/startColumn," + get_grid_fields_mask(names)
+        )
+
+    @staticmethod
+    def parse_ranges_response(ranges, response, names):
+        """
+        Map the grid data of a ranges request back to its ranges, by sheet and
+        start cell (the API omits the start row and column when they are 0).
+        Grid data sharing the same start (the same range requested many times)
+        are mapped in the requested order.
+        :return: List of the data of every range (see Range.get_data).
+        :raise ValueError: if the response has no grid data for a range.
+        """
+        grid_data_by_start = dict()
+        for sheet in response["sheets"]:
+            for grid_data in sheet.get("data", []):
+                start = (sheet["properties"]["title"], grid_data.get("startRow", 0), grid_data.get("startColumn", 0))
+                grid_data_by_start.setdefault(start, []).append(grid_data)
+        cell_parsers = {name: GRID_FIELDS[name][2] for name in names}
+        data = list()
+        for target_range in ranges:
+            start_row, _, start_column, _ = target_range.get_grid_bounds()
+            matching_grid_data = grid_data_by_start.get((target_range.sheet.name, start_row, start_column))
+            if not matching_grid_data:
+                raise ValueError("The response has no grid data for the range {}.".format(target_range.a1))
+            grid_data = matching_grid_data.pop(0) if len(matching_grid_data) > 1 else matching_grid_data[0]
+            data.append(target_range.parse_grid_data([grid_data], cell_parsers))
+        return data
+
+    def values_ranges_request(self, ranges):
+        """
+        :param ranges: List of Range objects.
+        :return: The request of the unformatted values of every range, with the
+            values endpoint.
+        """
+        return self.client.sheet_service.spreadsheets().values().batchGet(
+            spreadsheetId=self.id,
+            ranges=[target_range.a1 or target_range.sheet.name for target_range in ranges],
+            majorDimension="ROWS",
+            **VALUES_RENDER_OPTIONS
+        )
+
+    @staticmethod
+    def parse_values_ranges_response(ranges, response):
+        """
+        Map the value ranges of a values request back to its ranges, the value
+        ranges being listed in the requested order.
+        :return: List of the data of every range (see Range.get_data).
+        """
+        return [
+            {"values": target_range.parse_values(value_range.get("values", []))}
+            for target_range, value_range in zip(ranges, response["valueRanges"])
+        ]
+
+    def set_ranges_values(self, ranges, values):
+        """
+        Set the values of many ranges, across sheets, with as few requests as
+        possible. In fast values mode, the ranges of raw values (see
+        is_raw_value) are written with a single values batchUpdate request,
+        and the other ones with a single batchUpdate request.
+        :param ranges: List of Range objects, or of A1 notations including
+            their sheet name.
+        :param values: List of the 2D arrays of values of every range (sizes
+            must match the ranges coordinates).
+        """
+        if len(ranges) != len(values):
+            raise ValueError("Got {} arrays of values for {} ranges.".format(len(values), len(ranges)))
+        ranges = [
+            self.get_range_from_a1(target_range) if isinstance(target_range, str) else target_range
+            for target_range in ranges
+        ]
+        for target_range, range_values in zip(ranges, values):
+            check_values_size(target_range, range_values)
+
+        grid_updates = RequestsBatch()
+        value_ranges = list()
+        written_ranges = list()
+        for target_range, range_values in zip(ranges, values):
+            raw_values = get_raw_values(range_values) if self.client.fast_values else None
+            if raw_values is None:
+                target_range.set_values(range_values, batch_to=grid_updates)
+            else:
+                value_ranges.append({"range": target_range.a1 or target_range.sheet.name, "values": raw_values})
+                written_ranges.append(target_range)
+
+        if value_ranges:
+            request = self.client.sheet_service.spreadsheets().values().batchUpdate(
+                spreadsheetId=self.id,
+                body={"valueInputOption": "RAW", "data": value_ranges}
+            )
+            try:
+                self.client.execute(request)
+            finally:
+                for target_range in written_ranges:
+                    target_range.invalidate_cached_reads()
+        if grid_updates.batches:
+            self.batch_update(grid_updates.batches)
+
     def _add_sheets_from_response(self, response, reply_type):
+        """
+        Create the sheets added by a batch update, and add them to the sheets of
+        the spreadsheet if those are already loaded (otherwise they will be
+        part of the sheets when requested).
+        :return: List of the new sheets.
+        """
         replies = response["replies"]
         reply_type_found = False
+        new_sheets = list()
         for reply in replies:
             new_sheet_reply = reply.get(reply_type)
             if new_sheet_reply is None:
@@ -110,11 +823,14 @@ class Spreadsheet:
                 sid=new_sheet_reply['properties']['sheetId'],
                 grid_properties=new_sheet_reply['properties']['gridProperties']
             )
-            self.sheets.append(new_sheet)
+            new_sheets.append(new_sheet)
+            if self._sheets is not None:
+                self._sheets.append(new_sheet)
         if not reply_type_found:
             raise ValueError(
                 "No reply of type '" + reply_type + "' was found in the replies of the batch request."
                              " Response: '" + str(response) + "'.")
+        return new_sheets
 
     def create_sheets(self, sheet_names):
         """
@@ -135,12 +851,12 @@ class Spreadsheet:
             }
             body["requests"].append(add_sheet_request)
 
-        response = self.client.sheet_service.spreadsheets().batchUpdate(
+        batch_request = self.client.sheet_service.spreadsheets().batchUpdate(
             spreadsheetId=self.id,
             body=body
-        ).execute()
-        self._add_sheets_from_response(response=response, reply_type="addSheet")
-        return [self.get_sheet_by_name(name) for name in sheet_names]
+        )
+        response = self.client.execute(batch_request)
+        return self._add_sheets_from_response(response=response, reply_type="addSheet")
 
     def duplicate_sheet(self, new_sheet_name, sheet_id=None, sheet_name=None):
         """
@@ -166,23 +882,89 @@ class Spreadsheet:
         }
         body["requests"].append(duplicate_sheet_request)
 
-        response = self.client.sheet_service.spreadsheets().batchUpdate(
+        batch_request = self.client.sheet_service.spreadsheets().batchUpdate(
             spreadsheetId=self.id,
             body=body
-        ).execute()
-        self._add_sheets_from_response(response=response, reply_type="duplicateSheet")
-        return self.get_sheet_by_name(new_sheet_name)
+        )
+        response = self.client.execute(batch_request)
+        return self._add_sheets_from_response(response=response, reply_type="duplicateSheet")[0]
+
+    def batch_update(
+            self,
+            requests,
+            max_requests=MAX_BATCH_REQUESTS,
+            max_payload_bytes=MAX_BATCH_PAYLOAD_BYTES,
+            coalesce=True
+    ):
+        """
+        Send batchUpdate requests to the spreadsheet. The single cell writes are
+        first coalesced (see coalesce_update_cells), then the requests are split
+        into chunks bounded in number of requests and payload size (see
+        split_batches), sent in order.
+        :param requests: List of batchUpdate requests.
+        :param max_requests: Maximum number of requests sent in one call.
+        :param max_payload_bytes: Maximum JSON payload size sent in one call.
+        :param coalesce: if False, the requests are sent as they are.
+        :return: The batchUpdate response of the API. When the requests are
+            sent in many chunks, the response of the last chunk, with the
+            replies of every chunk. There is one reply per request sent, so
+            coalesced requests share a reply.
+        :raise BatchCommitError: if a chunk fails. The previous chunks are
+            committed, and the error holds the requests left to commit.
+        """
+        chunks = prepare_batches(
+            requests, max_requests=max_requests, max_payload_bytes=max_payload_bytes, coalesce=coalesce)
+        response = {'spreadsheetId': self.id, 'replies': []}
+        replies = list()
+        try:
+            for chunk_index, chunk in enumerate(chunks):
+                try:
+                    response = self.client.execute(self.batch_update_request(chunk))
+                except HttpError as error:
+                    pending_requests = [request for pending in chunks[chunk_index:] for request in pending]
+                    raise BatchCommitError(chunk_index, len(chunks), replies, pending_requests, error)
+                replies.extend(response.get('replies', []))
+        finally:
+            # even a failed commit may have changed some cells
+            self.invalidate_cache(requests)
+        if len(chunks) > 1:
+            response = dict(response, replies=replies)
+        return response
+
+    def invalidate_cache(self, requests):
+        """
+        Drop the cached range reads (see RangeCache) overlapping the cells
+        written by batchUpdate requests.
+        :param requests: List of batchUpdate requests.
+        """
+        cache = self.client.cache
+        if cache is None:
+            return
+        for request in requests:
+            for sheet_id, bounds in get_written_ranges(request):
+                cache.invalidate(self.id, sheet_id=sheet_id, bounds=bounds)
+
+    def batch_update_request(self, requests):
+        """
+        :param requests: List of batchUpdate requests, sent in one call.
+        :return: The batchUpdate request.
+        """
+        return self.client.sheet_service.spreadsheets().batchUpdate(
+            spreadsheetId=self.id,
+            body={'requests': requests}
+        )
 
     def commit(self):
         if len(self.batches) == 0:
             # Sending a batch update with an empty list of requests
             # would return an error
             return
-        body = {'requests': [self.batches]}
-        response = self.client.sheet_service.spreadsheets().batchUpdate(
-            spreadsheetId=self.id,
-            body=body
-        ).execute()
+        try:
+            response = self.batch_update(self.batches)
+        except BatchCommitError as error:
+            # only keep what is left to commit, so that commit can be retried
+            self.batches = error.pending_requests
+            raise
         self.batches = list()
         return response
 
@@ -190,21 +972,52 @@ class Spreadsheet:
 class Sheet:
     """Sheet object from which Range objects are accessible."""
 
-    def __init__(self, client, spreadsheet, name, sid, grid_properties):
+    def __init__(self, client, spreadsheet, name, sid=None, grid_properties=None):
         """
         Instantiate
         :param client: The sheet client (SpreadsheetApp object).
         :param spreadsheet: The spreadsheet_id of the parent spreadsheet.
         :param name: Name/Title of the sheet (tab).
-        :param sid: The sheet id.
+        :param sid: The sheet id. If None, the sheet properties are requested
+            on first access to the sheet id or grid properties.
         :param grid_properties: The grid properties (row/column count) of the sheet on retrieval.
         """
         self.client = client
         self.spreadsheet = spreadsheet
         self.name = name
-        self.sid = sid
+        self._sid = sid
         self.batches = list()
-        self.grid_properties = grid_properties
+        self._grid_properties = grid_properties
+
+    @property
+    def sid(self):
+        if self._sid is None:
+            self.load_properties()
+        return self._sid
+
+    @sid.setter
+    def sid(self, sid):
+        self._sid = sid
+
+    @property
+    def grid_properties(self):
+        if self._grid_properties is None:
+            self.load_properties()
+        return self._grid_properties
+
+    @grid_properties.setter
+    def grid_properties(self, grid_properties):
+        self._grid_properties = grid_properties
+
+    def load_properties(self):
+        """
+        Request the properties of the sheet: its id, exact name and grid
+        properties.
+        """
+        properties = self.spreadsheet.get_sheet_properties(self.name)
+        self.name = properties["title"]
+        self._sid = properties["sheetId"]
+        self._grid_properties = properties["gridProperties"]
 
     def __repr__(self):
         return '<Sheet object {}>'.format(self.name)
@@ -223,17 +1036,16 @@ class Sheet:
                 """Row and column parameters can not be equal to 0. 
                 The cell A1 is row=1 and column=1"""
             )
-        a1 = convert_coordinates_to_a1(
-            row,
-            column,
-            number_of_row,
-            number_of_column,
-            self.name
-        )
         return Range(
             client=self.client,
             sheet=self,
-            a1=a1,
+            coordinates=RangeCoordinates(
+                row=row,
+                column=column,
+                number_of_rows=number_of_row,
+                number_of_columns=number_of_column,
+                sheet_name=self.name
+            )
         )
 
     def get_range_from_a1(self, a1_notification):
@@ -261,6 +1073,19 @@ class Sheet:
             sheet=self,
         )
 
+    def get_full_range(self):
+        """
+        Get the Range object covering the whole grid of the sheet (every row
+        and column, regardless of content), without any request.
+        :return: Range Object.
+        """
+        return self.get_range(
+            row=1,
+            column=1,
+            number_of_row=self.get_max_rows(),
+            number_of_column=self.get_max_columns()
+        )
+
     def get_max_rows(self):
         """
         Returns the current number of rows in the sheet, regardless of content,
@@ -278,52 +1103,136 @@ class Sheet:
         return self.grid_properties["columnCount"]
 
 
+def skip_empty_cells(cell_parser):
+    """
+    Wrap a cell parser so that empty cells, and cells missing the parsed
+    dimension, are parsed as an empty string. The top-level key of the
+    dimension (see GRID_FIELDS) is checked before parsing, so that cells only
+    holding other dimensions (e.g. formatted cells without a value) do not
+    raise.
+    """
+    key = CELL_PARSER_KEYS.get(cell_parser)
+
+    def parse(cell):
+        if not cell or (key is not None and key not in cell):
+            return ""
+        try:
+            return cell_parser(cell)
+        except KeyError:
+            return ""
+    return parse
+
+
+def check_values_size(range_object, data):
+    """
+    Raise an error if the lengths of a 2D matrix to be set are not matching
+    with Range object coordinates.
+    """
+    if len(data) != range_object.coordinates.number_of_rows:
+        error_message = "Wrong number of rows. {} instead of {}".format(
+            len(data),
+            range_object.coordinates.number_of_rows
+        )
+        raise SizeNotMatchingException(error_message)
+
+    for i, row in enumerate(data):
+        if len(row) != range_object.coordinates.number_of_columns:
+            context = {
+                "i": i,
+                "columns": len(row),
+                "expected": range_object.coordinates.number_of_columns
+            }
+            error_message = "Wrong number of column in row {i}. {columns} instead of {expected}".format(**context)
+            raise SizeNotMatchingException(error_message)
+
+
 def check_size(f):
     """
     Decorator to check length of the 2D matrix to be set. Raise an error if
     lengths are not matching with Range object coordinates.
     """
     def wrapper(range_object, data, batch_to=None):
-        if len(data) != range_object.coordinates.number_of_rows:
-            error_message = "Wrong number of rows. {} instead of {}".format(
-                len(data),
-                range_object.coordinates.number_of_rows
-            )
-            raise SizeNotMatchingException(error_message)
+        check_values_size(range_object, data)
+        return f(range_object, data, batch_to)
 
-        for i, row in enumerate(data):
-            if len(row) != range_object.coordinates.number_of_columns:
-                context = {
-                    "i": i,
-                    "columns": len(row),
-                    "expected": range_object.coordinates.number_of_columns
-                }
-                error_message = "Wrong number of column in row {i}. {columns} instead of {expected}".format(**context)
-                raise SizeNotMatchingException(error_message)
+    return wrapper
 
-        else:
-            return f(range_object, data, batch_to)
 
-    return wrapper
+class RequestsBatch:
+    """
+    Collect requests batched to it (see the batch_to parameters of the range
+    setters), to send them together.
+    """
+
+    def __init__(self):
+        self.batches = list()
 
 
 class Range:
-    def __init__(self, client, sheet, a1=None):
+    # ranges are created for every cell and row accessed, so they are kept light
+    __slots__ = ('client', 'sheet', 'coordinates', '_a1', '_batches')
+
+    def __init__(self, client, sheet, a1=None, coordinates=None):
         """
         Object to represent a range of cells in a sheet.
         :param client:
         :param sheet: parent Sheet object.
-        :param a1:
+        :param a1: A1 notation of the range. If neither the A1 notation nor
+            the coordinates are given, the range is the data range of the sheet.
+        :param coordinates: (Optional) RangeCoordinates of the range, to create
+            it without parsing an A1 notation. The A1 notation is then only
+            computed when needed.
         """
         self.client = client
         self.sheet = sheet
-        # this checks the data range coordinates
-        self.a1 = self.persist_a1_data_range(a1)
-        self.coordinates = convert_a1_to_coordinates(self.a1)
+        if coordinates is not None:
+            self._a1 = None
+            self.coordinates = coordinates
+        else:
+            # this checks the data range coordinates
+            self._a1 = self.persist_a1_data_range(a1)
+            self.coordinates = self.bound_coordinates(convert_a1_to_coordinates(self._a1))
+        self._batches = None
+
+    def bound_coordinates(self, coordinates):
+        """
+        :param coordinates: RangeCoordinates, whose number of rows or columns
+            is None for whole columns or rows (e.g. 'A:C' or '2:5').
+        :return: The coordinates, extended to the sheet grid where unbounded.
+        """
+        if coordinates.number_of_rows is None:
+            coordinates = coordinates._replace(
+                number_of_rows=max(self.sheet.get_max_rows() - coordinates.row + 1, 1))
+        if coordinates.number_of_columns is None:
+            coordinates = coordinates._replace(
+                number_of_columns=max(self.sheet.get_max_columns() - coordinates.column + 1, 1))
+        return coordinates
+
+    @property
+    def a1(self):
+        if self._a1 is None:
+            self._a1 = convert_coordinates_to_a1(
+                row=self.coordinates.row,
+                column=self.coordinates.column,
+                number_of_row=self.coordinates.number_of_rows,
+                number_of_column=self.coordinates.number_of_columns,
+                sheet_name=self.coordinates.sheet_name
+            )
+        return self._a1
 
-        # placeholder for putting requests object if we
-        # want to send multiple set requests in one api call.
-        self.batches = list()
+    @property
+    def batches(self):
+        """
+        Placeholder for putting requests object if we want to send multiple
+        set requests in one api call, created when first used.
+        """
+        if self._batches is None:
+            self._batches = list()
+        return self._batches
+
+    @batches.setter
+    def batches(self, batches):
+        self._batches = batches
 
     def __repr__(self):
         a1 = self.a1 or self.sheet.name
@@ -370,17 +1279,16 @@ class Range:
                 raise ValueError("Tried creating an offset of " + str(num_columns) + " columns.")
             number_of_columns = num_columns
 
-        new_range_a1 = convert_coordinates_to_a1(
-            row=top_row,
-            column=left_column,
-            number_of_row=number_of_rows,
-            number_of_column=number_of_columns,
-            sheet_name=self.coordinates.sheet_name
-        )
         return Range(
             client=self.client,
             sheet=self.sheet,
-            a1=new_range_a1
+            coordinates=RangeCoordinates(
+                row=top_row,
+                column=left_column,
+                number_of_rows=number_of_rows,
+                number_of_columns=number_of_columns,
+                sheet_name=self.coordinates.sheet_name
+            )
         )
 
     @staticmethod
@@ -390,8 +1298,14 @@ class Range:
                 return False
         return True
 
-    def trim_empty_bottom_rows(self):
-        data = self.get_values()
+    def trim_empty_bottom_rows(self, values=None):
+        """
+        Get a new range without the trailing rows that have no value.
+        :param values: (Optional) the values of the range if they were already
+            requested, so they are not requested again.
+        :return: Range object.
+        """
+        data = values if values is not None else self.get_values()
 
         rows_to_trim_from_bottom = 0
         for row_values in reversed(data):
@@ -402,6 +1316,44 @@ class Range:
         new_number_of_rows = self.coordinates.number_of_rows - rows_to_trim_from_bottom
         return self.offset(row_offset=0, column_offset=0, num_rows=new_number_of_rows)
 
+    def trim_empty_right_columns(self, values=None):
+        """
+        Get a new range without the trailing columns that have no value.
+        :param values: (Optional) the values of the range if they were already
+            requested, so they are not requested again.
+        :return: Range object.
+        """
+        data = values if values is not None else self.get_values()
+
+        new_number_of_columns = 0
+        for row_values in data:
+            for column in range(len(row_values), new_number_of_columns, -1):
+                if row_values[column - 1] != '':
+                    new_number_of_columns = column
+                    break
+
+        return self.offset(row_offset=0, column_offset=0, num_columns=new_number_of_columns)
+
+    def iter_rows(self, chunk_rows=1000):
+        """
+        Generator of the values of the range, row by row. The values are
+        requested chunk_rows rows at a time, so only one chunk is kept in
+        memory.
+        :param chunk_rows: Number of rows to request at a time.
+        :return: Generator of the rows values.
+        """
+        if chunk_rows <= 0:
+            raise ValueError("Tried reading chunks of " + str(chunk_rows) + " rows.")
+        number_of_rows = self.coordinates.number_of_rows
+        for first_row in range(0, number_of_rows, chunk_rows):
+            chunk_range = self.offset(
+                row_offset=first_row,
+                column_offset=0,
+                num_rows=min(chunk_rows, number_of_rows - first_row)
+            )
+            for row_values in chunk_range.get_values():
+                yield row_values
+
     def make_get_request(self, field_mask, cell_parser):
         """
         Make a get request for the range.
@@ -409,33 +1361,262 @@ class Range:
         :param cell_parser: Function to run to parse cell data as expected.
         :return: The raw response of the request.
         """
+        grid_data = self.request_grid_data(field_mask)
+        return self.parse_grid_data(grid_data, {"data": cell_parser})["data"]
+
+    def request_grid_data(self, field_mask):
+        """
+        Request the grid data of the range, unless cached by the client cache.
+        :param field_mask: The field mask of the cell data to request.
+        :return: The grid data of the range, as returned by the API. It is
+            shared with the cache, so it must not be modified.
+        """
+        return self.request_cached(
+            field_mask,
+            lambda: self.client.execute(self.grid_data_request(field_mask))["sheets"][0]["data"]
+        )
+
+    def request_values(self):
+        """
+        Request the unformatted values of the range with the values endpoint,
+        unless cached by the client cache.
+        :return: List of the rows of values, as returned by the API (trailing
+            empty rows and cells are missing). It is shared with the cache, so
+            it must not be modified.
+        """
+        return self.request_cached(
+            VALUES_CACHE_MASK,
+            lambda: self.client.execute(self.values_request()).get("values", [])
+        )
+
+    def request_cached(self, field_mask, request_data):
+        """
+        Request data of the range, unless cached by the client cache.
+        :param field_mask: The field mask of the data, keying it in the cache.
+        :param request_data: Function requesting the data.
+        :return: The data, cached or requested.
+        """
+        data = self.get_cached_grid_data(field_mask)
+        if data is not None:
+            return data
+        version = None
+        if self.client.cache is not None and self.client.cache.revalidate:
+            version = self.get_spreadsheet_version()
+            data = self.get_cached_grid_data(field_mask, version)
+            if data is not None:
+                return data
+        data = request_data()
+        self.cache_grid_data(field_mask, data, version)
+        return data
+
+    def get_spreadsheet_version(self):
+        """
+        :return: The version of the spreadsheet, as last checked by the client
+            cache, or requested if not checked for a while.
+        """
+        spreadsheet = self.sheet.spreadsheet
+        version = self.client.cache.get_version(spreadsheet.id)
+        if version is None:
+            version = spreadsheet.get_version()
+            self.client.cache.set_version(spreadsheet.id, version)
+        return version
+
+    def get_cache_key(self, field_mask):
+        return self.sheet.spreadsheet.id, self.a1 or self.sheet.name, field_mask
+
+    def get_cached_grid_data(self, field_mask, version=None):
+        """
+        :param field_mask: The field mask of the cell data.
+        :param version: (Optional) Current version of the spreadsheet, to
+            revalidate an expired read (see RangeCache).
+        :return: The grid data cached by the client cache, or None.
+        """
+        if self.client.cache is None:
+            return None
+        return self.client.cache.get(self.get_cache_key(field_mask), version)
+
+    def cache_grid_data(self, field_mask, grid_data, version=None):
+        """
+        Save the grid data of the range in the client cache, if any.
+        :param field_mask: The field mask of the cell data.
+        :param grid_data: The grid data of the range, as returned by the API.
+        :param version: (Optional) Version of the spreadsheet checked before
+            the read.
+        """
+        if self.client.cache is None:
+            return
+        self.client.cache.set(
+            self.get_cache_key(field_mask), grid_data, sheet=self.sheet, bounds=self.get_grid_bounds(),
+            version=version)
+
+    def get_grid_bounds(self):
+        """
+        :return: Tuple of the start row, end row, start column and end column
+            of the range (0 based indexes, end indexes excluded).
+        """
+        return (
+            self.coordinates.row - 1,
+            self.coordinates.row - 1 + self.coordinates.number_of_rows,
+            self.coordinates.column - 1,
+            self.coordinates.column - 1 + self.coordinates.number_of_columns
+        )
+
+    def invalidate_cached_reads(self):
+        """
+        Drop the reads overlapping the range from the client cache, if any.
+        """
+        if self.client.cache is not None:
+            self.client.cache.invalidate(
+                self.sheet.spreadsheet.id, sheet_id=self.sheet._sid, bounds=self.get_grid_bounds())
+
+    def grid_data_request(self, field_mask):
+        """
+        :param field_mask: The field mask of the cell data to request.
+        :return: The request of the grid data of the range.
+        """
         target_range = self.a1 or self.sheet.name
-        # first we request data to the API
-        request = self.client.sheet_service.spreadsheets().get(
+        return self.client.sheet_service.spreadsheets().get(
             spreadsheetId=self.sheet.spreadsheet.id,
             includeGridData=True,
             ranges=[target_range],
             fields=field_mask
         )
-        response = request.execute()
-        # now we parse the rows from the response using the cell parser
-        data = []
-        values = response["sheets"][0]["data"]
+
+    def values_request(self):
+        """
+        :return: The request of the unformatted values of the range, with the
+            values endpoint.
+        """
+        return self.client.sheet_service.spreadsheets().values().get(
+            spreadsheetId=self.sheet.spreadsheet.id,
+            range=self.a1 or self.sheet.name,
+            majorDimension="ROWS",
+            **VALUES_RENDER_OPTIONS
+        )
+
+    def parse_values(self, rows):
+        """
+        :param rows: List of the rows of values returned by the values
+            endpoint, which omits the trailing empty rows and cells.
+        :return: 2D matrix of size matching range coordinates, missing cells
+            being empty strings.
+        """
+        number_of_rows = self.coordinates.number_of_rows
+        number_of_columns = int(self.coordinates.number_of_columns)
+        matrix = list()
+        for row in rows[:number_of_rows]:
+            data_row = list(row[:number_of_columns])
+            if len(data_row) < number_of_columns:
+                data_row.extend([""] * (number_of_columns - len(data_row)))
+            matrix.append(data_row)
+        matrix.extend([[""] * number_of_columns for _ in range(number_of_rows - len(matrix))])
+        return matrix
+
+    def parse_grid_data(self, grid_data, cell_parsers):
+        """
+        Parse the grid data of the range into one 2D matrix per cell parser.
+        The rows are resolved once, and every missing cell (sparse rows, or
+        rows missing at the end of the response) is parsed as an empty string.
+        :param grid_data: The grid data of the range, as returned by the API.
+        :param cell_parsers: Dictionary of cell parsers, keyed by name. A cell
+            parser can also be a list of cell parsers, one per column.
+        :return: Dictionary of 2D matrices of size matching range coordinates,
+            keyed by the cell parsers names.
+        """
+        number_of_rows = self.coordinates.number_of_rows
         # Assert that number of columns is an integer
         number_of_columns = int(self.coordinates.number_of_columns)
-        for row in range(0, self.coordinates.number_of_rows):
-            data_row = []
-            for column in range(0, number_of_columns):
-                try:
-                    cell = values[0]["rowData"][row]["values"][column]
-                    data_row.append(cell_parser(cell))
 
-                except (KeyError, IndexError):
-                    data_row.append("")
-
-            data.append(data_row)
+        rows_cells = [
+            row.get("values", ())[:number_of_columns]
+            for row in (grid_data[0].get("rowData", ()) if grid_data else ())[:number_of_rows]
+        ]
+        rows_cells.extend([()] * (number_of_rows - len(rows_cells)))
+
+        data = dict()
+        for name, cell_parser in cell_parsers.items():
+            if isinstance(cell_parser, (list, tuple)):
+                column_parsers = [skip_empty_cells(parser) for parser in cell_parser]
+            else:
+                column_parsers = [skip_empty_cells(cell_parser)] * number_of_columns
+
+            matrix = list()
+            for cells in rows_cells:
+                data_row = [parse(cell) for parse, cell in zip(column_parsers, cells)]
+                if len(data_row) < number_of_columns:
+                    data_row.extend([""] * (number_of_columns - len(data_row)))
+                matrix.append(data_row)
+            data[name] = matrix
         return data
 
+    def get_data(self, values=True, notes=False, backgrounds=False, font_colors=False, formulas=False,
+                 fast_values=True):
+        """
+        Get multiple dimensions of the Range with a single request.
+        :param values: Whether to get the values.
+        :param notes: Whether to get the notes.
+        :param backgrounds: Whether to get the backgrounds.
+        :param font_colors: Whether to get the font colors.
+        :param formulas: Whether to get the formulas.
+        :param fast_values: if False, the values are read from the grid data
+            even if the client is in fast values mode, so that dates are read
+            as datetime objects (tables are always read this way).
+        :return: Dictionary of 2D matrices of size matching range coordinates,
+            keyed by dimension name ('values', 'notes', 'backgrounds', ...).
+        """
+        names = get_grid_fields_names(
+            values=values, notes=notes, backgrounds=backgrounds, font_colors=font_colors, formulas=formulas)
+        if fast_values and self.client.fast_values and names == ["values"]:
+            return {"values": self.get_values()}
+        grid_data = self.request_grid_data(get_grid_fields_mask(names))
+        return self.parse_grid_data(
+            grid_data, {name: GRID_FIELDS[name][2] for name in names})
+
+    def get_fresh_data_to_end(self, values=True, notes=False, backgrounds=False, font_colors=False, version=None):
+        """
+        Get multiple dimensions of the Range, extended down to the last row of
+        its sheet, with a single grid data request. The request reads an open
+        ended range (e.g. 'Sheet1!A2:C') and the grid properties of the sheet,
+        which are updated, so that the rows added since the sheet was opened
+        are read too. It bypasses the reads cached by the client cache (the
+        response replaces them) and the fast values mode, so that dates are
+        parsed as usual.
+        :param values: Whether to get the values.
+        :param notes: Whether to get the notes.
+        :param backgrounds: Whether to get the backgrounds.
+        :param font_colors: Whether to get the font colors.
+        :param version: (Optional) Version of the spreadsheet checked before
+            the read, saved with the response in the client cache.
+        :return: Tuple of the extended Range, and the dictionary of its 2D
+            matrices keyed by dimension name ('values', 'notes', ...).
+        """
+        names = get_grid_fields_names(values=values, notes=notes, backgrounds=backgrounds, font_colors=font_colors)
+        field_mask = get_grid_fields_mask(names)
+        open_ended_a1 = "{}!{}{}:{}".format(
+            quote_sheet_name(self.sheet.name),
+            convert_column_to_letter(self.coordinates.column),
+            self.coordinates.row,
+            convert_column_to_letter(self.coordinates.column + self.coordinates.number_of_columns - 1)
+        )
+        request = self.client.sheet_service.spreadsheets().get(
+            spreadsheetId=self.sheet.spreadsheet.id,
+            includeGridData=True,
+            ranges=[open_ended_a1],
+            fields="sheets/properties/gridProperties," + field_mask
+        )
+        sheet_data = self.client.execute(request)["sheets"][0]
+        grid_properties = sheet_data.get("properties", {}).get("gridProperties")
+        if grid_properties is not None:
+            self.sheet.grid_properties = grid_properties
+        extended_range = self.offset(
+            row_offset=0,
+            column_offset=0,
+            num_rows=max(self.sheet.get_max_rows() - self.coordinates.row + 1, 1)
+        )
+        grid_data = sheet_data["data"]
+        extended_range.cache_grid_data(field_mask, grid_data, version)
+        return extended_range, extended_range.parse_grid_data(grid_data, {name: GRID_FIELDS[name][2] for name in names})
+
     def make_set_request(self, field, data, set_parser, batch_to=None):
         """
         Make a set request for the range.
@@ -444,7 +1625,8 @@ class Range:
         :param set_parser: the function to run as a cell parser.
         :param batch_to: Object from which the request must be batched. Object
             must contain a 'batches' attribute.
-        :return: raw response from the API.
+        :return: The batchUpdate response of the API (see
+            Spreadsheet.batch_update), or None if the request is batched.
         """
         # Parsing the rows to be in API format
         rows = []
@@ -453,8 +1635,18 @@ class Range:
             for cell in row:
                 row_data['values'].append(set_parser(cell))
             rows.append(row_data)
+        return self.make_update_cells_request(field, rows, batch_to=batch_to)
 
-        # preparing the request
+    def make_update_cells_request(self, field, rows, batch_to=None):
+        """
+        Make an updateCells request for the range.
+        :param field: the targeted field.
+        :param rows: List of RowData resources, matching range coordinates.
+        :param batch_to: Object from which the request must be batched. Object
+            must contain a 'batches' attribute.
+        :return: The batchUpdate response of the API (see
+            Spreadsheet.batch_update), or None if the request is batched.
+        """
         request = {
             'updateCells': {
                 'range': self.get_grid_range(),
@@ -464,27 +1656,33 @@ class Range:
         }
 
         if batch_to is None:
-            body = {'requests': [request]}
-            return self.client.sheet_service.spreadsheets().batchUpdate(
-                spreadsheetId=self.sheet.spreadsheet.id,
-                body=body
-            ).execute()
+            return self.sheet.spreadsheet.batch_update([request])
 
         return batch_to.batches.append(request)
 
     def get_values(self):
-        data = self.make_get_request(
-            field_mask="sheets/data/rowData/values/effectiveValue,sheets/data/rowData/values/effectiveFormat/numberFormat/type",
-            cell_parser=CellParsers.get_value
-        )
-        return data
+        """
+        Get the values of the Range. In fast values mode, they are read with
+        the values endpoint: dates are then returned as serial numbers.
+        :return: 2D array of the values, of size matching the range coordinates.
+        """
+        if self.client.fast_values:
+            return self.parse_values(self.request_values())
+        field_mask, _, cell_parser = GRID_FIELDS["values"]
+        return self.make_get_request(field_mask=field_mask, cell_parser=cell_parser)
 
     @check_size
     def set_values(self, values, batch_to=None):
         """
-        Set values for the Range.
+        Set values for the Range. In fast values mode, values which are neither
+        formulas nor dates are written with the values endpoint, unless
+        batched.
         :param values: 2D array of values (size must match range coordinates).
         """
+        if batch_to is None and self.client.fast_values:
+            raw_values = get_raw_values(values)
+            if raw_values is not None:
+                return self.update_values(raw_values)
         return self.make_set_request(
             field='userEnteredValue,userEnteredFormat',
             data=values,
@@ -492,6 +1690,24 @@ class Range:
             batch_to=batch_to
         )
 
+    def update_values(self, values):
+        """
+        Write values to the range with the values endpoint, as is (RAW value
+        input): the cells formats are kept.
+        :param values: 2D array of values (size must match range coordinates).
+        :return: raw response from the API.
+        """
+        request = self.client.sheet_service.spreadsheets().values().update(
+            spreadsheetId=self.sheet.spreadsheet.id,
+            range=self.a1 or self.sheet.name,
+            valueInputOption="RAW",
+            body={"values": values}
+        )
+        try:
+            return self.client.execute(request)
+        finally:
+            self.invalidate_cached_reads()
+
     def set_value(self, value, batch_to=None):
         values = list()
         for row in range(0, self.coordinates.number_of_rows):
@@ -508,10 +1724,8 @@ class Range:
             coordinates.
         :return: 2D matrix of the colors in hex format.
         """
-        return self.make_get_request(
-            field_mask="sheets/data/rowData/values/effectiveFormat/backgroundColor",
-            cell_parser=CellParsers.get_background
-        )
+        field_mask, _, cell_parser = GRID_FIELDS["backgrounds"]
+        return self.make_get_request(field_mask=field_mask, cell_parser=cell_parser)
 
     @check_size
     def set_backgrounds(self, backgrounds, batch_to=None):
@@ -540,10 +1754,8 @@ class Range:
         Get the notes of the Range.
         :return: 2D array of the notes, of size matching the range coordinates.
         """
-        return self.make_get_request(
-            field_mask="sheets/data/rowData/values/note",
-            cell_parser=CellParsers.get_note
-        )
+        field_mask, _, cell_parser = GRID_FIELDS["notes"]
+        return self.make_get_request(field_mask=field_mask, cell_parser=cell_parser)
 
     @check_size
     def set_notes(self, notes, batch_to=None):
@@ -573,10 +1785,8 @@ class Range:
         :return: 2D array of the font colors, of size matching the range
             coordinates.
         """
-        return self.make_get_request(
-            field_mask="sheets/data/rowData/values/effectiveFormat/textFormat/foregroundColor",
-            cell_parser=CellParsers.get_font_color
-        )
+        field_mask, _, cell_parser = GRID_FIELDS["font_colors"]
+        return self.make_get_request(field_mask=field_mask, cell_parser=cell_parser)
 
     @check_size
     def set_font_colors(self, colors, batch_to=None):
@@ -605,11 +1815,8 @@ class Range:
         Get the formulas of the Range.
         :return: 2D array of the formulas strings, of size matching the range coordinates.
         """
-        data = self.make_get_request(
-            field_mask="sheets/data/rowData/values/userEnteredValue/formulaValue",
-            cell_parser=CellParsers.get_formula
-        )
-        return data
+        field_mask, _, cell_parser = GRID_FIELDS["formulas"]
+        return self.make_get_request(field_mask=field_mask, cell_parser=cell_parser)
 
     @check_size
     def set_formulas(self, formulas, batch_to=None):
@@ -623,53 +1830,101 @@ class Range:
             "method Range.set_values and they will be interpreted as formulas"
         )
 
+    def get_frame(self, header=True, categorical=False):
+        """
+        Get the values of the Range as a pandas DataFrame (pandas must be
+        installed), built directly from the API response: numbers are float64
+        columns, dates datetime64 columns and strings text columns.
+        :param header: if True, the first row of the range holds the column
+            names. The columns are numbered otherwise.
+        :param categorical: if True, string columns are categorical.
+        :return: DataFrame.
+        """
+        grid_data = self.request_grid_data(GRID_FIELDS["values"][0])
+        return grid_data_to_frame(
+            grid_data,
+            self.coordinates.number_of_rows,
+            int(self.coordinates.number_of_columns),
+            header=header,
+            categorical=categorical
+        )
+
+    def set_frame(self, frame, header=True, batch_to=None):
+        """
+        Set the values of the Range from a pandas DataFrame, serialized
+        straight into the request.
+        :param frame: DataFrame (size, plus the header row, must match range
+            coordinates).
+        :param header: if True, the column names are written in the first row
+            of the range.
+        :param batch_to: Object from which the request must be batched.
+        """
+        number_of_rows = len(frame) + (1 if header else 0)
+        if number_of_rows != self.coordinates.number_of_rows:
+            raise SizeNotMatchingException("Wrong number of rows. {} instead of {}".format(
+                number_of_rows, self.coordinates.number_of_rows))
+        if len(frame.columns) != self.coordinates.number_of_columns:
+            raise SizeNotMatchingException("Wrong number of columns. {} instead of {}".format(
+                len(frame.columns), self.coordinates.number_of_columns))
+        return self.make_update_cells_request(
+            field='userEnteredValue,userEnteredFormat',
+            rows=frame_to_rows(frame, header=header),
+            batch_to=batch_to
+        )
+
     def persist_a1_data_range(self, a1):
         """
         If a1 attribute is None (typically when we get_data_range, it calculates
             the a1 notation and range coordinates based on the number of rows
-            and columns found in the data.
+            and columns found in the data. The values of the sheet are read by
+            chunks of DATA_RANGE_CHUNK_ROWS rows, and only the size of each
+            chunk is kept, so the memory stays bounded whatever the sheet size.
         :param a1: raw response of a request for values to google sheets API.
         """
         if a1 is not None:
             return a1
 
-        request = self.client.sheet_service.spreadsheets().values().get(
-            spreadsheetId=self.sheet.spreadsheet.id,
-            range=self.sheet.name
-        )
-
-        response = request.execute()
-        display_a1 = response["range"]
-        first_cell_a1 = display_a1.split('!')[1].split(':')[0]
+        max_rows = self.sheet.get_max_rows()
+        number_of_rows = 0
+        number_of_columns = 0
+        for first_row in range(1, max_rows + 1, DATA_RANGE_CHUNK_ROWS):
+            if max_rows <= DATA_RANGE_CHUNK_ROWS:
+                chunk_a1 = quote_sheet_name(self.sheet.name)
+            else:
+                chunk_a1 = "{}!{}:{}".format(
+                    quote_sheet_name(self.sheet.name), first_row, min(first_row + DATA_RANGE_CHUNK_ROWS - 1, max_rows))
+            request = self.client.sheet_service.spreadsheets().values().get(
+                spreadsheetId=self.sheet.spreadsheet.id,
+                range=chunk_a1,
+                fields="values"
+            )
+            rows = self.client.execute(request).get("values")
+            if rows:
+                number_of_rows = first_row - 1 + len(rows)
+                number_of_columns = max(number_of_columns, max(len(row) for row in rows))
 
-        if response.get("values") is None:
+        if number_of_rows == 0:
             raise NoDataRangeError('No data found in sheet "{}"'.format(self.sheet.name))
 
-        number_of_rows = len(response["values"])
-        number_of_columns = 0
-        for row in response["values"]:
-            if len(row) > number_of_columns:
-                number_of_columns = len(row)
-
-        first_cell_coordinates = convert_a1_to_coordinates(first_cell_a1)
         return convert_coordinates_to_a1(
-            row=first_cell_coordinates.row,
-            column=first_cell_coordinates.column,
+            row=1,
+            column=1,
             number_of_row=number_of_rows,
             number_of_column=number_of_columns,
             sheet_name=self.sheet.name
         )
 
     def get_cell(self, row, column):
-        row_number = self.coordinates.row + row - 1
-        column_number = self.coordinates.column + column - 1
-        a1 = convert_coordinates_to_a1(
-            row_number, column_number, sheet_name=self.coordinates.sheet_name
-        )
         return Range(
             client=self.client,
             sheet=self.sheet,
-            a1=a1
+            coordinates=RangeCoordinates(
+                row=self.coordinates.row + row - 1,
+                column=self.coordinates.column + column - 1,
+                number_of_rows=1,
+                number_of_columns=1,
+                sheet_name=self.coordinates.sheet_name
+            )
         )
 
     def add_dropdown(self, choices, strict=True, batch_to=None):
@@ -689,10 +1944,11 @@ class Range:
         }
         if batch_to is None:
             body = {'requests': [request]}
-            return self.client.sheet_service.spreadsheets().batchUpdate(
+            batch_request = self.client.sheet_service.spreadsheets().batchUpdate(
                 spreadsheetId=self.sheet.spreadsheet.id,
                 body=body
-            ).execute()
+            )
+            return self.client.execute(batch_request)
 
         return batch_to.batches.append(request)
 
@@ -1,7 +1,15 @@
+import bisect
+import collections
 
-from sheetfu.helpers import convert_coordinates_to_a1
+from sheetfu.exceptions import NoDataRangeError, BatchCommitError
+from sheetfu.frames import make_frame_column, make_frame, frame_to_values
+from sheetfu.helpers import RangeCoordinates
 from sheetfu.model import Range
+from sheetfu.parsers import CellParsers
+from sheetfu.modules.table_columns import ColumnStore
+from sheetfu.modules.table_index import INDEX_TYPES
 from sheetfu.modules.table_selector import TableSelector
+from sheetfu.modules.table_snapshot import write_snapshot, read_snapshot, encode_cell, decode_cell
 
 
 class Table:
@@ -12,26 +20,233 @@ class Table:
             notes=False,
             backgrounds=False,
             font_colors=False,
-            header_row=1
+            header_row=1,
+            single_request=False,
+            columnar=False,
+            data=None
     ):
-        self.full_range = full_range.offset(
+        """
+        :param full_range: Range containing the header row and the items.
+        :param notes: parameter to include the notes of the table.
+        :param backgrounds: parameter to include the backgrounds of the table.
+        :param font_colors: parameter to include the font colors of the table.
+        :param header_row: parameter to specify in which row of the range is
+            the header of the table.
+        :param single_request: if True, the values, notes, backgrounds and font
+            colors are all read with one request, and the trailing empty rows
+            and columns of the range are trimmed from that same response.
+        :param columnar: if True, the items data is kept in one typed column per
+            field (see ColumnStore), and the items are lightweight views of
+            their row in those columns.
+        :param data: (Optional) Data of the range starting at the header row,
+            as returned by Range.get_data (with the values, and the notes,
+            backgrounds and font colors included in the table), to create the
+            table without any request, as with single_request.
+        """
+        # Boolean values that represent if the Table contains this information #
+        self.has_notes = notes
+        self.has_backgrounds = backgrounds
+        self.has_font_colors = font_colors
+
+        self.columnar = columnar
+        self.store = None
+        self.indexes = dict()
+
+        header_range = self.get_header_range(full_range, header_row)
+
+        if single_request or data is not None:
+            table_data, attributes = self._load_single_request(header_range, data)
+        else:
+            self.full_range = header_range.trim_empty_bottom_rows()
+            self.items_range = self.get_items_range()
+            # dates are read as datetime objects, even in fast values mode, so
+            # that the rows written back keep their date format
+            table_data = self.full_range.get_data(values=True, fast_values=False)["values"]
+            attributes = dict()
+
+        self.header = table_data[0]
+        self.items = self.parse_items(values=table_data[1:], **attributes)
+
+        self.batches = list()
+        # version of the spreadsheet at the last refresh (see refresh)
+        self.version = None
+
+    @staticmethod
+    def get_header_range(full_range, header_row=1):
+        """
+        :return: The part of full_range starting at the header row.
+        """
+        return full_range.offset(
             row_offset=(header_row - 1),
             column_offset=0,
             num_rows=(full_range.coordinates.number_of_rows - (header_row - 1))
-        ).trim_empty_bottom_rows()
+        )
+
+    def _load_single_request(self, header_range, data=None):
+        """
+        Read every dimension of the table with a single request, and set the
+        table ranges from the response.
+        :param header_range: Range starting at the header row.
+        :param data: (Optional) The data of header_range, if already read.
+        :return: Tuple of the table values (including header), and a dictionary
+            of the items notes, backgrounds and font colors matrices.
+        """
+        if data is None:
+            data = header_range.get_data(
+                values=True,
+                notes=self.has_notes,
+                backgrounds=self.has_backgrounds,
+                font_colors=self.has_font_colors,
+                fast_values=False
+            )
+        data = dict(data)
+        values = data.pop("values")
+        if all(Range.has_empty_values(row) for row in values):
+            raise NoDataRangeError('No data found in range "{}"'.format(header_range.a1))
+
+        self.full_range = header_range.trim_empty_bottom_rows(
+            values=values).trim_empty_right_columns(values=values)
         self.items_range = self.get_items_range()
 
-        table_data = self.full_range.get_values()
-        self.header = table_data[0]
+        number_of_rows = self.full_range.coordinates.number_of_rows
+        number_of_columns = self.full_range.coordinates.number_of_columns
+        table_data = [row[:number_of_columns] for row in values[:number_of_rows]]
+        attributes = {
+            name: [row[:number_of_columns] for row in matrix[1:number_of_rows]]
+            for name, matrix in data.items()
+        }
+        return table_data, attributes
 
-        # Boolean values that represent if the Table contains this information #
-        self.has_notes = notes
-        self.has_backgrounds = backgrounds
-        self.has_font_colors = font_colors
+    @property
+    def header(self):
+        return self._header
 
-        self.items = self.parse_items(values=table_data[1:])
+    @header.setter
+    def header(self, header):
+        """
+        Setting a new header invalidates the header index, and the items of the
+        table are given the new header.
+        """
+        self._header = header
+        self._header_index = None
+        for item in getattr(self, 'items', list()):
+            item.header = header
+        for field, index in list(getattr(self, 'indexes', dict()).items()):
+            del self.indexes[field]
+            if field in self.header_index:
+                self.create_index(field, kind=index.kind)
 
-        self.batches = list()
+    @property
+    def header_index(self):
+        """
+        Dictionary of the header field names to their column position,
+        built once and shared by every item of the table.
+        """
+        if self._header_index is None:
+            self._header_index = build_header_index(self._header)
+        return self._header_index
+
+    def create_index(self, field, kind="hash"):
+        """
+        Index the items of the table by a field, so that select criteria on
+        that field are resolved by index lookups instead of scanning the items.
+        The index is kept up to date when items are added, deleted, sorted or
+        when their field value is set.
+        :param field: The field name to index.
+        :param kind: 'hash' for equality lookups, or 'sorted' for equality and
+            range lookups.
+        :return: The index object.
+        """
+        if field not in self.header_index:
+            raise ValueError("'{}' is not in header".format(field))
+        if kind not in INDEX_TYPES:
+            raise ValueError("Unknown index kind '{}'. Index kind must be one of: {}.".format(
+                kind, ", ".join(sorted(INDEX_TYPES))))
+        index = INDEX_TYPES[kind](field, self.items)
+        self.indexes[field] = index
+        return index
+
+    def drop_index(self, field):
+        """
+        Remove the index of a field.
+        :param field: The indexed field name.
+        """
+        del self.indexes[field]
+
+    def _update_indexes(self, item, field, old_value, new_value):
+        index = self.indexes.get(field)
+        if index is not None:
+            index.update(item, old_value, new_value)
+
+    def column(self, field):
+        """
+        Get the values of a field for every item of the table.
+        :param field: The field name.
+        :return: List of the values, in the items order.
+        """
+        index = self.header_index[field]
+        if self.store is not None:
+            return self.store.get_column('values', index)
+        return [item.values[index] for item in self.items]
+
+    def to_records(self):
+        """
+        Get every item of the table as a dictionary of field names to values.
+        :return: List of dictionaries, in the items order.
+        """
+        fields = list(self.header_index.items())
+        if self.store is not None:
+            columns = [self.store.get_column('values', index) for _, index in fields]
+            return [
+                {field: column[row] for (field, _), column in zip(fields, columns)}
+                for row in range(len(self.items))
+            ]
+        records = list()
+        for item in self.items:
+            values = item.values
+            records.append({field: values[index] for field, index in fields})
+        return records
+
+    def to_frame(self, categorical=False):
+        """
+        Get the items values as a pandas DataFrame (pandas must be installed),
+        one typed column per field (see Range.get_frame).
+        :param categorical: if True, string columns are categorical.
+        :return: DataFrame.
+        """
+        columns = list()
+        for index in range(len(self.header)):
+            if self.store is not None:
+                cells = self.store.get_column('values', index)
+            else:
+                cells = [item.values[index] for item in self.items]
+            columns.append(make_frame_column(cells, categorical=categorical))
+        return make_frame(self.header, columns)
+
+    @staticmethod
+    def from_frame(frame, full_range, columnar=False):
+        """
+        Create a table from a pandas DataFrame: the header and the rows of the
+        frame are written from the first cell of full_range. The write is
+        batched to the table, and sent on commit.
+        :param frame: DataFrame.
+        :param full_range: Range whose first cell is the first cell of the
+            table header.
+        :param columnar: if True, the items data is kept in columns.
+        :return: Table object.
+        """
+        table_range = full_range.offset(
+            row_offset=0, column_offset=0, num_rows=len(frame) + 1, num_columns=len(frame.columns))
+        values = frame_to_values(frame, header=True)
+        # the table is created from the header only, so that the empty rows of
+        # the frame are not trimmed from the table as they would be from a sheet
+        table = Table(table_range.offset(row_offset=0, column_offset=0, num_rows=1), columnar=columnar,
+                      data={'values': values[:1]})
+        table.full_range = table_range
+        table.items_range = table.get_items_range()
+        table.items = table.parse_items(values=values[1:])
+        table_range.set_frame(frame, header=True, batch_to=table)
+        return table
 
     def __len__(self):
         return len(self.items)
@@ -45,7 +260,7 @@ class Table:
     @staticmethod
     def get_table_from_sheet(spreadsheet, sheet_name, notes=False,
                              backgrounds=False, font_colors=False,
-                             header_row=1):
+                             header_row=1, single_request=False):
         """
         Method to create a table from a whole sheet of a spreadsheet.
         This method assumes the header row is 1.
@@ -57,12 +272,99 @@ class Table:
         :param font_colors: parameter to include the font colors of a sheet.
         :param header_row: parameter to specify in which row is the header of
         the table.
+        :param single_request: parameter to read the whole table with only one
+        request, instead of first requesting the data range of the sheet.
 
         :return: List of Items containing only filtered items or and empty List.
 
         """
-        data_range = spreadsheet.get_sheet_by_name(sheet_name).get_data_range()
-        return Table(data_range, notes, backgrounds, font_colors, header_row)
+        sheet = spreadsheet.get_sheet_by_name(sheet_name)
+        if single_request:
+            data_range = sheet.get_full_range()
+        else:
+            data_range = sheet.get_data_range()
+        return Table(data_range, notes, backgrounds, font_colors, header_row, single_request)
+
+    @staticmethod
+    def iter_items(full_range, notes=False, backgrounds=False, font_colors=False,
+                   header_row=1, chunk_rows=1000, max_empty_rows=None):
+        """
+        Generator of the items of a table, reading chunk_rows items per request
+        so that memory stays bounded, whatever the size of the table.
+
+        The header row is read first, and gives the width of the table (its
+        trailing empty columns are trimmed). Items are then read chunk by chunk
+        until the end of the range: blank rows are yielded when followed by
+        other items, whatever their number. Use Sheet.get_full_range() to
+        stream a whole sheet, its size being known from the sheet properties
+        without any request.
+
+        The items of each chunk belong to a Table holding only that chunk: the
+        items range of item.table is the chunk, and item.row_index is the index
+        of the item in item.table.items. Their changes are batched to that
+        table, and can be committed from there.
+
+        :param full_range: Range containing the header row and the items.
+        :param notes: parameter to include the notes of the items.
+        :param backgrounds: parameter to include the backgrounds of the items.
+        :param font_colors: parameter to include the font colors of the items.
+        :param header_row: parameter to specify in which row of the range is
+            the header of the table.
+        :param chunk_rows: number of items to read per request.
+        :param max_empty_rows: (Optional) number of consecutive empty rows
+            after which the table is considered to end, to stop reading before
+            the end of the range. By default, the whole range is read.
+        :return: Generator of Items.
+        """
+        if chunk_rows <= 0:
+            raise ValueError("Tried reading chunks of " + str(chunk_rows) + " rows.")
+
+        header_range = full_range.offset(row_offset=(header_row - 1), column_offset=0, num_rows=1)
+        header_table = Table(header_range, notes, backgrounds, font_colors, single_request=True)
+        header_only_range = header_table.full_range
+
+        number_of_items = full_range.get_max_row() - header_only_range.get_row()
+        empty_items = list()
+        for first_item in range(0, number_of_items, chunk_rows):
+            chunk_range = header_only_range.offset(
+                row_offset=(first_item + 1),
+                column_offset=0,
+                num_rows=min(chunk_rows, number_of_items - first_item)
+            )
+            data = chunk_range.get_data(
+                values=True, notes=notes, backgrounds=backgrounds, font_colors=font_colors, fast_values=False)
+
+            table = Table(
+                header_only_range, notes, backgrounds, font_colors,
+                data={'values': [header_table.header]}
+            )
+            table.full_range = header_only_range.offset(
+                row_offset=0,
+                column_offset=0,
+                num_rows=(first_item + chunk_range.coordinates.number_of_rows + 1)
+            )
+            table.items_range = chunk_range
+            for row_number, row_values in enumerate(data["values"]):
+                item = Item(
+                    parent_table=table,
+                    row_index=row_number,
+                    header=table.header,
+                    values=row_values,
+                    notes=data["notes"][row_number] if notes else None,
+                    backgrounds=data["backgrounds"][row_number] if backgrounds else None,
+                    font_colors=data["font_colors"][row_number] if font_colors else None
+                )
+                table.items.append(item)
+
+                # empty items are only yielded when followed by other items
+                empty_items.append(item)
+                if not Range.has_empty_values(row_values):
+                    for empty_or_current_item in empty_items:
+                        yield empty_or_current_item
+                    empty_items = list()
+
+            if max_empty_rows is not None and len(empty_items) >= max_empty_rows:
+                return
 
     def get_items_range(self):
         # We need to check for the case where the table has no items,
@@ -74,16 +376,40 @@ class Table:
             row_offset=1, column_offset=0, num_rows=(full_range_num_rows - 1)
         )
 
-    def parse_items(self, values):
+    def parse_items(self, values, notes=None, backgrounds=None, font_colors=None):
         items = list()
         if not self.items_range:
             return items
 
         empty_list = [None] * self.items_range.coordinates.number_of_rows
 
-        notes = self.items_range.get_notes() if self.has_notes else list(empty_list)
-        backgrounds = self.items_range.get_backgrounds() if self.has_backgrounds else list(empty_list)
-        font_colors = self.items_range.get_font_colors() if self.has_font_colors else list(empty_list)
+        if not self.has_notes:
+            notes = list(empty_list)
+        elif notes is None:
+            notes = self.items_range.get_notes()
+
+        if not self.has_backgrounds:
+            backgrounds = list(empty_list)
+        elif backgrounds is None:
+            backgrounds = self.items_range.get_backgrounds()
+
+        if not self.has_font_colors:
+            font_colors = list(empty_list)
+        elif font_colors is None:
+            font_colors = self.items_range.get_font_colors()
+
+        if self.columnar:
+            self.store = ColumnStore(
+                number_of_columns=len(self.header),
+                values=values,
+                notes=notes if self.has_notes else None,
+                backgrounds=backgrounds if self.has_backgrounds else None,
+                font_colors=font_colors if self.has_font_colors else None
+            )
+            return [
+                Item(row_index=row_number, header=self.header, values=None, parent_table=self)
+                for row_number in range(0, self.items_range.coordinates.number_of_rows)
+            ]
 
         for row_number in range(0, self.items_range.coordinates.number_of_rows):
 
@@ -101,30 +427,105 @@ class Table:
 
     def add_one(self, item_dict):
         values = [item_dict.get(label) for label in self.header]
-        new_item = Item(
-            parent_table=self,
-            row_index=len(self.items),
-            header=self.header,
-            values=values,
-            notes=[""] * len(self.header) if self.has_notes else None,
-            backgrounds=[""] * len(self.header) if self.has_backgrounds else None,
-            font_colors=[""] * len(self.header) if self.has_font_colors else None,
-        )
+        if self.columnar:
+            self._get_store().append(values)
+            new_item = Item(
+                parent_table=self,
+                row_index=len(self.items),
+                header=self.header,
+                values=None
+            )
+        else:
+            new_item = Item(
+                parent_table=self,
+                row_index=len(self.items),
+                header=self.header,
+                values=values,
+                notes=[""] * len(self.header) if self.has_notes else None,
+                backgrounds=[""] * len(self.header) if self.has_backgrounds else None,
+                font_colors=[""] * len(self.header) if self.has_font_colors else None,
+            )
         self.full_range = self.full_range.offset(
             row_offset=0,
             column_offset=0,
             num_rows=self.full_range.coordinates.number_of_rows + 1)
         self.items_range = self.get_items_range()
         self.items.append(new_item)
+        for index in self.indexes.values():
+            index.add(new_item)
         new_item.get_range().set_values([values], batch_to=self)
         return new_item
 
+    def add_many(self, items_dicts):
+        """
+        Add many items at the end of the table in one step: the table ranges
+        are extended once, and the new rows are written with a single
+        updateCells request, which also clears the notes, backgrounds and font
+        colors of the rows when they are part of the table. The sheet grid is
+        extended first if the table grows past the last row of the sheet.
+        :param items_dicts: List of dictionaries of the field values of the new
+            items.
+        :return: List of the new Item objects.
+        """
+        if not items_dicts:
+            return list()
+        number_of_columns = len(self.header)
+        values = [[item_dict.get(label) for label in self.header] for item_dict in items_dicts]
+        first_row_index = len(self.items)
+
+        new_items = list()
+        if self.columnar:
+            store = self._get_store()
+            for row_index, row_values in enumerate(values, first_row_index):
+                store.append(row_values)
+                new_items.append(Item(parent_table=self, row_index=row_index, header=self.header, values=None))
+        else:
+            for row_index, row_values in enumerate(values, first_row_index):
+                new_items.append(Item(
+                    parent_table=self,
+                    row_index=row_index,
+                    header=self.header,
+                    values=row_values,
+                    notes=[""] * number_of_columns if self.has_notes else None,
+                    backgrounds=[""] * number_of_columns if self.has_backgrounds else None,
+                    font_colors=[""] * number_of_columns if self.has_font_colors else None,
+                ))
+
+        new_rows_range = self.full_range.offset(
+            row_offset=self.full_range.coordinates.number_of_rows,
+            column_offset=0,
+            num_rows=len(values))
+        self.full_range = self.full_range.offset(
+            row_offset=0,
+            column_offset=0,
+            num_rows=self.full_range.coordinates.number_of_rows + len(values))
+        self.items_range = self.get_items_range()
+        self.items.extend(new_items)
+        for index in self.indexes.values():
+            for new_item in new_items:
+                index.add(new_item)
+        self._generate_append_rows_batches(new_rows_range, values)
+        return new_items
+
     def sort(self, field, reverse=False):
+        """
+        Sort the items of the table by a field. Only the blocks of rows whose
+        item changed are written to the sheet.
+        :param field: The field name to sort by.
+        :param reverse: if True, the items are sorted in descending order.
+        """
         if not self.items_range:
             return
-        self.items.sort(key=lambda item: item.get_field_value(field), reverse=reverse)
+        previous_items = list(self.items)
+        if self.columnar:
+            column = self.store.columns['values'][self.header_index[field]]
+            permutation = sorted(range(len(self.items)), key=column.__getitem__, reverse=reverse)
+            self.store.reorder(permutation)
+            self.items = [self.items[index] for index in permutation]
+        else:
+            self.items.sort(key=lambda item: item.get_field_value(field), reverse=reverse)
         self._recalculate_item_indexes()
-        self._generate_full_items_range_batches()
+        self._generate_changed_rows_batches(previous_items)
 
     def delete_items(self, items_to_delete):
         """
@@ -152,16 +553,23 @@ class Table:
         """
         if type(indexes_to_delete) is not list:
             indexes_to_delete = [indexes_to_delete]
+        indexes_to_delete = sorted(set(indexes_to_delete))
+        previous_items = list(self.items)
 
-        for index in sorted(indexes_to_delete, reverse=True):
+        for index in reversed(indexes_to_delete):
             if index >= len(self.items):
                 raise ValueError("Tried to delete item with index " + str(index) +
                                  " in a table that only has " + str(len(self.items)) + " items.")
+            for field_index in self.indexes.values():
+                field_index.remove(self.items[index])
+            self.items[index]._detach()
             del self.items[index]
+            if self.columnar:
+                self.store.delete([index])
 
         self._recalculate_item_indexes()
 
-        self._generate_delete_intitial_items_range_batch()
+        self._generate_delete_rows_batches(previous_items)
 
         self.full_range = self.full_range.offset(
             row_offset=0,
@@ -169,8 +577,6 @@ class Table:
             num_rows=self.full_range.coordinates.number_of_rows - len(indexes_to_delete))
         self.items_range = self.get_items_range()
 
-        self._generate_full_items_range_batches()
-
     def delete_all(self):
         """
         Method to delete all items of the Table. This will set items_range to
@@ -179,14 +585,35 @@ class Table:
         """
         if self.items_range is None:
             return
-        self._generate_delete_intitial_items_range_batch()
+        self._generate_clear_range_batch(self.items_range)
         items_to_delete = len(self.items)
         self.full_range = self.full_range.offset(
             row_offset=0,
             column_offset=0,
             num_rows=self.full_range.coordinates.number_of_rows - items_to_delete)
         self.items_range = None
+        for item in self.items:
+            item._detach()
         self.items = list()
+        self.store = None
+        for field, index in list(self.indexes.items()):
+            self.create_index(field, kind=index.kind)
+
+    def _get_store(self):
+        """
+        Get the column store of a columnar table, creating it if the table has
+        no item yet.
+        """
+        if self.store is None:
+            empty_matrix = list()
+            self.store = ColumnStore(
+                number_of_columns=len(self.header),
+                values=empty_matrix,
+                notes=empty_matrix if self.has_notes else None,
+                backgrounds=empty_matrix if self.has_backgrounds else None,
+                font_colors=empty_matrix if self.has_font_colors else None
+            )
+        return self.store
 
     def _recalculate_item_indexes(self):
         """
@@ -212,11 +639,13 @@ class Table:
         if self.has_font_colors and font_colors is not None:
             range.set_font_colors(font_colors, batch_to=self)
 
-    def _generate_full_items_range_batches(self):
-        if self.items_range is None:
-            return
+    def _get_items_matrices(self, items):
+        """
+        :return: Tuple of the values, notes, backgrounds and font colors
+            matrices of the items, as written to the sheet.
+        """
         table_values, table_notes, table_backgrounds, table_font_colors = list(), list(), list(), list()
-        for item in self.items:
+        for item in items:
             item_values, item_notes, item_backgrounds, item_font_colors = list(), list(), list(), list()
             for field_name in self.header:
                 item_values.append(item.get_field_value(field_name))
@@ -230,119 +659,536 @@ class Table:
             table_notes.append(item_notes)
             table_backgrounds.append(item_backgrounds)
             table_font_colors.append(item_font_colors)
+        return table_values, table_notes, table_backgrounds, table_font_colors
 
+    def _generate_items_rows_batches(self, start_row_index, items):
+        """
+        Write the items to the consecutive rows of the items range starting at
+        start_row_index.
+        """
+        table_values, table_notes, table_backgrounds, table_font_colors = self._get_items_matrices(items)
         self._generate_set_own_range_values_batches(
-            range=self.items_range,
+            range=self.items_range.offset(row_offset=start_row_index, column_offset=0, num_rows=len(items)),
             values=table_values,
             notes=table_notes,
             backgrounds=table_backgrounds,
             font_colors=table_font_colors
         )
 
-    def _generate_delete_intitial_items_range_batch(self):
-        if self.items_range is None:
-            return
-        empty_column_values = [""] * self.items_range.coordinates.number_of_columns
-        empty_values = [empty_column_values] * self.items_range.coordinates.number_of_rows
-        self._generate_set_own_range_values_batches(range=self.items_range, values=empty_values)
+    def _generate_append_rows_batches(self, rows_range, values):
+        """
+        Write new rows below the table with a single updateCells request,
+        preceded by an appendDimension request if the rows go past the last
+        row of the sheet.
+        :param rows_range: Range of the new rows.
+        :param values: 2D matrix of the values of the new rows.
+        """
+        sheet = rows_range.sheet
+        last_row = rows_range.coordinates.row + rows_range.coordinates.number_of_rows - 1
+        max_rows = sheet.get_max_rows()
+        if last_row > max_rows:
+            self.batches.append({
+                'appendDimension': {
+                    'sheetId': sheet.sid,
+                    'dimension': 'ROWS',
+                    'length': last_row - max_rows
+                }
+            })
+            # later additions must not extend the grid again
+            sheet.grid_properties = dict(sheet.grid_properties, rowCount=last_row)
+
+        fields = 'userEnteredValue,userEnteredFormat'
+        if self.has_notes:
+            fields += ',note'
+        rows = list()
+        for row_values in values:
+            cells = list()
+            for value in row_values:
+                cell = CellParsers.set_value(value)
+                if self.has_notes:
+                    cell.update(CellParsers.set_note(''))
+                if self.has_backgrounds:
+                    cell.setdefault('userEnteredFormat', dict()).update(
+                        CellParsers.set_background('')['userEnteredFormat'])
+                if self.has_font_colors:
+                    cell.setdefault('userEnteredFormat', dict()).update(
+                        CellParsers.set_font_color('')['userEnteredFormat'])
+                cells.append(cell)
+            rows.append({'values': cells})
+        rows_range.make_update_cells_request(fields, rows, batch_to=self)
+
+    def _generate_changed_rows_batches(self, previous_items):
+        """
+        Write the rows whose content changed since the items were in the
+        previous_items order (the order of the rows in the sheet), one request
+        per block of consecutive changed rows.
+        :param previous_items: List of the items in their previous order.
+        """
+        changed_rows = list()
+        for row_index, (item, previous_item) in enumerate(zip(self.items, previous_items)):
+            if item is previous_item:
+                continue
+            if self._get_items_matrices([item]) != self._get_items_matrices([previous_item]):
+                changed_rows.append(row_index)
+        for start_row_index, number_of_rows in get_consecutive_blocks(changed_rows):
+            self._generate_items_rows_batches(
+                start_row_index, self.items[start_row_index:start_row_index + number_of_rows])
+
+    def _generate_delete_rows_batches(self, previous_items):
+        """
+        Write the items range after items were deleted: the rows whose content
+        changed as the items below the deleted ones moved up are written again,
+        and the rows freed at the bottom of the items range are cleared. Unlike
+        a deleteRange request, this leaves the cells below the table in place.
+        :param previous_items: List of the items before the deletion (the
+            order of the rows in the sheet).
+        """
+        self._generate_changed_rows_batches(previous_items)
+        freed_range = self.items_range.offset(
+            row_offset=len(self.items),
+            column_offset=0,
+            num_rows=len(previous_items) - len(self.items)
+        )
+        self._generate_clear_range_batch(freed_range)
+
+    def _generate_clear_range_batch(self, range):
+        """
+        Clear the values (and their formats, and notes if the table has notes)
+        of a range, without sending any cell data.
+        """
+        fields = 'userEnteredValue,userEnteredFormat'
+        if self.has_notes:
+            fields += ',note'
+        self.batches.append({
+            'updateCells': {
+                'range': range.get_grid_range(),
+                'fields': fields
+            }
+        })
 
     def commit(self):
         if len(self.batches) == 0:
             # Sending a batch update with an empty list of requests would return
             # an error
             return
-        body = {'requests': [self.batches]}
-        response = self.full_range.client.sheet_service.spreadsheets().batchUpdate(
-            spreadsheetId=self.full_range.sheet.spreadsheet.id,
-            body=body
-        ).execute()
+        try:
+            response = self.full_range.sheet.spreadsheet.batch_update(self.batches)
+        except BatchCommitError as error:
+            # only keep what is left to commit, so that commit can be retried
+            self.batches = error.pending_requests
+            raise
         self.batches = list()
         return response
 
+    def refresh(self, check_version=False):
+        """
+        Reload the table from the sheet with a single grid data request (which
+        bypasses the client cache and the fast values mode), and patch the
+        items in place: the items are matched to the new rows by their values
+        (see _match_items), the items of unchanged rows are kept as
+        they are, the items of changed rows are updated, and items are removed
+        and created for the removed and added rows. Item objects and field
+        indexes stay valid.
+        :param check_version: if True, the version of the spreadsheet is
+            requested first (see Spreadsheet.get_version), and the table is
+            only reloaded if it changed since the last refresh.
+        :return: True if the table was reloaded.
+        """
+        if len(self.batches) > 0:
+            raise ValueError("The table has changes that are not committed. Commit them before refreshing the table.")
+        version = None
+        if check_version:
+            version = self.full_range.sheet.spreadsheet.get_version()
+            if version == self.version:
+                return False
+
+        header_range, data = self.full_range.get_fresh_data_to_end(
+            values=True,
+            notes=self.has_notes,
+            backgrounds=self.has_backgrounds,
+            font_colors=self.has_font_colors,
+            version=version
+        )
+        values = data["values"]
+        if all(Range.has_empty_values(row) for row in values):
+            raise NoDataRangeError('No data found in range "{}"'.format(header_range.a1))
+        full_range = header_range.trim_empty_bottom_rows(values=values)
+        number_of_rows = full_range.coordinates.number_of_rows
+        rows = {name: matrix[1:number_of_rows] for name, matrix in data.items()}
+
+        matched_items, removed_items = self._match_items(rows["values"])
+
+        changed_items = list()
+        for row_number, item in enumerate(matched_items):
+            if item is not None and self._get_item_rows(item) != {name: rows[name][row_number] for name in rows}:
+                changed_items.append(item)
+        for item in removed_items + changed_items:
+            for index in self.indexes.values():
+                index.remove(item)
+
+        if self.columnar:
+            for item in removed_items:
+                item._detach()
+            self.store = ColumnStore(
+                number_of_columns=len(self.header),
+                values=rows["values"],
+                notes=rows.get("notes"),
+                backgrounds=rows.get("backgrounds"),
+                font_colors=rows.get("font_colors")
+            )
+        changed = set(changed_items)
+        items = list()
+        for row_number, item in enumerate(matched_items):
+            # columnar items are views of the new store
+            row = dict() if self.columnar else {name: rows[name][row_number] for name in rows}
+            if item is None:
+                item = Item(
+                    parent_table=self,
+                    row_index=row_number,
+                    header=self.header,
+                    values=row.get("values"),
+                    notes=row.get("notes"),
+                    backgrounds=row.get("backgrounds"),
+                    font_colors=row.get("font_colors")
+                )
+                changed_items.append(item)
+            elif item in changed:
+                for name, cells in row.items():
+                    setattr(item, name, cells)
+            items.append(item)
+        self.items = items
+        self._recalculate_item_indexes()
+        for item in changed_items:
+            for index in self.indexes.values():
+                index.add(item)
+
+        self.full_range = full_range
+        self.items_range = self.get_items_range()
+        if values[0] != self.header:
+            self.header = values[0]
+        if check_version:
+            self.version = version
+        return True
+
+    def _match_items(self, rows_values):
+        """
+        Match the items to new rows of values, in linear time (unlike a diff
+        of the rows, which is quadratic when rows repeat): every row is first
+        matched to the first unmatched item with the same values. Then each run
+        of rows left between two matched rows is matched in order to the items
+        left between the items of these two rows: those are the items whose
+        row changed.
+        :param rows_values: List of the new rows values.
+        :return: Tuple of the list of the items matched to each row (None for
+            the added rows), and of the list of the removed items.
+        """
+        items_by_values = dict()
+        for item in self.items:
+            items_by_values.setdefault(tuple(item.values), collections.deque()).append(item)
+        matched_items = list()
+        for row_values in rows_values:
+            same_items = items_by_values.get(tuple(row_values))
+            matched_items.append(same_items.popleft() if same_items else None)
+
+        left_items = sorted(
+            (item for same_items in items_by_values.values() for item in same_items),
+            key=lambda item: item.row_index
+        )
+        left_indexes = [item.row_index for item in left_items]
+        used = set()
+        row_number = 0
+        while row_number < len(matched_items):
+            if matched_items[row_number] is not None:
+                row_number += 1
+                continue
+            run_end = row_number
+            while run_end < len(matched_items) and matched_items[run_end] is None:
+                run_end += 1
+            previous_index = matched_items[row_number - 1].row_index if row_number > 0 else -1
+            next_index = matched_items[run_end].row_index if run_end < len(matched_items) else len(self.items)
+            position = bisect.bisect_right(left_indexes, previous_index)
+            while row_number < run_end and position < len(left_items) and left_indexes[position] < next_index:
+                if position not in used:
+                    used.add(position)
+                    matched_items[row_number] = left_items[position]
+                    row_number += 1
+                position += 1
+            row_number = run_end
+        removed_items = [item for position, item in enumerate(left_items) if position not in used]
+        return matched_items, removed_items
+
+    def _get_item_rows(self, item):
+        """
+        :return: Dictionary of the item rows of the dimensions of the table.
+        """
+        rows = {"values": item.values}
+        if self.has_notes:
+            rows["notes"] = item.notes
+        if self.has_backgrounds:
+            rows["backgrounds"] = item.backgrounds
+        if self.has_font_colors:
+            rows["font_colors"] = item.font_colors
+        return rows
+
+    def save_snapshot(self, path):
+        """
+        Save the table to a local snapshot file (see table_snapshot): its
+        header, items values (notes, backgrounds and font colors if included),
+        and its range, so that it can be loaded without any request.
+        :param path: Path of the snapshot file.
+        """
+        if len(self.batches) > 0:
+            raise ValueError("The table has changes that are not committed. Commit them before saving the table.")
+        sheet = self.full_range.sheet
+        metadata = {
+            'spreadsheet_id': sheet.spreadsheet.id,
+            'sheet_name': sheet.name,
+            'sheet_id': sheet._sid,
+            'grid_properties': sheet._grid_properties,
+            'a1': self.full_range.a1,
+            'header': [encode_cell(cell) for cell in self.header],
+            'notes': self.has_notes,
+            'backgrounds': self.has_backgrounds,
+            'font_colors': self.has_font_colors,
+            'columnar': self.columnar,
+            'version': self.version,
+        }
+        attributes = ['values']
+        attributes.extend(
+            attribute for attribute, included in (
+                ('notes', self.has_notes), ('backgrounds', self.has_backgrounds), ('font_colors', self.has_font_colors)
+            ) if included
+        )
+        columns = {
+            attribute: [self._get_attribute_column(attribute, index) for index in range(len(self.header))]
+            for attribute in attributes
+        }
+        write_snapshot(path, metadata, columns)
+
+    @staticmethod
+    def load_snapshot(path, client):
+        """
+        Load a table from a snapshot file (see save_snapshot), without any
+        request. The table can then be refreshed or committed as usual.
+        :param path: Path of the snapshot file.
+        :param client: SpreadsheetApp used by the table.
+        :return: Table object.
+        """
+        metadata, columns = read_snapshot(path)
+        spreadsheet = client.open_by_id(metadata['spreadsheet_id'])
+        sheet = spreadsheet.get_sheet(
+            name=metadata['sheet_name'], sid=metadata['sheet_id'], grid_properties=metadata['grid_properties'])
+        header = [decode_cell(cell) for cell in metadata['header']]
+        data = {
+            attribute: [list(header)] + [list(row) for row in zip(*attribute_columns)]
+            for attribute, attribute_columns in columns.items()
+        }
+        table = Table(
+            sheet.get_range_from_a1(metadata['a1']),
+            notes=metadata['notes'],
+            backgrounds=metadata['backgrounds'],
+            font_colors=metadata['font_colors'],
+            columnar=metadata['columnar'],
+            data=data
+        )
+        table.version = metadata['version']
+        return table
+
+    def _get_attribute_column(self, attribute, index):
+        """
+        :return: List of the cells of a column of the items, for one attribute
+            ('values', 'notes', 'backgrounds' or 'font_colors').
+        """
+        if self.store is not None:
+            return self.store.get_column(attribute, index)
+        return [getattr(item, attribute)[index] for item in self.items]
+
     def select(self, criteria):
 
-        return TableSelector(self.items, criteria).execute()
+        return TableSelector(self.items, criteria, indexes=self.indexes).execute()
 
 
 class Item:
 
+    __slots__ = (
+        'row_index', 'header', 'table',
+        '_values', '_notes', '_backgrounds', '_font_colors'
+    )
+
     def __init__(self, row_index, header, values, notes=None, backgrounds=None,
                  font_colors=None, parent_table=None):
+        """
+        An Item is a row of a table. When values is None and the parent table
+        is columnar, the Item is a view of its row in the table column store.
+        """
         self.row_index = row_index
         self.header = header
-        self.values = values
-        self.notes = notes
-        self.backgrounds = backgrounds
-        self.font_colors = font_colors
+        self._values = values
+        self._notes = notes
+        self._backgrounds = backgrounds
+        self._font_colors = font_colors
 
         # needed so we can commit things at table level easily
         self.table = parent_table
 
+    def _is_view(self):
+        return self._values is None and self.table is not None and self.table.store is not None
+
+    def _detach(self):
+        """
+        Copy the row of a columnar item out of the column store, before the row
+        is removed from the table: the item then keeps its own data, instead
+        of viewing the row that takes its place in the store.
+        """
+        if not self._is_view():
+            return
+        store = self.table.store
+        self._values = store.get_row('values', self.row_index)
+        self._notes = store.get_row('notes', self.row_index)
+        self._backgrounds = store.get_row('backgrounds', self.row_index)
+        self._font_colors = store.get_row('font_colors', self.row_index)
+
+    def _get_row(self, attribute):
+        if self._is_view():
+            return self.table.store.get_row(attribute, self.row_index)
+        return getattr(self, '_' + attribute)
+
+    def _set_row(self, attribute, cells):
+        if self._is_view():
+            self.table.store.set_row(attribute, self.row_index, cells)
+        else:
+            setattr(self, '_' + attribute, cells)
+
+    def _get_cell(self, attribute, index):
+        if self._is_view():
+            return self.table.store.get(attribute, self.row_index, index)
+        return getattr(self, '_' + attribute)[index]
+
+    def _set_cell(self, attribute, index, cell):
+        if self._is_view():
+            if self.table.store.has(attribute):
+                self.table.store.set(attribute, self.row_index, index, cell)
+            return
+        cells = getattr(self, '_' + attribute)
+        if cells:
+            cells[index] = cell
+
+    @property
+    def values(self):
+        return self._get_row('values')
+
+    @values.setter
+    def values(self, values):
+        self._set_row('values', values)
+
+    @property
+    def notes(self):
+        return self._get_row('notes')
+
+    @notes.setter
+    def notes(self, notes):
+        self._set_row('notes', notes)
+
+    @property
+    def backgrounds(self):
+        return self._get_row('backgrounds')
+
+    @backgrounds.setter
+    def backgrounds(self, backgrounds):
+        self._set_row('backgrounds', backgrounds)
+
+    @property
+    def font_colors(self):
+        return self._get_row('font_colors')
+
+    @font_colors.setter
+    def font_colors(self, font_colors):
+        self._set_row('font_colors', font_colors)
+
+    @property
+    def header_index(self):
+        """
+        Dictionary of the header field names to their column position. Items
+        sharing the header of their table use the table header index.
+        """
+        if self.table is not None and self.header is self.table.header:
+            return self.table.header_index
+        return build_header_index(self.header)
+
     def get_index(self, field_name):
-        return self.header.index(field_name)
+        try:
+            return self.header_index[field_name]
+        except KeyError:
+            raise ValueError("'{}' is not in header".format(field_name))
 
     def get_field_value(self, target_field):
-        return self.values[self.get_index(target_field)]
+        return self._get_cell('values', self.get_index(target_field))
 
     def get_field_note(self, target_field):
         if not self.table.has_notes:
             raise AttributeError(
                 "The table was not built reading the notes of the sheet.")
-        return self.notes[self.get_index(target_field)]
+        return self._get_cell('notes', self.get_index(target_field))
 
     def get_field_background(self, target_field):
         if not self.table.has_backgrounds:
             raise AttributeError(
                 "The table was not built reading the backgrounds of the sheet.")
-        return self.backgrounds[self.get_index(target_field)]
+        return self._get_cell('backgrounds', self.get_index(target_field))
 
     def get_field_font_color(self, target_field):
         if not self.table.has_font_colors:
             raise AttributeError(
                 "The table was not built reading the font colors of the sheet.")
-        return self.font_colors[self.get_index(target_field)]
+        return self._get_cell('font_colors', self.get_index(target_field))
 
     def get_range(self):
-        a1 = convert_coordinates_to_a1(
-            row= self.table.items_range.coordinates.row + self.row_index,
-            column=self.table.items_range.coordinates.column,
-            number_of_row=1,
-            number_of_column=self.table.items_range.coordinates.number_of_columns,
-            sheet_name=self.table.items_range.coordinates.sheet_name
-        )
+        items_coordinates = self.table.items_range.coordinates
         return Range(
             client=self.table.full_range.client,
             sheet=self.table.full_range.sheet,
-            a1=a1
+            coordinates=RangeCoordinates(
+                row=items_coordinates.row + self.row_index,
+                column=items_coordinates.column,
+                number_of_rows=1,
+                number_of_columns=items_coordinates.number_of_columns,
+                sheet_name=items_coordinates.sheet_name
+            )
         )
 
     def get_field_range(self, target_field):
-        # rows and columns index start at 1
-        # row will always be 1 in that case
-        # as an item is contained in one row
-        row = 1
-        column = self.get_index(target_field) + 1
-        return self.get_range().get_cell(row, column)
+        # the cell of the field in the item row, built without the row range
+        items_coordinates = self.table.items_range.coordinates
+        return Range(
+            client=self.table.full_range.client,
+            sheet=self.table.full_range.sheet,
+            coordinates=RangeCoordinates(
+                row=items_coordinates.row + self.row_index,
+                column=items_coordinates.column + self.get_index(target_field),
+                number_of_rows=1,
+                number_of_columns=1,
+                sheet_name=items_coordinates.sheet_name
+            )
+        )
 
     def set_field_value(self, target_field, value):
-        if self.values:
-            self.values[self.get_index(target_field)] = value
+        index = self.get_index(target_field)
+        if self.table is not None and self.header is self.table.header and target_field in self.table.indexes:
+            self.table._update_indexes(self, target_field, self._get_cell('values', index), value)
+        self._set_cell('values', index, value)
         self.get_field_range(target_field).set_value(value, batch_to=self.table)
 
     def set_field_note(self, target_field, note):
-        if self.notes:
-            self.notes[self.get_index(target_field)] = note
+        self._set_cell('notes', self.get_index(target_field), note)
         self.get_field_range(target_field).set_note(note, batch_to=self.table)
 
     def set_field_background(self, target_field, background_hex):
-        if self.backgrounds:
-            self.backgrounds[self.get_index(target_field)] = background_hex
+        self._set_cell('backgrounds', self.get_index(target_field), background_hex)
         self.get_field_range(target_field).set_background(
             background_hex, batch_to=self.table)
 
     def set_field_font_color(self, target_field, font_color_hex):
-        if self.font_colors:
-            self.font_colors[self.get_index(target_field)] = font_color_hex
+        self._set_cell('font_colors', self.get_index(target_field), font_color_hex)
         self.get_field_range(target_field).set_font_color(
             font_color_hex, batch_to=self.table)
 
@@ -351,4 +1197,31 @@ class Item:
         return item_value == value
 
     def to_dict(self):
-        return {k: self.get_field_value(k) for k in self.header}
+        values = self.values
+        return {field: values[index] for field, index in self.header_index.items()}
+
+
+def get_consecutive_blocks(indexes):
+    """
+    :param indexes: Sorted list of integers.
+    :return: List of the (start, length) tuples of the runs of consecutive
+        integers of the list.
+    """
+    blocks = list()
+    for index in indexes:
+        if blocks and blocks[-1][0] + blocks[-1][1] == index:
+            blocks[-1] = (blocks[-1][0], blocks[-1][1] + 1)
+        else:
+            blocks.append((index, 1))
+    return blocks
+
+
+def build_header_index(header):
+    """
+    Build the dictionary of the header field names to their column position.
+    As with list.index, a duplicated field name maps to its first position.
+    """
+    header_index = dict()
+    for index, field in enumerate(header):
+        header_index.setdefault(field, index)
+    return header_index
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+
+"""
+    sheetfu.modules.table_columns
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Implement the columnar storage engine of the Table items.
+    :copyright: © 2018 by Social Point Labs.
+    :license: MIT, see LICENSE for more details.
+"""
+
+from array import array
+import sys
+
+
+class Column:
+    """
+    Column of cells. Subclasses pack the cells in a typed array when every cell
+    of the column allows it, and fall back to a python list as soon as a cell
+    that does not fit in the array is set.
+    """
+
+    def __init__(self, cells):
+        self.data = self.pack(cells)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        if isinstance(self.data, array):
+            return self.decode(self.data[index])
+        return self.data[index]
+
+    def __setitem__(self, index, cell):
+        if isinstance(self.data, array):
+            try:
+                self.data[index] = self.encode(cell)
+                return
+            except (TypeError, OverflowError):
+                self.data = self.unpack()
+        self.data[index] = self.normalize(cell)
+
+    def append(self, cell):
+        if isinstance(self.data, array):
+            try:
+                self.data.append(self.encode(cell))
+                return
+            except (TypeError, OverflowError):
+                self.data = self.unpack()
+        self.data.append(self.normalize(cell))
+
+    def delete(self, indexes):
+        for index in sorted(indexes, reverse=True):
+            del self.data[index]
+
+    def reorder(self, permutation):
+        data = self.data
+        reordered = [data[index] for index in permutation]
+        self.data = array(data.typecode, reordered) if isinstance(data, array) else reordered
+
+    def to_list(self):
+        return self.unpack()
+
+    def unpack(self):
+        if isinstance(self.data, array):
+            return [self.decode(stored) for stored in self.data]
+        return list(self.data)
+
+    def pack(self, cells):
+        return [self.normalize(cell) for cell in cells]
+
+    def encode(self, cell):
+        """Convert a cell to its array representation, or raise TypeError."""
+        raise TypeError("This column can not be stored in an array.")
+
+    def decode(self, stored):
+        """Convert an array item back to its cell."""
+        return stored
+
+    def normalize(self, cell):
+        """Prepare a cell to be stored in a list."""
+        return cell
+
+
+class ValueColumn(Column):
+    """
+    Column of values. Integer columns are stored in a signed 64 bits array,
+    float columns in a double array, and any other column in a list where
+    strings are interned.
+    """
+
+    def pack(self, cells):
+        cells = super(ValueColumn, self).pack(cells)
+        cell_types = set(type(cell) for cell in cells)
+        try:
+            if cell_types == {int}:
+                return array('q', cells)
+            if cell_types == {float}:
+                return array('d', cells)
+        except OverflowError:
+            pass
+        return cells
+
+    def encode(self, cell):
+        if type(cell) is not {'q': int, 'd': float}[self.data.typecode]:
+            raise TypeError("Cell type does not match the column array type.")
+        return cell
+
+    def normalize(self, cell):
+        if type(cell) is str:
+            return sys.intern(cell)
+        return cell
+
+
+class ColorColumn(Column):
+    """
+    Column of hex colors ('#rrggbb'), stored as 24 bits integers in an array.
+    Empty colors are stored as -1.
+    """
+
+    def pack(self, cells):
+        try:
+            return array('i', [self.encode(cell) for cell in cells])
+        except TypeError:
+            return super(ColorColumn, self).pack(cells)
+
+    def encode(self, cell):
+        if cell == '':
+            return -1
+        if type(cell) is not str or len(cell) != 7 or cell[0] != '#':
+            raise TypeError("Only hex colors can be stored in a color column.")
+        try:
+            return int(cell[1:], 16)
+        except ValueError:
+            raise TypeError("Only hex colors can be stored in a color column.")
+
+    def decode(self, stored):
+        if stored == -1:
+            return ''
+        return '#{0:06x}'.format(stored)
+
+
+class ColumnStore:
+    """
+    Columnar storage of the items of a table: one typed column per header field
+    and per attribute (values, notes, backgrounds, font colors).
+    """
+
+    COLUMN_TYPES = {
+        'values': ValueColumn,
+        'notes': ValueColumn,
+        'backgrounds': ColorColumn,
+        'font_colors': ColorColumn,
+    }
+
+    def __init__(self, number_of_columns, values, notes=None, backgrounds=None, font_colors=None):
+        """
+        :param number_of_columns: Number of columns of the table.
+        :param values: 2D matrix of the items values.
+        :param notes: (Optional) 2D matrix of the items notes.
+        :param backgrounds: (Optional) 2D matrix of the items backgrounds.
+        :param font_colors: (Optional) 2D matrix of the items font colors.
+        """
+        self.number_of_rows = len(values)
+        self.number_of_columns = number_of_columns
+        self.columns = dict()
+        matrices = {
+            'values': values,
+            'notes': notes,
+            'backgrounds': backgrounds,
+            'font_colors': font_colors,
+        }
+        for attribute, matrix in matrices.items():
+            if matrix is None:
+                continue
+            column_type = self.COLUMN_TYPES[attribute]
+            self.columns[attribute] = [
+                column_type([row[column] for row in matrix])
+                for column in range(number_of_columns)
+            ]
+
+    def __len__(self):
+        return self.number_of_rows
+
+    def has(self, attribute):
+        return attribute in self.columns
+
+    def get(self, attribute, row, column):
+        return self.columns[attribute][column][row]
+
+    def set(self, attribute, row, column, cell):
+        self.columns[attribute][column][row] = cell
+
+    def get_row(self, attribute, row):
+        """
+        :return: List of the cells of the row, or None if the attribute is not
+            stored.
+        """
+        if attribute not in self.columns:
+            return None
+        return [column[row] for column in self.columns[attribute]]
+
+    def set_row(self, attribute, row, cells):
+        for column, cell in zip(self.columns[attribute], cells):
+            column[row] = cell
+
+    def get_column(self, attribute, column):
+        return self.columns[attribute][column].to_list()
+
+    def append(self, values, notes=None, backgrounds=None, font_colors=None):
+        rows = {
+            'values': values,
+            'notes': notes,
+            'backgrounds': backgrounds,
+            'font_colors': font_colors,
+        }
+        for attribute, columns in self.columns.items():
+            cells = rows[attribute]
+            if cells is None:
+                cells = [''] * self.number_of_columns
+            for column, cell in zip(columns, cells):
+                column.append(cell)
+        self.number_of_rows += 1
+
+    def delete(self, rows):
+        for columns in self.columns.values():
+            for column in columns:
+                column.delete(rows)
+        self.number_of_rows -= len(rows)
+
+    def reorder(self, permutation):
+        """
+        Reorder the rows of the store.
+        :param permutation: list of the current row indexes, in the new order.
+        """
+        for columns in self.columns.values():
+            for column in columns:
+                column.reorder(permutation)
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+
+"""
+    sheetfu.modules.table_index
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Implement the field indexes used by the TableSelector.
+    :copyright: © 2018 by Social Point Labs.
+    :license: MIT, see LICENSE for more details.
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+
+# Default of the value parameters, as None is a valid cell value.
+_FIELD_VALUE = object()
+
+
+def sort_key(value):
+    """
+    Key making every cell value comparable to each other: values are first
+    grouped by type (numbers, strings, datetimes, others), then compared within
+    their group.
+    """
+    if isinstance(value, (int, float)):
+        return 0, value
+    if isinstance(value, str):
+        return 1, value
+    if isinstance(value, datetime):
+        return 2, value
+    if value is None:
+        return 3, 0
+    return 4, str(value)
+
+
+class HashIndex:
+    """Index of the items of a table by the value of a field, for equality lookups."""
+
+    kind = "hash"
+
+    def __init__(self, field, items=None):
+        """
+        :param field: The indexed field name.
+        :param items: (Optional) Items to index.
+        """
+        self.field = field
+        self.buckets = dict()
+        for item in items or list():
+            self.add(item)
+
+    def __len__(self):
+        return sum(len(bucket) for bucket in self.buckets.values())
+
+    def add(self, item, value=_FIELD_VALUE):
+        if value is _FIELD_VALUE:
+            value = item.get_field_value(self.field)
+        self.buckets.setdefault(value, set()).add(item)
+
+    def remove(self, item, value=_FIELD_VALUE):
+        if value is _FIELD_VALUE:
+            value = item.get_field_value(self.field)
+        bucket = self.buckets.get(value)
+        if bucket is None:
+            return
+        bucket.discard(item)
+        if not bucket:
+            del self.buckets[value]
+
+    def update(self, item, old_value, new_value):
+        self.remove(item, old_value)
+        self.add(item, new_value)
+
+    def lookup(self, value):
+        """
+        :return: Set of the items whose field is equal to value.
+        """
+        return set(self.buckets.get(value, ()))
+
+
+class SortedIndex:
+    """
+    Index of the items of a table sorted by the value of a field, for equality
+    and range lookups.
+    """
+
+    kind = "sorted"
+
+    def __init__(self, field, items=None):
+        """
+        :param field: The indexed field name.
+        :param items: (Optional) Items to index.
+        """
+        self.field = field
+        entries = sorted(
+            ((sort_key(item.get_field_value(field)), item) for item in items or list()),
+            key=lambda entry: entry[0]
+        )
+        self.keys = [key for key, _ in entries]
+        self.items = [item for _, item in entries]
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, item, value=_FIELD_VALUE):
+        if value is _FIELD_VALUE:
+            value = item.get_field_value(self.field)
+        key = sort_key(value)
+        position = bisect_right(self.keys, key)
+        self.keys.insert(position, key)
+        self.items.insert(position, item)
+
+    def remove(self, item, value=_FIELD_VALUE):
+        if value is _FIELD_VALUE:
+            value = item.get_field_value(self.field)
+        key = sort_key(value)
+        for position in range(bisect_left(self.keys, key), bisect_right(self.keys, key)):
+            if self.items[position] is item:
+                del self.keys[position]
+                del self.items[position]
+                return
+
+    def update(self, item, old_value, new_value):
+        self.remove(item, old_value)
+        self.add(item, new_value)
+
+    def lookup(self, value):
+        """
+        :return: Set of the items whose field is equal to value.
+        """
+        key = sort_key(value)
+        return set(self.items[bisect_left(self.keys, key):bisect_right(self.keys, key)])
+
+    def lookup_range(self, lower=None, upper=None, include_lower=True, include_upper=True):
+        """
+        :param lower: (Optional) Lower bound of the range.
+        :param upper: (Optional) Upper bound of the range.
+        :param include_lower: Whether items equal to the lower bound match.
+        :param include_upper: Whether items equal to the upper bound match.
+        :return: Set of the items whose field is within the range. Bounds only
+            match values of the same type group (numbers, strings, datetimes).
+        """
+        if lower is None and upper is None:
+            raise ValueError("At least one bound of the range must be specified.")
+
+        if lower is not None:
+            lower_key = sort_key(lower)
+            start = bisect_left(self.keys, lower_key) if include_lower else bisect_right(self.keys, lower_key)
+        else:
+            start = bisect_left(self.keys, (sort_key(upper)[0],))
+
+        if upper is not None:
+            upper_key = sort_key(upper)
+            end = bisect_right(self.keys, upper_key) if include_upper else bisect_left(self.keys, upper_key)
+        else:
+            end = bisect_left(self.keys, (sort_key(lower)[0] + 1,))
+
+        return set(self.items[start:end])
+
+
+INDEX_TYPES = {
+    HashIndex.kind: HashIndex,
+    SortedIndex.kind: SortedIndex,
+}
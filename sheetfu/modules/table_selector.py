@@ -1,5 +1,215 @@
+import operator
+import re
+
+
+def _compare(comparison):
+    """
+    Wrap a comparison so that values of types that can not be compared (for
+    instance an empty string and a number) simply do not match.
+    """
+    def compare(value, operand):
+        try:
+            return comparison(value, operand)
+        except TypeError:
+            return False
+    return compare
+
+
+def _between(value, bounds):
+    try:
+        return bounds[0] <= value <= bounds[1]
+    except TypeError:
+        return False
+
+
+def _is_in(value, operand):
+    try:
+        return value in operand
+    except TypeError:
+        return False
+
+
+OPERATORS = {
+    'eq': operator.eq,
+    'ne': operator.ne,
+    'gt': _compare(operator.gt),
+    'gte': _compare(operator.ge),
+    'lt': _compare(operator.lt),
+    'lte': _compare(operator.le),
+    'between': _between,
+    'in': _is_in,
+    'startswith': lambda value, prefix: isinstance(value, str) and value.startswith(prefix),
+    'regex': lambda value, pattern: isinstance(value, str) and pattern.search(value) is not None,
+    'is_null': lambda value, is_null: (value is None or value == '') == is_null,
+}
+
+# Estimated cost of each operator, from the cheapest and most selective to the
+# most expensive. The predicates of a plan are checked in that order.
+OPERATOR_COSTS = {
+    'eq': 1,
+    'is_null': 2,
+    'in': 2,
+    'between': 3,
+    'startswith': 3,
+    'gt': 4,
+    'gte': 4,
+    'lt': 4,
+    'lte': 4,
+    'ne': 6,
+    'regex': 8,
+}
+
+
+class FieldPredicate:
+    """
+    Compiled condition on one field: either an equality with a value, or a
+    dictionary of operators to operands that must all match, for example
+    {'gte': 18, 'lt': 65}.
+    """
+
+    def __init__(self, field, condition):
+        self.field = field
+        if isinstance(condition, dict):
+            self.conditions = [
+                (name, self._prepare_operand(name, operand))
+                for name, operand in condition.items()
+            ]
+        else:
+            self.conditions = [('eq', condition)]
+        self.tests = [(OPERATORS[name], operand) for name, operand in self.conditions]
+        self.cost = sum(OPERATOR_COSTS[name] for name, _ in self.conditions)
+
+    @staticmethod
+    def _prepare_operand(name, operand):
+        if name not in OPERATORS:
+            raise ValueError("Unknown operator '{}'. Operator must be one of: {}.".format(
+                name, ", ".join(sorted(OPERATORS))))
+        if name == 'between' and len(operand) != 2:
+            raise ValueError("The 'between' operator needs a [lower, upper] list of bounds.")
+        if name == 'in':
+            try:
+                return frozenset(operand)
+            except TypeError:
+                return tuple(operand)
+        if name == 'regex' and isinstance(operand, str):
+            return re.compile(operand)
+        return operand
+
+    def __call__(self, item):
+        value = item.get_field_value(self.field)
+        for test, operand in self.tests:
+            if not test(value, operand):
+                return False
+        return True
+
+    def lookup(self, indexes):
+        """
+        Resolve the predicate with the index of its field.
+        :return: Set of the matching items, or None if the predicate can not be
+            resolved by the indexes.
+        """
+        index = indexes.get(self.field)
+        if index is None:
+            return None
+        matching_items = None
+        for name, operand in self.conditions:
+            condition_items = self._lookup_condition(index, name, operand)
+            if condition_items is None:
+                return None
+            matching_items = condition_items if matching_items is None else matching_items & condition_items
+        return matching_items
+
+    @staticmethod
+    def _lookup_condition(index, name, operand):
+        if name == 'eq':
+            return index.lookup(operand)
+        if name == 'in':
+            matching_items = set()
+            for value in operand:
+                matching_items |= index.lookup(value)
+            return matching_items
+        if index.kind != 'sorted':
+            return None
+        if name == 'gt':
+            return index.lookup_range(lower=operand, include_lower=False)
+        if name == 'gte':
+            return index.lookup_range(lower=operand)
+        if name == 'lt':
+            return index.lookup_range(upper=operand, include_upper=False)
+        if name == 'lte':
+            return index.lookup_range(upper=operand)
+        if name == 'between':
+            return index.lookup_range(lower=operand[0], upper=operand[1])
+        return None
+
+
+class AndClause:
+    """Compiled dictionary clause: every field predicate must match."""
+
+    def __init__(self, clause):
+        self.predicates = sorted(
+            (FieldPredicate(field, condition) for field, condition in clause.items()),
+            key=lambda predicate: predicate.cost
+        )
+        self.cost = min([predicate.cost for predicate in self.predicates] or [0])
+
+    def __call__(self, item):
+        for predicate in self.predicates:
+            if not predicate(item):
+                return False
+        return True
+
+    def lookup(self, indexes):
+        """
+        :return: Tuple of the set of items matching the indexed predicates (None
+            if no predicate is indexed), and the predicates left to check.
+        """
+        matching_items = None
+        remaining_predicates = list()
+        for predicate in self.predicates:
+            predicate_items = predicate.lookup(indexes)
+            if predicate_items is None:
+                remaining_predicates.append(predicate)
+            else:
+                matching_items = predicate_items if matching_items is None else matching_items & predicate_items
+        return matching_items, remaining_predicates
+
+
+class OrClause:
+    """Compiled list clause: at least one field predicate must match."""
+
+    def __init__(self, clauses):
+        self.predicates = list()
+        for clause in clauses:
+            if not isinstance(clause, dict):
+                raise ValueError('OR clauses need to be dictionaries')
+            for field, condition in clause.items():
+                self.predicates.append(FieldPredicate(field, condition))
+        self.predicates.sort(key=lambda predicate: predicate.cost)
+        self.cost = sum(predicate.cost for predicate in self.predicates)
+
+    def __call__(self, item):
+        for predicate in self.predicates:
+            if predicate(item):
+                return True
+        return False
+
+    def lookup(self, indexes):
+        """
+        :return: Tuple of the set of items matching the clause (None if any
+            predicate is not indexed), and the predicates left to check.
+        """
+        matching_items = set()
+        for predicate in self.predicates:
+            predicate_items = predicate.lookup(indexes)
+            if predicate_items is None:
+                return None, [self]
+            matching_items |= predicate_items
+        return matching_items, list()
+
+
 class TableSelector:
-    def __init__(self, items, criteria):
+    def __init__(self, items, criteria, indexes=None):
         """
         Class that acts as a filter for Table's Items
 
@@ -9,49 +219,59 @@ class TableSelector:
             [[{assigneeId: 'GO'}, {assigneeId: 'AM'}]] // (assigneeId === 'GO' || assigneeId === 'AM')
             [{name: 'Guillem'}, {surname: 'Orpinell'}] // (name === 'Guillem' && surname === 'Orpinell')
             {name: 'Guillem', surname: 'Orpinell'} // (name === 'Guillem' && surname === 'Orpinell')
+            Instead of a value, a field can be given a dictionary of operators
+            (eq, ne, gt, gte, lt, lte, between, in, startswith, regex, is_null):
+            {age: {gte: 18, lt: 65}, name: {startswith: 'G'}} // (age >= 18 && age < 65 && name starts with 'G')
+        :param indexes: (Optional) Dictionary of field names to the indexes of
+            the items (see Table.create_index). Clauses on indexed fields are
+            resolved by index lookups instead of scanning every item.
 
         """
         self.items = items
+        self.indexes = indexes or dict()
 
         if isinstance(criteria, list):
             self.clauses = criteria
         else:
             self.clauses = [criteria]
 
-    def execute(self):
-        """
-        Method to filter items on a table based on field name and value.
-        :return: List of Items containing only filtered items or and empty List.
+        self.plan = self._compile(self.clauses)
 
+    @staticmethod
+    def _compile(clauses):
         """
-        return [item for item in self.items if self._matches(item, self.clauses)]
+        Compile the CNF criteria into a plan: a list of AND and OR clauses,
+        ordered from the cheapest to the most expensive to check.
+        """
+        plan = list()
+        for clause in clauses:
+            if isinstance(clause, dict):
+                plan.append(AndClause(clause))
+            elif isinstance(clause, list):
+                plan.append(OrClause(clause))
+        plan.sort(key=lambda compiled_clause: compiled_clause.cost)
+        return plan
 
-    def _matches(self, item, clauses):
+    def execute(self):
         """
-        Method that applies AND & OR filters to an item.
+        Method to filter items on a table based on field name and value.
         :return: List of Items containing only filtered items or and empty List.
 
         """
-        for clause in clauses:
-            if isinstance(clause, dict) and not self._matches_and_clause(item, clause):
-                return False
-            if isinstance(clause, list) and not self._matches_or_clauses(item, clause):
-                return False
-        return True
+        candidates = None
+        predicates = list()
+        for compiled_clause in self.plan:
+            matching_items, remaining_predicates = compiled_clause.lookup(self.indexes)
+            if matching_items is not None:
+                candidates = matching_items if candidates is None else candidates & matching_items
+            predicates.extend(remaining_predicates)
 
-    @staticmethod
-    def _matches_and_clause(item, clause):
-        for header, value in clause.items():
-            if not item.matches_value(header, value):
-                return False
-        return True
+        if candidates is None:
+            items = self.items
+        else:
+            items = sorted(candidates, key=lambda item: item.row_index)
 
-    @staticmethod
-    def _matches_or_clauses(item, clauses):
-        for clause in clauses:
-            if not isinstance(clause, dict):
-                raise ValueError('OR clauses need to be dictionaries')
-            for header, value in clause.items():
-                if item.matches_value(header, value):
-                    return True
-        return False
+        if not predicates:
+            return list(items)
+        predicates.sort(key=lambda predicate: predicate.cost)
+        return [item for item in items if all(predicate(item) for predicate in predicates)]
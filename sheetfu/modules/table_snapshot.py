@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+
+"""
+    sheetfu.modules.table_snapshot
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Implement the snapshot files of the tables: a compact columnar binary file
+    holding the metadata of a table and one block per column. Integer, float
+    and datetime columns are stored as raw 64 bits arrays, aligned to 8 bytes,
+    and the other columns as JSON lists. Snapshots are read from a memory
+    mapped file, and every column is decoded into a list of cells.
+    :copyright: © 2018 by Social Point Labs.
+    :license: MIT, see LICENSE for more details.
+"""
+
+from array import array
+from datetime import datetime, timedelta, timezone
+import json
+import mmap
+import struct
+import sys
+
+from sheetfu.exceptions import SnapshotFormatError
+
+
+SNAPSHOT_MAGIC = b'SHEETFU\x01'
+
+# blocks start at a multiple of the alignment, so that the arrays can be
+# read in place from a memory mapped file.
+BLOCK_ALIGNMENT = 8
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def encode_cell(cell):
+    """
+    :return: The cell as a JSON serializable value: datetimes are encoded as
+        their microseconds from EPOCH (like datetime64 columns), with their
+        offset from UTC in microseconds if they have a timezone.
+    """
+    if isinstance(cell, datetime):
+        encoded = {'$datetime': (cell.replace(tzinfo=None) - EPOCH) // timedelta(microseconds=1)}
+        if cell.utcoffset() is not None:
+            encoded['$utcoffset'] = cell.utcoffset() // timedelta(microseconds=1)
+        return encoded
+    return cell
+
+
+def decode_cell(cell):
+    if isinstance(cell, dict) and '$datetime' in cell:
+        decoded = EPOCH + timedelta(microseconds=cell['$datetime'])
+        if '$utcoffset' in cell:
+            decoded = decoded.replace(tzinfo=timezone(timedelta(microseconds=cell['$utcoffset'])))
+        return decoded
+    return cell
+
+
+def encode_column(cells):
+    """
+    :param cells: List of the cells of a column.
+    :return: Tuple of the encoding name and the bytes of the column.
+    """
+    cell_types = set(type(cell) for cell in cells)
+    data = None
+    try:
+        if cell_types == {int}:
+            encoding, data = 'int64', array('q', cells)
+        elif cell_types == {float}:
+            encoding, data = 'float64', array('d', cells)
+        elif cell_types == {datetime} and all(cell.tzinfo is None for cell in cells):
+            encoding = 'datetime64'
+            data = array('q', [(cell - EPOCH) // timedelta(microseconds=1) for cell in cells])
+    except OverflowError:
+        data = None
+    if data is None:
+        encoding = 'json'
+        return encoding, json.dumps([encode_cell(cell) for cell in cells], separators=(',', ':')).encode('utf-8')
+    if sys.byteorder != 'little':
+        data.byteswap()
+    return encoding, data.tobytes()
+
+
+def decode_column(encoding, block):
+    """
+    :param encoding: Encoding name of the column (see encode_column).
+    :param block: Bytes of the column.
+    :return: List of the cells of the column.
+    """
+    if encoding == 'json':
+        return [decode_cell(cell) for cell in json.loads(bytes(block).decode('utf-8'))]
+    if encoding not in ('int64', 'float64', 'datetime64'):
+        raise SnapshotFormatError("Unknown column encoding '{}'.".format(encoding))
+    data = array('d' if encoding == 'float64' else 'q')
+    data.frombytes(block)
+    if sys.byteorder != 'little':
+        data.byteswap()
+    if encoding == 'datetime64':
+        return [EPOCH + timedelta(microseconds=microseconds) for microseconds in data]
+    return data.tolist()
+
+
+def write_snapshot(path, metadata, columns):
+    """
+    Write a snapshot file.
+    :param path: Path of the file.
+    :param metadata: JSON serializable dictionary of the table metadata.
+    :param columns: Dictionary of the attribute names ('values', 'notes'...)
+        to the list of the columns of the attribute, a column being a list of
+        cells.
+    """
+    blocks = list()
+    layout = dict()
+    offset = 0
+    for attribute, attribute_columns in columns.items():
+        layout[attribute] = list()
+        for cells in attribute_columns:
+            encoding, block = encode_column(cells)
+            padding = -len(block) % BLOCK_ALIGNMENT
+            layout[attribute].append({'encoding': encoding, 'offset': offset, 'length': len(block)})
+            blocks.append(block + b'\0' * padding)
+            offset += len(block) + padding
+
+    header = json.dumps(dict(metadata, columns=layout), separators=(',', ':')).encode('utf-8')
+    header += b' ' * (-(len(SNAPSHOT_MAGIC) + 8 + len(header)) % BLOCK_ALIGNMENT)
+    with open(path, 'wb') as snapshot_file:
+        snapshot_file.write(SNAPSHOT_MAGIC)
+        snapshot_file.write(struct.pack('<Q', len(header)))
+        snapshot_file.write(header)
+        for block in blocks:
+            snapshot_file.write(block)
+
+
+def read_snapshot(path):
+    """
+    Read a snapshot file. The file is memory mapped while it is read, and the
+    columns are decoded into lists of cells (the loaded table does not keep
+    the file mapped).
+    :param path: Path of the file.
+    :return: Tuple of the metadata dictionary and the columns dictionary (see
+        write_snapshot).
+    :raise SnapshotFormatError: if the file is not a snapshot, or is truncated
+        or corrupted.
+    """
+    with open(path, 'rb') as snapshot_file:
+        if snapshot_file.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+            raise SnapshotFormatError("'{}' is not a sheetfu table snapshot.".format(path))
+        with mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                return parse_snapshot(view)
+            except (struct.error, ValueError, KeyError, TypeError) as error:
+                raise SnapshotFormatError("'{}' is a truncated or corrupted snapshot: {}".format(path, error))
+            finally:
+                view.release()
+
+
+def parse_snapshot(view):
+    """
+    :param view: memoryview of the snapshot file, starting with its magic.
+    :return: Tuple of the metadata dictionary and the columns dictionary (see
+        write_snapshot).
+    :raise ValueError: if the view is truncated (or raise the errors of the
+        header parsing: struct.error, JSONDecodeError...).
+    """
+    header_start = len(SNAPSHOT_MAGIC) + 8
+    header_length = struct.unpack('<Q', view[len(SNAPSHOT_MAGIC):header_start])[0]
+    data_start = header_start + header_length
+    if data_start > len(view):
+        raise ValueError("the header is truncated")
+    metadata = json.loads(bytes(view[header_start:data_start]).decode('utf-8'))
+    columns = dict()
+    for attribute, attribute_layout in metadata.pop('columns').items():
+        columns[attribute] = list()
+        for block in attribute_layout:
+            block_start = data_start + block['offset']
+            if block['offset'] < 0 or block_start + block['length'] > len(view):
+                raise ValueError("a column block is truncated")
+            columns[attribute].append(decode_column(block['encoding'], view[block_start:block_start + block['length']]))
+    return metadata, columns
@@ -2,6 +2,10 @@ from sheetfu.helpers import rgb_to_hex, hex_to_rgb, datetime_to_serial_number, s
 from datetime import datetime
 
 
+VALUE_TYPES = ('stringValue', 'numberValue', 'boolValue', 'formulaValue')
+DATE_FORMAT_TYPES = ('DATE', 'DATE_TIME')
+
+
 class CellParsers:
     """
     Class to register every setters and getters from the Google Sheets API.
@@ -13,22 +17,18 @@ class CellParsers:
     @staticmethod
     def get_value(cell):
         value_body = cell["effectiveValue"]
-        format_type = (
-            cell
-            .get('effectiveFormat', {})
-            .get("numberFormat", {})
-            .get("type")
-        )
-        for value_type in [
-            'stringValue',
-            'numberValue',
-            'boolValue',
-            'formulaValue'
-        ]:
-            if value_body.get(value_type) is not None:
-                if format_type in ["DATE", "DATE_TIME"]:
-                    return serial_number_to_datetime(value_body[value_type])
-                return value_body[value_type]
+        for value_type in VALUE_TYPES:
+            value = value_body.get(value_type)
+            if value is not None:
+                format_type = (
+                    cell
+                    .get('effectiveFormat', {})
+                    .get("numberFormat", {})
+                    .get("type")
+                )
+                if format_type in DATE_FORMAT_TYPES:
+                    return serial_number_to_datetime(value)
+                return value
 
     @staticmethod
     def set_value(cell):
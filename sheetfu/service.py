@@ -9,13 +9,137 @@
     :copyright: © 2018 by Social Point Labs.
     :license: MIT, see LICENSE for more details.
 """
+import hashlib
 import json
 import os
 import tempfile
+import threading
+import time
 
 from oauth2client.service_account import ServiceAccountCredentials
 from httplib2 import Http
 from googleapiclient.discovery import build
+from googleapiclient.discovery_cache.base import Cache
+
+
+# Number of seconds a cached discovery document stays valid.
+DISCOVERY_CACHE_TTL = 24 * 60 * 60
+
+
+def get_user_cache_directory():
+    """
+    Get the sheetfu cache directory of the current user (~/.cache/sheetfu),
+    created private if missing. A discovery document decides where the
+    requests and their credentials are sent, so the directory is not used if
+    another user owns it or can write to it.
+    :return: Path of the directory, or None if it can not be used safely.
+    """
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    directory = os.path.join(cache_home, 'sheetfu')
+    try:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        status = os.stat(directory)
+    except (IOError, OSError):
+        return None
+    if hasattr(os, 'getuid'):
+        if status.st_uid != os.getuid() or status.st_mode & 0o077:
+            return None
+    return directory
+
+
+class DiscoveryCache(Cache):
+
+    """
+    Cache of the discovery documents of the Google APIs, kept in memory and on
+    disk, so that building a service does not fetch its discovery document
+    over the network every time, nor in every new process.
+    """
+
+    def __init__(self, directory=None, ttl=DISCOVERY_CACHE_TTL):
+        """
+        :param directory: (Optional) Directory where the documents are saved.
+        Defaults to the private cache directory of the current user (see
+        get_user_cache_directory), the documents being only kept in memory if
+        it can not be used safely.
+        :param ttl: Number of seconds a cached document stays valid.
+        """
+        self._directory = directory
+        self.default_directory = directory is None
+        self.ttl = ttl
+        self.documents = dict()
+        self.lock = threading.Lock()
+
+    @property
+    def directory(self):
+        """
+        The directory of the documents, None to keep them in memory only. The
+        default directory is resolved when first used.
+        """
+        if self.default_directory:
+            self._directory = get_user_cache_directory()
+            self.default_directory = False
+        return self._directory
+
+    def get(self, url):
+        """
+        :param url: Url of the discovery document.
+        :return: The cached document, or None if missing or expired.
+        """
+        with self.lock:
+            document = self.documents.get(url)
+        if document is not None and time.time() - document[1] < self.ttl:
+            return document[0]
+        path = self.get_path(url)
+        if path is None:
+            return None
+        try:
+            modified_time = os.path.getmtime(path)
+            if time.time() - modified_time >= self.ttl:
+                return None
+            with open(path, 'r') as document_file:
+                content = document_file.read()
+        except (IOError, OSError):
+            return None
+        with self.lock:
+            self.documents[url] = (content, modified_time)
+        return content
+
+    def set(self, url, content):
+        """
+        Save a discovery document in memory and on disk. Failing to write the
+        document on disk is not an error, it is only cached in memory then.
+        :param url: Url of the discovery document.
+        :param content: The discovery document.
+        """
+        with self.lock:
+            self.documents[url] = (content, time.time())
+        path = self.get_path(url)
+        if path is None:
+            return
+        try:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory, mode=0o700)
+            # written to a temporary file first, so that concurrent processes
+            # never read a partial document.
+            descriptor, temporary_path = tempfile.mkstemp(dir=self.directory)
+            with os.fdopen(descriptor, 'w') as document_file:
+                document_file.write(content)
+            os.replace(temporary_path, path)
+        except (IOError, OSError):
+            pass
+
+    def get_path(self, url):
+        """
+        :return: Path of the file of a discovery document, or None if the
+        documents are only kept in memory.
+        """
+        directory = self.directory
+        if directory is None:
+            return None
+        return os.path.join(directory, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.json')
+
+
+discovery_cache = DiscoveryCache()
 
 
 class BaseService(object):
@@ -37,16 +161,25 @@ class BaseService(object):
 
     def build(self, http=None):
         """
-        Builds a sheet service, ready to query sheets.
+        Builds a sheet service, ready to query sheets. Every service has its
+        own authorized Http object, as Http objects are not thread safe, and
+        only the discovery document is shared between services (see
+        DiscoveryCache). It is parsed again for every service, because the
+        built resources modify the parsed document.
         :param http: Only needed for unit testing. Must be an object of
         HttpMockSequence. DO NOT USE IN PROD.
         :return: An authorized sheets service.
         """
         # if not None must be instance of HttpMockSequence for unit testing
-        if http is None:
-            http = self.credentials.authorize(Http())
-        service = build(self.SERVICE, self.VERSION, http=http, cache_discovery=False)
-        return service
+        if http is not None:
+            return build(self.SERVICE, self.VERSION, http=http, cache_discovery=False)
+        return build(self.SERVICE, self.VERSION, http=self.build_http(), cache=discovery_cache)
+
+    def build_http(self):
+        """
+        :return: A new Http object authorized with the service credentials.
+        """
+        return self.credentials.authorize(Http())
 
     @staticmethod
     def _build_keyfile_dict():
@@ -107,3 +240,27 @@ class DriveService(BaseService):
         super(DriveService, self).__init__(path_to_secret, from_env)
 
 
+class HttpPool(object):
+
+    """
+    Pool of authorized Http objects, one per thread. Http objects are not
+    thread safe, so requests executed with the Http of their own thread can be
+    sent concurrently, each thread keeping its connections alive.
+    """
+
+    def __init__(self, http_factory):
+        """
+        :param http_factory: Function returning a new authorized Http object.
+        """
+        self.http_factory = http_factory
+        self.local = threading.local()
+
+    def get(self):
+        """
+        :return: The Http object of the current thread.
+        """
+        http = getattr(self.local, 'http', None)
+        if http is None:
+            http = self.http_factory()
+            self.local.http = http
+        return http
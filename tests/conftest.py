@@ -54,3 +54,24 @@ def full_table(full_spreadsheet):
         backgrounds=True,
         font_colors=True
     )
+
+
+@pytest.fixture()
+def columnar_table():
+    http_mocks = mock_google_sheets_responses([
+        'table_get_sheets.json',
+        'table_check_data_range.json',
+        'table_values.json',
+        'table_values.json',
+        'table_notes.json',
+        'table_backgrounds.json',
+        'table_font_colors.json'
+    ])
+    table_range = SpreadsheetApp(http=http_mocks).open_by_id('whatever').get_sheet_by_name('Sheet1').get_data_range()
+    return Table(
+        full_range=table_range,
+        notes=True,
+        backgrounds=True,
+        font_colors=True,
+        columnar=True
+    )
@@ -33,3 +33,57 @@ class TestTableSelector:
     def test_value_error_exception(self, table):
         with pytest.raises(ValueError):
             TableSelector(table.items, [[25, 35]]).execute()
+
+
+class TestTableSelectorOperators:
+
+    def names(self, items):
+        return [item.get_field_value("name") for item in items]
+
+    def test_comparison_operators(self, table):
+        assert self.names(TableSelector(table.items, {"age": {"gt": 25}}).execute()) == ["philippe", "mike", "random"]
+        assert self.names(TableSelector(table.items, {"age": {"gte": 30, "lt": 37}}).execute()) == ["mike", "random"]
+        assert self.names(TableSelector(table.items, {"age": {"lte": 25}}).execute()) == ["john", "jane"]
+        assert self.names(TableSelector(table.items, {"age": {"between": [26, 37]}}).execute()) == [
+            "philippe", "mike", "random"]
+        assert self.names(TableSelector(table.items, {"name": {"ne": "john"}, "age": 25}).execute()) == ["jane"]
+
+    def test_string_operators(self, table):
+        assert self.names(TableSelector(table.items, {"name": {"startswith": "j"}}).execute()) == ["john", "jane"]
+        assert self.names(TableSelector(table.items, {"surname": {"regex": "^o"}}).execute()) == ["philippe"]
+        assert self.names(TableSelector(table.items, {"name": {"in": ["mike", "jane"]}}).execute()) == [
+            "jane", "mike"]
+
+    def test_null_operator(self, table):
+        assert TableSelector(table.items, {"name": {"is_null": True}}).execute() == []
+        assert len(TableSelector(table.items, {"name": {"is_null": False}}).execute()) == 5
+
+    def test_operators_in_or_clause(self, table):
+        selector = TableSelector(table.items, [[{"age": {"gt": 35}}, {"name": {"startswith": "r"}}]])
+        assert self.names(selector.execute()) == ["philippe", "random"]
+
+    def test_uncomparable_values_do_not_match(self, table):
+        assert TableSelector(table.items, {"name": {"gt": 3}}).execute() == []
+
+    def test_unknown_operator(self, table):
+        with pytest.raises(ValueError):
+            TableSelector(table.items, {"age": {"greater": 3}})
+
+    def test_plan_is_ordered_by_cost(self, table):
+        selector = TableSelector(table.items, [{"name": {"regex": "o"}}, [{"age": 25}, {"age": 30}], {"age": 25}])
+        assert [clause.cost for clause in selector.plan] == sorted(clause.cost for clause in selector.plan)
+        assert self.names(selector.execute()) == ["john"]
+
+    @pytest.mark.parametrize('kind', ['hash', 'sorted'])
+    def test_indexed_operators(self, table, kind):
+        criteria_list = [
+            {"age": {"gt": 25}},
+            {"age": {"between": [26, 37]}, "name": {"startswith": "r"}},
+            [[{"age": {"in": [25, 37]}}, {"name": "mike"}]],
+            [{"age": {"lte": 30}}, {"name": {"ne": "jane"}}],
+        ]
+        expected = [self.names(TableSelector(table.items, criteria).execute()) for criteria in criteria_list]
+        table.create_index("age", kind=kind)
+        table.create_index("name", kind=kind)
+        for criteria, expected_names in zip(criteria_list, expected):
+            assert self.names(TableSelector(table.items, criteria, indexes=table.indexes).execute()) == expected_names
@@ -160,3 +160,52 @@ class TestA1ToCoordinates:
             number_of_columns=6,
             sheet_name='Sheet1'
         )
+
+
+class TestA1Codec:
+
+    def test_columns_beyond_two_letters(self):
+        assert convert_column_to_letter(702) == "ZZ"
+        assert convert_column_to_letter(703) == "AAA"
+        assert convert_column_to_letter(16384) == "XFD"
+        assert convert_column_to_letter(18278) == "ZZZ"
+        assert convert_column_to_letter(18279) == "AAAA"
+        assert convert_letter_to_column("xfd") == 16384
+        assert convert_letter_to_column("AAAA") == 18279
+
+    def test_columns_round_trip(self):
+        for column in range(1, 20000):
+            assert convert_letter_to_column(convert_column_to_letter(column)) == column
+
+    def test_invalid_columns(self):
+        with pytest.raises(ValueError):
+            convert_column_to_letter(0)
+        with pytest.raises(ValueError):
+            convert_letter_to_column("A1")
+        with pytest.raises(ValueError):
+            convert_letter_to_column("")
+
+    def test_whole_columns_and_rows(self):
+        assert convert_a1_to_coordinates("B:D") == RangeCoordinates(1, 2, None, 3, None)
+        assert convert_a1_to_coordinates("Sheet1!B5:D") == RangeCoordinates(5, 2, None, 3, "Sheet1")
+        assert convert_a1_to_coordinates("A1:B") == RangeCoordinates(1, 1, None, 2, None)
+        assert convert_a1_to_coordinates("2:10") == RangeCoordinates(2, 1, 9, None, None)
+        # reversed corners are normalized
+        assert convert_a1_to_coordinates("D10:B2") == convert_a1_to_coordinates("B2:D10")
+
+    def test_invalid_a1(self):
+        for a1_string in ("A", "12", "A1:", "A0", "B:D10", "A1!", "'Sheet1!A1", "'Sheet1'A1", "A-1"):
+            with pytest.raises(ValueError):
+                convert_a1_to_coordinates(a1_string)
+
+    def test_quoted_sheet_names(self):
+        coordinates = convert_a1_to_coordinates("'Q1 results!'!B2:C3")
+        assert coordinates == RangeCoordinates(2, 2, 2, 2, "Q1 results!")
+        assert convert_a1_to_coordinates("'it''s'!A1").sheet_name == "it's"
+        assert convert_a1_to_coordinates("Sheet 1!A1").sheet_name == "Sheet 1"
+        assert convert_coordinates_to_a1(2, 2, 2, 2, sheet_name="Q1 results!") == "'Q1 results!'!B2:C3"
+        assert convert_coordinates_to_a1(1, 1, sheet_name="it's") == "'it''s'!A1"
+        # names that could be mistaken for a cell are quoted
+        assert convert_coordinates_to_a1(1, 1, sheet_name="AB12") == "'AB12'!A1"
+        assert append_sheet_name("A1", "Sheet 1") == "'Sheet 1'!A1"
+        assert append_sheet_name("'Sheet 1'!A1", "Sheet 1") == "'Sheet 1'!A1"
@@ -0,0 +1,116 @@
+from sheetfu.aio import AsyncSpreadsheetApp
+from sheetfu.executor import RequestExecutor
+from sheetfu.modules.table import Table
+from tests.utils import mock_google_sheets_responses, open_fixture
+import asyncio
+import json
+
+
+class FakeTransport:
+    """Async transport replying with fixtures, in order."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = list()
+
+    async def request(self, method, uri, headers=None, body=None):
+        self.requests.append((method, uri, body))
+        status, fixture = self.responses.pop(0)
+        content = open_fixture(fixture).encode('utf-8') if fixture else b'{}'
+        return status, {'content-type': 'application/json'}, content
+
+
+async def no_sleep(seconds):
+    pass
+
+
+def run(coroutine):
+    """Run a coroutine in a new event loop (asyncio.run is only available from Python 3.7)."""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def make_client(responses):
+    transport = FakeTransport(responses)
+    client = AsyncSpreadsheetApp(
+        http=mock_google_sheets_responses(),
+        transport=transport,
+        executor=RequestExecutor(read_requests_per_minute=None, write_requests_per_minute=None),
+        sleep=no_sleep
+    )
+    return client, transport
+
+
+class TestAsyncSpreadsheetApp:
+
+    def test_open_by_id(self):
+        client, transport = make_client([(200, 'get_sheets.json')])
+        spreadsheet = run(client.open_by_id('some_id'))
+        assert len(spreadsheet.sheets) == 2
+        assert spreadsheet.client is client.client
+        assert transport.requests[0][0] == 'GET'
+        assert 'some_id' in transport.requests[0][1]
+
+    def test_concurrent_reads(self):
+        client, transport = make_client([
+            (200, 'table_get_sheets.json'), (200, 'table_values.json'), (200, 'table_values.json')])
+
+        async def read_twice():
+            spreadsheet = await client.open_by_id('whatever')
+            sheet = spreadsheet.get_sheet_by_name('Sheet1')
+            return await asyncio.gather(
+                client.get_values(sheet.get_range_from_a1('A1:C6')),
+                client.get_values(sheet.get_range_from_a1('A1:C6'))
+            )
+
+        first_values, second_values = run(read_twice())
+        assert first_values == second_values
+        assert first_values[1] == ['philippe', 'oger', 37]
+
+    def test_load_table_and_commit(self):
+        client, transport = make_client([
+            (200, 'table_get_sheets.json'), (200, 'table_single_request.json'), (200, 'table_commit_reply.json')])
+
+        async def update_table():
+            spreadsheet = await client.open_by_id('whatever')
+            table = await client.load_table(
+                spreadsheet.get_sheet_by_name('Sheet1').get_full_range(), notes=True, backgrounds=True)
+            for item in table:
+                item.set_field_value('age', 1)
+            response = await client.commit(table)
+            return table, response
+
+        table, response = run(update_table())
+        assert isinstance(table, Table)
+        assert len(table.items) == 5
+        assert len(table.batches) == 0
+        assert response['replies'] == [{}]
+        method, uri, body = transport.requests[-1]
+        assert method == 'POST'
+        # the 5 cells updates are coalesced into one request
+        assert len(json.loads(body)['requests']) == 1
+
+    def test_retry(self):
+        client, transport = make_client([(429, None), (200, 'get_sheets.json')])
+        spreadsheet = run(client.open_by_id('some_id'))
+        assert len(spreadsheet.sheets) == 2
+        assert len(transport.requests) == 2
+
+    def test_get_ranges(self):
+        client, transport = make_client([
+            (200, 'get_sheets.json'), (200, 'batch_get_ranges.json'), (200, 'batch_get_ranges.json')])
+
+        async def read_ranges():
+            spreadsheet = await client.open_by_id('some_id')
+            return await client.get_ranges(
+                spreadsheet, ["people!A1:B1", "people!C3", "whatever!A1:B2", "people!A1:B1"],
+                max_ranges_per_request=3
+            )
+
+        data = run(read_ranges())
+        assert [range_data["values"] for range_data in data] == [
+            [["name", "surname"]], [[35]], [["a", "b"], ["c", ""]], [["name", "surname"]]]
+        assert len(transport.requests) == 3
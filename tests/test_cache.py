@@ -0,0 +1,156 @@
+from sheetfu import SpreadsheetApp
+from sheetfu.cache import RangeCache, get_grid_range_bounds
+from sheetfu.model import get_written_ranges
+from tests.utils import FakeDriveService, mock_google_sheets_responses, open_fixture
+import json
+import pytest
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeSheet:
+
+    def __init__(self, sid):
+        self._sid = sid
+
+
+class TestRangeCache:
+
+    def test_ttl(self):
+        clock = FakeClock()
+        cache = RangeCache(ttl=10, clock=clock)
+        cache.set(('id', 'people!A1', 'mask'), 'data')
+        clock.now = 9
+        assert cache.get(('id', 'people!A1', 'mask')) == 'data'
+        clock.now = 10
+        assert cache.get(('id', 'people!A1', 'mask')) is None
+        assert len(cache) == 0
+
+    def test_lru_eviction(self):
+        cache = RangeCache(max_entries=2)
+        cache.set(('id', 'A1', 'mask'), 1)
+        cache.set(('id', 'A2', 'mask'), 2)
+        assert cache.get(('id', 'A1', 'mask')) == 1
+        cache.set(('id', 'A3', 'mask'), 3)
+        assert cache.get(('id', 'A2', 'mask')) is None
+        assert cache.get(('id', 'A1', 'mask')) == 1
+        assert cache.get(('id', 'A3', 'mask')) == 3
+        with pytest.raises(ValueError):
+            RangeCache(max_entries=0)
+
+    def test_invalidate_overlapping_entries(self):
+        cache = RangeCache()
+        cache.set(('id', 'A1:B2', 'mask'), 1, sheet=FakeSheet(0), bounds=(0, 2, 0, 2))
+        cache.set(('id', 'D4', 'mask'), 2, sheet=FakeSheet(0), bounds=(3, 4, 3, 4))
+        cache.set(('id', 'other!A1', 'mask'), 3, sheet=FakeSheet(1), bounds=(0, 1, 0, 1))
+        cache.set(('id', 'lazy!A2', 'mask'), 4, sheet=FakeSheet(None), bounds=(1, 2, 0, 1))
+        cache.set(('other_id', 'A1', 'mask'), 5, sheet=FakeSheet(0), bounds=(0, 1, 0, 1))
+        cache.invalidate('id', sheet_id=0, bounds=get_grid_range_bounds({'startRowIndex': 1, 'endRowIndex': 2}))
+        assert cache.get(('id', 'A1:B2', 'mask')) is None
+        assert cache.get(('id', 'D4', 'mask')) == 2
+        assert cache.get(('id', 'other!A1', 'mask')) == 3
+        # the sheet id of the entry is unknown, so it may be the written sheet
+        assert cache.get(('id', 'lazy!A2', 'mask')) is None
+        assert cache.get(('other_id', 'A1', 'mask')) == 5
+        cache.invalidate('id')
+        assert len(cache) == 1
+
+
+class TestWrittenRanges:
+
+    def test_update_cells_range(self):
+        request = {'updateCells': {'range': {'sheetId': 3, 'startRowIndex': 1, 'endRowIndex': 4}, 'fields': '*'}}
+        assert get_written_ranges(request) == [(3, (1, 4, 0, float('inf')))]
+
+    def test_update_cells_start(self):
+        request = {'updateCells': {
+            'start': {'sheetId': 3, 'rowIndex': 2, 'columnIndex': 1},
+            'rows': [{'values': [{}, {}]}, {'values': [{}]}],
+            'fields': '*'
+        }}
+        assert get_written_ranges(request) == [(3, (2, 4, 1, 3))]
+
+    def test_structural_requests(self):
+        request = {'deleteRange': {'range': {'sheetId': 3, 'startRowIndex': 1}, 'shiftDimension': 'ROWS'}}
+        assert get_written_ranges(request) == [(3, None)]
+        assert get_written_ranges({'addSheet': {'properties': {'title': 'new'}}}) == [(None, None)]
+
+
+class TestCachedRangeReads:
+
+    def test_reads_cached_until_overlapping_write(self):
+        http_mocks = mock_google_sheets_responses([
+            'table_values.json', 'table_commit_reply.json', 'table_commit_reply.json', 'table_values.json'
+        ])
+        client = SpreadsheetApp(http=http_mocks, cache=RangeCache())
+        metadata = json.loads(open_fixture('get_sheets.json'))
+        sheet = client.open_by_id('some_id', metadata=metadata).get_sheet_by_name('people')
+        values = sheet.get_range_from_a1('A1:C6').get_values()
+        assert sheet.get_range_from_a1('A1:C6').get_values() == values
+        assert len(http_mocks.request_sequence) == 2
+
+        # writing outside of the range keeps it cached
+        sheet.get_range_from_a1('E10').set_value('outside')
+        assert sheet.get_range_from_a1('A1:C6').get_values() == values
+        assert len(http_mocks.request_sequence) == 3
+
+        sheet.get_range_from_a1('B2').set_value('inside')
+        assert sheet.get_range_from_a1('A1:C6').get_values() == values
+        assert len(http_mocks.request_sequence) == 5
+
+    def test_other_field_masks_not_cached(self):
+        http_mocks = mock_google_sheets_responses(['table_values.json', 'table_notes.json'])
+        client = SpreadsheetApp(http=http_mocks, cache=RangeCache())
+        metadata = json.loads(open_fixture('get_sheets.json'))
+        data_range = client.open_by_id('some_id', metadata=metadata).get_sheet_by_name('people').get_range_from_a1(
+            'A1:C6')
+        data_range.get_values()
+        data_range.get_notes()
+        data_range.get_notes()
+        assert len(http_mocks.request_sequence) == 3
+
+
+class TestCacheRevalidation:
+
+    def test_revalidate_expired_entries(self):
+        clock = FakeClock()
+        cache = RangeCache(ttl=10, clock=clock, revalidate=True)
+        cache.set(('id', 'A1', 'mask'), 'data', version='5')
+        clock.now = 10
+        assert cache.get(('id', 'A1', 'mask')) is None
+        assert cache.get(('id', 'A1', 'mask'), version='6') is None
+        assert cache.get(('id', 'A1', 'mask'), version='5') == 'data'
+        clock.now = 19
+        assert cache.get(('id', 'A1', 'mask')) == 'data'
+        cache.set_version('id', '6')
+        assert cache.get_version('id') == '6'
+        assert len(cache) == 0
+
+    def test_spreadsheet_version_probe(self):
+        http_mocks = mock_google_sheets_responses(['table_values.json', 'table_values.json'])
+        clock = FakeClock()
+        client = SpreadsheetApp(http=http_mocks, cache=RangeCache(ttl=10, clock=clock, revalidate=True))
+        client.drive_service = FakeDriveService(['1', '1', '2'])
+        metadata = json.loads(open_fixture('get_sheets.json'))
+        data_range = client.open_by_id('some_id', metadata=metadata).get_sheet_by_name('people').get_range_from_a1(
+            'A1:C6')
+        values = data_range.get_values()
+        assert client.drive_service.requests == [('some_id', 'version')]
+
+        # unchanged spreadsheet: only the version is requested
+        clock.now = 10
+        assert data_range.get_values() == values
+        assert len(client.drive_service.requests) == 2
+        assert len(http_mocks.request_sequence) == 2
+
+        clock.now = 20
+        assert data_range.get_values() == values
+        assert len(client.drive_service.requests) == 3
+        assert len(http_mocks.request_sequence) == 3
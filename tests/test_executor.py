@@ -0,0 +1,154 @@
+from googleapiclient.errors import HttpError
+from httplib2 import Response
+from sheetfu import SpreadsheetApp
+from sheetfu.executor import RequestExecutor, TokenBucket
+from tests.utils import mock_google_sheets_responses, open_fixture
+import pytest
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = list()
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeRequest:
+
+    def __init__(self, outcomes, method='GET', uri=''):
+        self.outcomes = list(outcomes)
+        self.method = method
+        self.uri = uri
+        self.calls = 0
+
+    def execute(self):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def http_error(status, headers=None):
+    response_headers = {'status': status}
+    response_headers.update(headers or dict())
+    return HttpError(Response(response_headers), b'{}')
+
+
+class TestTokenBucket:
+
+    def test_burst_then_wait(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1, capacity=2, clock=clock, sleep=clock.sleep)
+        assert bucket.acquire() == 0
+        assert bucket.acquire() == 0
+        assert bucket.acquire() == 1
+        assert clock.sleeps == [1]
+
+    def test_refill(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, capacity=1, clock=clock, sleep=clock.sleep)
+        bucket.acquire()
+        clock.now += 0.5
+        assert bucket.acquire() == 0
+
+    def test_invalid_rate(self):
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
+
+
+class TestRequestExecutor:
+
+    def make_executor(self, clock, **kwargs):
+        return RequestExecutor(clock=clock, sleep=clock.sleep, **kwargs)
+
+    def test_retry_with_backoff(self):
+        clock = FakeClock()
+        executor = self.make_executor(clock, base_delay=1, read_requests_per_minute=None)
+        request = FakeRequest([http_error(429), http_error(503), {'ok': True}])
+        assert executor.execute(request) == {'ok': True}
+        assert request.calls == 3
+        assert 1 <= clock.sleeps[0] < 2
+        assert 2 <= clock.sleeps[1] < 3
+
+    def test_retry_after_header(self):
+        clock = FakeClock()
+        executor = self.make_executor(clock, read_requests_per_minute=None)
+        request = FakeRequest([http_error(429, {'retry-after': '30'}), {}])
+        executor.execute(request)
+        assert clock.sleeps == [30]
+
+    def test_no_retry_on_client_error(self):
+        clock = FakeClock()
+        executor = self.make_executor(clock)
+        request = FakeRequest([http_error(400), {}])
+        with pytest.raises(HttpError):
+            executor.execute(request)
+        assert request.calls == 1
+
+    def test_retries_exhausted(self):
+        clock = FakeClock()
+        executor = self.make_executor(clock, max_retries=2)
+        request = FakeRequest([http_error(500)] * 3)
+        with pytest.raises(HttpError):
+            executor.execute(request)
+        assert request.calls == 3
+
+    def test_non_idempotent_retried_on_rate_limit_only(self):
+        clock = FakeClock()
+        executor = self.make_executor(clock)
+        request = FakeRequest([http_error(429), {'ok': True}], method='POST')
+        assert executor.execute(request) == {'ok': True}
+        for error in (http_error(503), ConnectionError()):
+            request = FakeRequest([error, {}], method='POST')
+            with pytest.raises(type(error)):
+                executor.execute(request)
+            assert request.calls == 1
+        assert executor.execute(FakeRequest([http_error(503), {}], method='PUT')) == {}
+
+    def test_read_post_requests(self):
+        clock = FakeClock()
+        executor = self.make_executor(clock, read_requests_per_minute=1, write_requests_per_minute=1)
+        uri = 'https://sheets.googleapis.com/v4/spreadsheets/some_id:getByDataFilter?fields=sheets%2Fproperties'
+        request = FakeRequest([http_error(503), {}], method='POST', uri=uri)
+        assert executor.get_limiter(request) is executor.read_limiter
+        assert executor.execute(request) == {}
+        assert request.calls == 2
+
+    def test_not_rate_limited_by_default(self):
+        clock = FakeClock()
+        executor = self.make_executor(clock)
+        assert executor.read_limiter is None
+        assert executor.write_limiter is None
+
+    def test_custom_retry_statuses(self):
+        clock = FakeClock()
+        executor = self.make_executor(clock)
+        request = FakeRequest([http_error(404), {}])
+        assert executor.execute(request, retry_statuses={404}) == {}
+
+    def test_reads_and_writes_are_limited_separately(self):
+        clock = FakeClock()
+        executor = self.make_executor(clock, read_requests_per_minute=1, write_requests_per_minute=1)
+        executor.execute(FakeRequest([{}]))
+        executor.execute(FakeRequest([{}], method='POST'))
+        assert clock.sleeps == []
+        executor.execute(FakeRequest([{}]))
+        assert clock.sleeps == [60]
+
+    def test_client_requests_are_retried(self):
+        clock = FakeClock()
+        http_mocks = mock_google_sheets_responses()
+        http_mocks._iterable.append(({'status': '429'}, '{}'))
+        http_mocks._iterable.append(({'status': '200'}, open_fixture('get_sheets.json')))
+        client = SpreadsheetApp(http=http_mocks, executor=self.make_executor(clock))
+        spreadsheet = client.open_by_id('some_id')
+        assert len(spreadsheet.sheets) == 2
+        assert len(clock.sleeps) == 1
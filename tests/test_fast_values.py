@@ -0,0 +1,142 @@
+import datetime
+import json
+
+import pytest
+
+from sheetfu import SpreadsheetApp, Table
+from sheetfu.cache import RangeCache
+from sheetfu.exceptions import SizeNotMatchingException
+from sheetfu.model import get_raw_values
+from tests.utils import mock_google_sheets_responses, open_fixture
+
+
+def open_spreadsheet(fixtures, cache=None):
+    http_mocks = mock_google_sheets_responses(fixtures)
+    client = SpreadsheetApp(http=http_mocks, cache=cache, fast_values=True)
+    metadata = json.loads(open_fixture('get_sheets.json'))
+    return http_mocks, client.open_by_id('some_id', metadata=metadata)
+
+
+class TestFastValuesReads:
+
+    def test_get_values(self):
+        http_mocks, spreadsheet = open_spreadsheet(['people.json'])
+        values = spreadsheet.get_sheet_by_name('people').get_range_from_a1('A1:E3').get_values()
+        assert values == [
+            ['name', 'surname', 'age', 'birth_date', ''],
+            ['philippe', 'oger', '36', '', ''],
+            ['ico', 'whatever', '35', '', ''],
+        ]
+        uri = http_mocks.request_sequence[-1][0]
+        assert '/values/people%21A1%3AE3?' in uri
+        assert 'valueRenderOption=UNFORMATTED_VALUE' in uri
+        assert 'dateTimeRenderOption=SERIAL_NUMBER' in uri
+
+    def test_get_values_padded(self):
+        http_mocks, spreadsheet = open_spreadsheet(['no_data_range.json'])
+        values = spreadsheet.get_sheet_by_name('people').get_range_from_a1('A1:B2').get_values()
+        assert values == [['', ''], ['', '']]
+
+    def test_get_data(self):
+        http_mocks, spreadsheet = open_spreadsheet(['people.json', 'table_notes.json'])
+        data_range = spreadsheet.get_sheet_by_name('people').get_range_from_a1('A1:C6')
+        assert data_range.get_data()['values'][1] == ['philippe', 'oger', '36']
+        # other dimensions are read from the grid data
+        data_range.get_data(notes=True)
+        assert 'includeGridData=true' in http_mocks.request_sequence[-1][0]
+
+    def test_get_ranges(self):
+        http_mocks, spreadsheet = open_spreadsheet(['values_batch_get.json'])
+        data = spreadsheet.get_ranges(['people!A1:B2', 'whatever!C1:D3'])
+        assert data == [
+            {'values': [['name', 'surname'], ['philippe', 'oger']]},
+            {'values': [[36, 43831.5], ['', ''], ['', '']]},
+        ]
+        assert len(http_mocks.request_sequence) == 2
+        assert '/values:batchGet?' in http_mocks.request_sequence[-1][0]
+
+    def test_reads_cached(self):
+        http_mocks, spreadsheet = open_spreadsheet(['people.json', 'values_update.json', 'people.json'], RangeCache())
+        sheet = spreadsheet.get_sheet_by_name('people')
+        values = sheet.get_range_from_a1('A1:C6').get_values()
+        assert sheet.get_range_from_a1('A1:C6').get_values() == values
+        assert len(http_mocks.request_sequence) == 2
+        sheet.get_range_from_a1('B2').set_value('inside')
+        assert sheet.get_range_from_a1('A1:C6').get_values() == values
+        assert len(http_mocks.request_sequence) == 4
+
+
+class TestFastValuesWrites:
+
+    def test_raw_values(self):
+        assert get_raw_values([['a', 1, 2.5], [True, None, '']]) == [['a', 1, 2.5], [True, '', '']]
+        assert get_raw_values([['a', '=A1']]) is None
+        assert get_raw_values([['a'], [datetime.datetime(2020, 1, 1)]]) is None
+
+    def test_set_values(self):
+        http_mocks, spreadsheet = open_spreadsheet(['values_update.json'])
+        spreadsheet.get_sheet_by_name('people').get_range_from_a1('A1:B2').set_values([['a', None], [1, True]])
+        uri, method, body, _ = http_mocks.request_sequence[-1]
+        assert method == 'PUT'
+        assert '/values/people%21A1%3AB2?' in uri
+        assert 'valueInputOption=RAW' in uri
+        assert json.loads(body) == {'values': [['a', ''], [1, True]]}
+
+    def test_set_values_fallback(self):
+        http_mocks, spreadsheet = open_spreadsheet(['table_commit_reply.json', 'table_commit_reply.json'])
+        sheet = spreadsheet.get_sheet_by_name('people')
+        sheet.get_range_from_a1('A1:B1').set_values([['a', '=SUM(C1:C3)']])
+        sheet.get_range_from_a1('A1').set_values([[datetime.datetime(2020, 1, 1)]])
+        for uri, method, body, _ in http_mocks.request_sequence[1:]:
+            assert uri.endswith(':batchUpdate?alt=json')
+            assert 'updateCells' in json.loads(body)['requests'][0]
+
+    def test_batched_set_values(self):
+        http_mocks, spreadsheet = open_spreadsheet([])
+        sheet = spreadsheet.get_sheet_by_name('people')
+        sheet.get_range_from_a1('A1').set_values([['a']], batch_to=sheet)
+        assert 'updateCells' in sheet.batches[0]
+        assert len(http_mocks.request_sequence) == 1
+
+    def test_set_ranges_values(self):
+        http_mocks, spreadsheet = open_spreadsheet(['values_update.json', 'table_commit_reply.json'])
+        spreadsheet.set_ranges_values(
+            ['people!A1:B1', 'whatever!C3', 'people!D4'],
+            [[['a', 1]], [['=A1']], [[2.5]]]
+        )
+        assert len(http_mocks.request_sequence) == 3
+        uri, method, body, _ = http_mocks.request_sequence[1]
+        assert '/values:batchUpdate?' in uri
+        assert json.loads(body) == {
+            'valueInputOption': 'RAW',
+            'data': [
+                {'range': 'people!A1:B1', 'values': [['a', 1]]},
+                {'range': 'people!D4', 'values': [[2.5]]},
+            ]
+        }
+        body = json.loads(http_mocks.request_sequence[2][2])
+        assert body['requests'][0]['updateCells']['range']['sheetId'] == 1826625011
+
+    def test_set_ranges_values_size(self):
+        http_mocks, spreadsheet = open_spreadsheet([])
+        with pytest.raises(SizeNotMatchingException):
+            spreadsheet.set_ranges_values(['people!A1:B1', 'people!A2'], [[['a', 1]], [['b', 2]]])
+        with pytest.raises(ValueError):
+            spreadsheet.set_ranges_values(['people!A1'], [])
+        assert len(http_mocks.request_sequence) == 1
+
+
+class TestFastValuesTables:
+
+    def test_tables_read_from_grid(self):
+        http_mocks, spreadsheet = open_spreadsheet(['table_values_datetime.json'])
+        table = Table(spreadsheet.get_sheet_by_name('people').get_range_from_a1('A1:B3'), single_request=True)
+        assert 'includeGridData=true' in http_mocks.request_sequence[-1][0]
+        assert table[0].get_field_value('birthday') == datetime.datetime(2021, 5, 1)
+        table.sort('name')
+        # the dates are written back with their format
+        assert len(table.batches) == 1
+        for batch in table.batches:
+            for row in batch['updateCells']['rows']:
+                birthday = row['values'][1]
+                assert 'numberFormat' in birthday['userEnteredFormat']
@@ -0,0 +1,112 @@
+import datetime
+
+import pytest
+
+from sheetfu import SpreadsheetApp, Table
+from sheetfu.exceptions import SizeNotMatchingException
+from tests.utils import mock_google_sheets_responses
+
+pandas = pytest.importorskip('pandas')
+
+
+def open_sheet(fixtures):
+    http_mocks = mock_google_sheets_responses(['table_get_sheets.json'] + fixtures)
+    return SpreadsheetApp(http=http_mocks).open_by_id('whatever').get_sheet_by_name('Sheet1')
+
+
+class TestRangeFrame:
+
+    def test_get_frame(self):
+        frame = open_sheet(['table_values.json']).get_range_from_a1('A1:C6').get_frame()
+        assert list(frame.columns) == ['name', 'surname', 'age']
+        assert len(frame) == 5
+        assert frame['age'].dtype == 'float64'
+        assert frame['age'].tolist() == [37.0, 25.0, 25.0, 30.0, 30.0]
+        assert pandas.api.types.is_string_dtype(frame['name'])
+        assert frame['name'][0] == 'philippe'
+
+    def test_get_frame_dates(self):
+        frame = open_sheet(['table_values_datetime.json']).get_range_from_a1('A1:B3').get_frame(categorical=True)
+        assert frame['birthday'].dtype.kind == 'M'
+        assert frame['birthday'][0] == pandas.Timestamp(2021, 5, 1)
+        assert frame['birthday'][1] == pandas.Timestamp(2021, 9, 30)
+        assert frame['name'].dtype == 'category'
+
+    def test_get_frame_without_header(self):
+        frame = open_sheet(['table_values.json']).get_range_from_a1('A1:C6').get_frame(header=False)
+        assert list(frame.columns) == [0, 1, 2]
+        assert len(frame) == 6
+        # the header is a string in a number column
+        assert frame[2].tolist() == ['age', 37, 25, 25, 30, 30]
+
+    def test_set_frame(self):
+        sheet = open_sheet([])
+        frame = pandas.DataFrame({
+            'name': ['arya', None],
+            'age': [18.0, float('nan')],
+            'birthday': [pandas.Timestamp(2021, 5, 1, 12), pandas.NaT],
+            'alive': [True, False],
+        })
+        target_range = sheet.get_range_from_a1('B2:E4')
+        target_range.set_frame(frame, batch_to=sheet)
+        request = sheet.batches[0]['updateCells']
+        assert request['fields'] == 'userEnteredValue,userEnteredFormat'
+        assert request['range'] == target_range.get_grid_range()
+        rows = [row['values'] for row in request['rows']]
+        assert rows[0][0] == {'userEnteredValue': {'stringValue': 'name'}}
+        assert rows[1] == [
+            {'userEnteredValue': {'stringValue': 'arya'}},
+            {'userEnteredValue': {'numberValue': 18.0}},
+            {'userEnteredValue': {'numberValue': 44317.5}, 'userEnteredFormat': {'numberFormat': {'type': 'DATE_TIME'}}},
+            {'userEnteredValue': {'boolValue': True}},
+        ]
+        assert rows[2][:3] == [{'userEnteredValue': {'stringValue': ''}}] * 3
+
+    def test_set_frame_size(self):
+        sheet = open_sheet([])
+        frame = pandas.DataFrame({'name': ['arya']})
+        with pytest.raises(SizeNotMatchingException):
+            sheet.get_range_from_a1('A1:A3').set_frame(frame, batch_to=sheet)
+        with pytest.raises(SizeNotMatchingException):
+            sheet.get_range_from_a1('A1:B2').set_frame(frame, batch_to=sheet)
+        sheet.get_range_from_a1('A1').set_frame(frame, header=False, batch_to=sheet)
+        assert len(sheet.batches) == 1
+
+
+class TestTableFrame:
+
+    def test_to_frame(self, columnar_table):
+        frame = columnar_table.to_frame()
+        assert list(frame.columns) == columnar_table.header
+        assert frame['age'].tolist() == [float(age) for age in columnar_table.column('age')]
+        assert frame['age'].dtype == 'float64'
+
+    def test_to_frame_dates(self):
+        sheet = open_sheet(['table_values_datetime.json', 'table_values_datetime.json'])
+        frame = Table(sheet.get_range_from_a1('A1:B3')).to_frame()
+        assert frame['birthday'].dtype.kind == 'M'
+        assert frame['birthday'].tolist() == [pandas.Timestamp(2021, 5, 1), pandas.Timestamp(2021, 9, 30)]
+
+    def test_from_frame(self):
+        sheet = open_sheet([])
+        frame = pandas.DataFrame({
+            'name': ['arya', 'jon'],
+            'birthday': [pandas.Timestamp(2001, 1, 1), pandas.NaT],
+        })
+        table = Table.from_frame(frame, sheet.get_range_from_a1('B2'))
+        assert table.header == ['name', 'birthday']
+        assert table[0].get_field_value('birthday') == datetime.datetime(2001, 1, 1)
+        assert table[1].get_field_value('birthday') == ''
+        assert table.full_range.a1 == 'Sheet1!B2:C4'
+        assert len(table.batches) == 1
+        assert len(table.batches[0]['updateCells']['rows']) == 3
+
+    def test_from_frame_keeps_empty_rows(self):
+        sheet = open_sheet([])
+        frame = pandas.DataFrame({0: ['arya', None], 1: [1.0, float('nan')]})
+        table = Table.from_frame(frame, sheet.get_range_from_a1('A1'), columnar=True)
+        assert table.header == ['0', '1']
+        assert table[0].get_field_value('0') == 'arya'
+        assert len(table) == 2
+        assert table[1].get_field_value('1') == ''
+        assert table.full_range.a1 == 'Sheet1!A1:B3'
@@ -1,6 +1,12 @@
+from googleapiclient.errors import HttpError
+from sheetfu import model
 from sheetfu.client import SpreadsheetApp
-from sheetfu.exceptions import RowOrColumnEqualsZeroError
-from sheetfu.model import Spreadsheet, Sheet, Range
+from sheetfu.exceptions import (
+    RowOrColumnEqualsZeroError, BatchCommitError, SheetNameNoMatchError, SheetIdNoMatchError)
+from sheetfu.model import (
+    Spreadsheet, Sheet, Range, split_batches, get_payload_size, coalesce_update_cells, field_masks_overlap)
+from sheetfu.helpers import RangeCoordinates
+from sheetfu.parsers import CellParsers
 from tests.utils import mock_range_instance, mock_spreadsheet_instance, mock_google_sheets_responses
 from tests.utils import open_fixture
 import pytest
@@ -92,6 +98,18 @@ class TestGettersFromDataRange:
             assert len(row) == self.data_range.coordinates.number_of_columns
 
 
+class TestDataRangeChunks:
+
+    def test_data_range_read_by_chunks(self, monkeypatch):
+        monkeypatch.setattr(model, 'DATA_RANGE_CHUNK_ROWS', 600)
+        http_mocks = mock_spreadsheet_instance(['no_data_range.json', 'people.json'])
+        data_range = SpreadsheetApp(http=http_mocks).open_by_id('some_id').get_sheet_by_name('people').get_data_range()
+        # the empty rows of the first chunk do not end the data range
+        assert data_range.a1 == 'people!A1:D621'
+        assert 'people%211%3A600' in http_mocks.request_sequence[2][0]
+        assert 'people%21601%3A1000' in http_mocks.request_sequence[3][0]
+
+
 class TestCellRange:
 
     http_sheets_mocks = mock_range_instance()
@@ -106,6 +124,20 @@ class TestCellRange:
         assert self.data_range.get_cell(1, 2).a1 == 'people!B1'
         assert self.data_range.get_cell(2, 1).a1 == 'people!A2'
 
+    def test_ranges_from_coordinates(self, monkeypatch):
+        def fail(a1_string):
+            raise AssertionError("Parsed {}".format(a1_string))
+        monkeypatch.setattr(model, 'convert_a1_to_coordinates', fail)
+        sheet = self.data_range.sheet
+        cell = self.data_range.get_cell(2, 3)
+        assert cell._a1 is None
+        assert cell.coordinates == RangeCoordinates(2, 3, 1, 1, 'people')
+        assert cell.a1 == 'people!C2'
+        assert self.data_range.offset(1, 1, num_rows=2).a1 == 'people!B2:E3'
+        assert sheet.get_range(3, 2, number_of_row=2).get_grid_range()['endRowIndex'] == 4
+        assert not hasattr(cell, '__dict__')
+        assert cell.batches == []
+
 
 class TestGridRange:
 
@@ -131,6 +163,15 @@ class TestGridRange:
         assert grid_range['startColumnIndex'] == 0
         assert grid_range['endColumnIndex'] == 2
 
+    def test_grid_range_whole_columns_and_rows(self):
+        columns = self.sheet.get_range_from_a1('B:C')
+        assert columns.a1 == 'people!B:C'
+        assert columns.coordinates.number_of_rows == 1000
+        assert columns.get_grid_range()['endColumnIndex'] == 3
+        rows = self.sheet.get_range_from_a1('3:4')
+        assert rows.get_grid_range()['startRowIndex'] == 2
+        assert rows.get_grid_range()['endColumnIndex'] == 26
+
     def test_offsets(self):
         range = self.sheet.get_range_from_a1('C5:E20')
         assert range.coordinates.row == 5
@@ -231,6 +272,8 @@ class TestSheetCreationMethodReturns:
 
     http_sheets_mocks = mock_spreadsheet_instance(["add_sheets.json", "duplicate_sheets.json"])
     spreadsheet = SpreadsheetApp(http=http_sheets_mocks).open_by_id('some_id')
+    # the sheets are loaded first, so that the new sheets are added to them
+    spreadsheet.get_sheet_by_name('people')
 
     def test_create_sheets_types(self):
         new_sheets = self.spreadsheet.create_sheets(["test_sheet", "test_sheet_2"])
@@ -294,3 +337,399 @@ class TestDatetimeValues:
         assert test_date.year == 2021
         assert test_date.month == 5
         assert test_date.day == 1
+
+
+class TestParseGridData:
+
+    http_mocks = mock_spreadsheet_instance()
+    sheet = SpreadsheetApp(http=http_mocks).open_by_id('some_id').get_sheet_by_name("people")
+    data_range = sheet.get_range_from_a1("A1:C4")
+    grid_data = [{
+        "rowData": [
+            {"values": [{"effectiveValue": {"stringValue": "a"}, "note": "note a"}, {}, {"note": "note c"}]},
+            {},
+            {"values": [{"effectiveValue": {"numberValue": 3}}]},
+        ]
+    }]
+
+    def test_sparse_grid_data(self):
+        data = self.data_range.parse_grid_data(self.grid_data, {
+            "values": CellParsers.get_value,
+            "notes": CellParsers.get_note,
+        })
+        assert data["values"] == [["a", "", ""], ["", "", ""], [3, "", ""], ["", "", ""]]
+        assert data["notes"] == [["note a", "", "note c"], ["", "", ""], ["", "", ""], ["", "", ""]]
+
+    def test_column_parsers(self):
+        data = self.data_range.parse_grid_data(self.grid_data, {
+            "data": [CellParsers.get_value, CellParsers.get_value, CellParsers.get_note]
+        })
+        assert data["data"][0] == ["a", "", "note c"]
+
+    def test_empty_grid_data(self):
+        data = self.data_range.parse_grid_data([{}], {"values": CellParsers.get_value})
+        assert data["values"] == [["", "", ""]] * 4
+
+    def test_cells_missing_dimension_are_not_parsed(self, monkeypatch):
+        parsed_cells = []
+
+        def get_note(cell):
+            parsed_cells.append(cell)
+            return cell["note"]
+
+        monkeypatch.setitem(model.CELL_PARSER_KEYS, get_note, "note")
+        grid_data = [{
+            "rowData": [
+                {"values": [
+                    {"effectiveFormat": {"numberFormat": {"type": "DATE"}}},
+                    {"effectiveValue": {"stringValue": "b"}},
+                    {"note": "note c"},
+                ]},
+            ]
+        }]
+        data = self.data_range.parse_grid_data(grid_data, {"values": CellParsers.get_value, "notes": get_note})
+        assert data["values"][0] == ["", "b", ""]
+        assert data["notes"][0] == ["", "", "note c"]
+        assert parsed_cells == [{"note": "note c"}]
+
+
+class TestRangeIterRows:
+
+    def test_iter_rows_by_chunks(self):
+        http_mocks = mock_spreadsheet_instance([
+            "table_chunk_1.json", "table_chunk_2.json", "table_chunk_3.json"
+        ])
+        sheet = SpreadsheetApp(http=http_mocks).open_by_id('some_id').get_sheet_by_name("people")
+        rows = list(sheet.get_range_from_a1("A2:C6").iter_rows(chunk_rows=2))
+        assert len(rows) == 5
+        assert rows[0] == ["philippe", "oger", 37]
+        assert rows[4][0] == "random"
+        assert len(http_mocks.request_sequence) == 5
+
+    def test_invalid_chunk_size(self):
+        sheet = SpreadsheetApp(http=mock_spreadsheet_instance()).open_by_id('some_id').get_sheet_by_name("people")
+        with pytest.raises(ValueError):
+            list(sheet.get_range_from_a1("A2:C6").iter_rows(chunk_rows=0))
+
+    def test_full_range(self):
+        sheet = SpreadsheetApp(http=mock_spreadsheet_instance()).open_by_id('some_id').get_sheet_by_name("people")
+        assert sheet.get_full_range().a1 == "people!A1:Z1000"
+
+
+def make_update_cells_request(rows, start_row_index=0):
+    return {
+        'updateCells': {
+            'range': {
+                'sheetId': 0,
+                'startRowIndex': start_row_index,
+                'endRowIndex': start_row_index + len(rows),
+                'startColumnIndex': 0,
+                'endColumnIndex': 1
+            },
+            'fields': 'userEnteredValue',
+            'rows': [{'values': [{'userEnteredValue': {'stringValue': value}}]} for value in rows]
+        }
+    }
+
+
+class TestBatchSplitting:
+
+    def test_split_by_number_of_requests(self):
+        requests = [make_update_cells_request([str(index)], index) for index in range(5)]
+        chunks = split_batches(requests, max_requests=2)
+        assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+        assert [request for chunk in chunks for request in chunk] == requests
+
+    def test_split_by_payload_size(self):
+        requests = [make_update_cells_request(['x' * 100], index) for index in range(6)]
+        max_payload_bytes = get_payload_size({'requests': requests[:2]})
+        chunks = split_batches(requests, max_payload_bytes=max_payload_bytes)
+        assert [len(chunk) for chunk in chunks] == [2, 2, 2]
+        for chunk in chunks:
+            assert get_payload_size({'requests': chunk}) <= max_payload_bytes
+
+    def test_split_oversized_update_cells_request(self):
+        request = make_update_cells_request(['x' * 100] * 10, start_row_index=4)
+        # a few bytes of margin for the longer row indexes of the range
+        max_payload_bytes = get_payload_size({'requests': [make_update_cells_request(['x' * 100] * 3)]}) + 10
+        chunks = split_batches([request], max_payload_bytes=max_payload_bytes)
+        parts = [part['updateCells'] for chunk in chunks for part in chunk]
+        assert [len(part['rows']) for part in parts] == [3, 3, 3, 1]
+        assert [part['range']['startRowIndex'] for part in parts] == [4, 7, 10, 13]
+        assert [part['range']['endRowIndex'] for part in parts] == [7, 10, 13, 14]
+        assert sum((part['rows'] for part in parts), []) == request['updateCells']['rows']
+
+    def test_invalid_bounds(self):
+        with pytest.raises(ValueError):
+            split_batches([], max_requests=0)
+
+
+class TestSpreadsheetBatchUpdate:
+
+    def test_commit_in_chunks(self):
+        http_mocks = mock_google_sheets_responses(["table_commit_reply.json"] * 3)
+        spreadsheet = SpreadsheetApp(http=http_mocks).open_by_id('some_id')
+        # rows are not adjacent, so that the requests are not coalesced
+        requests = [make_update_cells_request([str(index)], index * 2) for index in range(3)]
+        response = spreadsheet.batch_update(requests, max_requests=1)
+        assert len(response['replies']) == 3
+        bodies = [json.loads(body) for _, _, body, _ in http_mocks.request_sequence[1:]]
+        assert [body['requests'] for body in bodies] == [[request] for request in requests]
+
+    def test_api_response(self):
+        http_mocks = mock_google_sheets_responses(["table_commit_reply.json"])
+        spreadsheet = SpreadsheetApp(http=http_mocks).open_by_id('some_id')
+        response = spreadsheet.batch_update([make_update_cells_request(['a'], 0)])
+        assert response == json.loads(open_fixture("table_commit_reply.json"))
+
+    def test_set_request_response(self):
+        http_mocks = mock_spreadsheet_instance(["table_commit_reply.json"])
+        sheet = SpreadsheetApp(http=http_mocks).open_by_id('some_id').get_sheet_by_name('people')
+        response = sheet.get_range_from_a1('A1').set_values([['a']])
+        assert response == json.loads(open_fixture("table_commit_reply.json"))
+
+    def test_failed_commit(self):
+        http_mocks = mock_google_sheets_responses()
+        http_mocks._iterable.append(({'status': '400'}, '{}'))
+        spreadsheet = SpreadsheetApp(http=http_mocks).open_by_id('some_id')
+        # rows are not adjacent, so that the requests are not coalesced
+        requests = [make_update_cells_request([str(index)], index * 2) for index in range(3)]
+        spreadsheet.batches = list(requests)
+        with pytest.raises(BatchCommitError) as error:
+            spreadsheet.commit()
+        assert error.value.chunk_index == 0
+        assert error.value.pending_requests == requests
+
+    def test_failed_chunk_keeps_pending_requests(self):
+        http_mocks = mock_google_sheets_responses(["table_commit_reply.json"])
+        http_mocks._iterable.append(({'status': '400'}, '{}'))
+        spreadsheet = SpreadsheetApp(http=http_mocks).open_by_id('some_id')
+        # rows are not adjacent, so that the requests are not coalesced
+        requests = [make_update_cells_request([str(index)], index * 2) for index in range(3)]
+        with pytest.raises(BatchCommitError) as error:
+            spreadsheet.batch_update(requests, max_requests=1)
+        assert error.value.chunk_index == 1
+        assert error.value.number_of_chunks == 3
+        assert len(error.value.replies) == 1
+        assert error.value.pending_requests == requests[1:]
+
+
+def make_cell_request(row_index, column_index, value, fields='userEnteredValue'):
+    return {
+        'updateCells': {
+            'range': {
+                'sheetId': 0,
+                'startRowIndex': row_index,
+                'endRowIndex': row_index + 1,
+                'startColumnIndex': column_index,
+                'endColumnIndex': column_index + 1
+            },
+            'fields': fields,
+            'rows': [{'values': [value]}]
+        }
+    }
+
+
+class TestCoalesceUpdateCells:
+
+    def test_merge_cells_into_rectangle(self):
+        requests = [
+            make_cell_request(row_index, column_index, (row_index, column_index))
+            for row_index in range(1, 11) for column_index in range(3)
+        ]
+        coalesced = coalesce_update_cells(requests)
+        assert len(coalesced) == 1
+        update = coalesced[0]['updateCells']
+        assert update['range'] == {
+            'sheetId': 0, 'startRowIndex': 1, 'endRowIndex': 11, 'startColumnIndex': 0, 'endColumnIndex': 3}
+        assert update['rows'][2]['values'] == [(3, 0), (3, 1), (3, 2)]
+
+    def test_merge_column_of_cells(self):
+        requests = [make_cell_request(row_index, 2, row_index) for row_index in (5, 3, 4, 8)]
+        coalesced = coalesce_update_cells(requests)
+        assert [request['updateCells']['range']['startRowIndex'] for request in coalesced] == [3, 8]
+        assert [request['updateCells']['range']['endRowIndex'] for request in coalesced] == [6, 9]
+        assert coalesced[0]['updateCells']['rows'] == [{'values': [3]}, {'values': [4]}, {'values': [5]}]
+
+    def test_superseded_writes_are_dropped(self):
+        requests = [make_cell_request(1, 1, 'old'), make_cell_request(1, 1, 'new')]
+        coalesced = coalesce_update_cells(requests)
+        assert len(coalesced) == 1
+        assert coalesced[0]['updateCells']['rows'] == [{'values': ['new']}]
+
+    def test_masks_are_not_merged(self):
+        requests = [
+            make_cell_request(1, 0, 'value'),
+            make_cell_request(1, 1, 'note', fields='note'),
+            make_cell_request(1, 1, 'value'),
+        ]
+        coalesced = coalesce_update_cells(requests)
+        assert [request['updateCells']['fields'] for request in coalesced] == ['userEnteredValue', 'note']
+        assert coalesced[0]['updateCells']['range']['endColumnIndex'] == 2
+
+    def test_overlapping_masks_keep_order(self):
+        value_fields = 'userEnteredValue,userEnteredFormat'
+        background_fields = 'userEnteredFormat.backgroundColor'
+        requests = [
+            make_cell_request(1, 0, 'background', fields=background_fields),
+            make_cell_request(1, 0, 'value', fields=value_fields),
+            make_cell_request(2, 0, 'value', fields=value_fields),
+        ]
+        coalesced = coalesce_update_cells(requests)
+        assert [request['updateCells']['fields'] for request in coalesced] == [background_fields, value_fields]
+        assert len(coalesced[1]['updateCells']['rows']) == 2
+
+    def test_other_requests_are_barriers(self):
+        other_request = {'deleteRange': {'range': {'sheetId': 0}, 'shiftDimension': 'ROWS'}}
+        requests = [make_cell_request(1, 0, 'a'), other_request, make_cell_request(2, 0, 'b')]
+        assert coalesce_update_cells(requests) == requests
+
+    def test_field_masks_overlap(self):
+        assert field_masks_overlap('userEnteredValue,userEnteredFormat', 'userEnteredFormat.backgroundColor')
+        assert field_masks_overlap('*', 'note')
+        assert not field_masks_overlap('note', 'userEnteredValue')
+        assert not field_masks_overlap('userEnteredFormat.textFormat', 'userEnteredFormat.backgroundColor')
+
+    def test_table_field_updates_are_coalesced(self, full_table):
+        for item in full_table:
+            item.set_field_value('age', 1)
+            item.set_field_note('age', 'note')
+        assert len(full_table.batches) == 10
+        coalesced = coalesce_update_cells(full_table.batches)
+        assert len(coalesced) == 2
+        assert coalesced[0]['updateCells']['range']['startRowIndex'] == 1
+        assert coalesced[0]['updateCells']['range']['endRowIndex'] == 6
+
+
+class TestSpreadsheetGetRanges:
+
+    def test_get_ranges_across_sheets(self):
+        http_mocks = mock_spreadsheet_instance(["batch_get_ranges.json"])
+        spreadsheet = SpreadsheetApp(http=http_mocks).open_by_id('some_id')
+        data = spreadsheet.get_ranges([
+            "whatever!A1:B2",
+            spreadsheet.get_sheet_by_name("people").get_range_from_a1("A1:B1"),
+            "people!C3",
+        ])
+        assert [range_data["values"] for range_data in data] == [
+            [["a", "b"], ["c", ""]],
+            [["name", "surname"]],
+            [[35]],
+        ]
+        assert len(http_mocks.request_sequence) == 3
+        uri = http_mocks.request_sequence[-1][0]
+        assert uri.count("ranges=") == 3
+
+    def test_get_ranges_in_chunks(self):
+        http_mocks = mock_spreadsheet_instance(["batch_get_ranges.json", "batch_get_ranges.json"])
+        spreadsheet = SpreadsheetApp(http=http_mocks).open_by_id('some_id')
+        data = spreadsheet.get_ranges(
+            ["people!A1:B1", "people!C3", "whatever!A1:B2", "people!A1:B1", "people!C3"],
+            max_ranges_per_request=3
+        )
+        assert len(data) == 5
+        assert data[2]["values"] == [["a", "b"], ["c", ""]]
+        assert data[4]["values"] == [[35]]
+
+    def test_get_ranges_matched_by_start(self):
+        http_mocks = mock_spreadsheet_instance(["batch_get_ranges.json"])
+        spreadsheet = SpreadsheetApp(http=http_mocks).open_by_id('some_id')
+        # the grid data are matched by start cell, not by their order
+        data = spreadsheet.get_ranges(["people!C3", "people!A1:B1"])
+        assert [range_data["values"] for range_data in data] == [[[35]], [["name", "surname"]]]
+        assert "startRow" in http_mocks.request_sequence[-1][0]
+
+    def test_get_ranges_missing_grid_data(self):
+        http_mocks = mock_spreadsheet_instance(["batch_get_ranges.json"])
+        spreadsheet = SpreadsheetApp(http=http_mocks).open_by_id('some_id')
+        with pytest.raises(ValueError):
+            spreadsheet.get_ranges(["people!A1:B1", "people!D4"])
+
+    def test_get_ranges_without_sheet_name(self):
+        spreadsheet = SpreadsheetApp(http=mock_spreadsheet_instance()).open_by_id('some_id')
+        with pytest.raises(ValueError):
+            spreadsheet.get_ranges(["A1:B2"])
+
+
+class TestLazySpreadsheet:
+
+    def test_sheets_requested_on_first_access(self):
+        http_mocks = mock_spreadsheet_instance()
+        spreadsheet = SpreadsheetApp(http=http_mocks).open_by_id('some_id')
+        # only the discovery document was requested
+        assert len(http_mocks.request_sequence) == 1
+        assert len(spreadsheet.sheets) == 2
+        assert len(spreadsheet.sheets) == 2
+        assert len(http_mocks.request_sequence) == 2
+        assert spreadsheet.metadata["sheets"][0]["properties"]["title"] == "people"
+
+    def test_injected_metadata(self):
+        http_mocks = mock_google_sheets_responses()
+        metadata = json.loads(open_fixture("get_sheets.json"))
+        spreadsheet = SpreadsheetApp(http=http_mocks).open_by_id('some_id', metadata=metadata)
+        assert spreadsheet.get_sheet_by_name("whatever").sid == 1826625011
+        assert len(http_mocks.request_sequence) == 1
+
+    def test_open_sheet_by_name(self):
+        http_mocks = mock_google_sheets_responses(["table_values.json", "sheet_properties.json"])
+        spreadsheet = SpreadsheetApp(http=http_mocks).open_by_id('some_id')
+        sheet = spreadsheet.open_sheet(name="sheet1")
+        values = sheet.get_range_from_a1("A1:C6").get_values()
+        assert values[1] == ["philippe", "oger", 37]
+        assert len(http_mocks.request_sequence) == 2
+        # the sheet properties are only requested when needed
+        assert sheet.sid == 0
+        assert sheet.name == "Sheet1"
+        assert sheet.get_max_rows() == 1000
+        assert len(http_mocks.request_sequence) == 3
+        assert "fields=sheets%2Fproperties" in http_mocks.request_sequence[-1][0]
+
+    def test_open_sheet_by_id(self):
+        spreadsheet = SpreadsheetApp(http=mock_spreadsheet_instance()).open_by_id('some_id')
+        assert len(spreadsheet.sheets) == 2
+        assert spreadsheet.open_sheet(sid=1826625011).name == "whatever"
+        assert spreadsheet.open_sheet(name="people") is spreadsheet.get_sheet_by_name("people")
+        with pytest.raises(ValueError):
+            spreadsheet.open_sheet()
+
+    def test_open_sheet_by_id_alone(self):
+        http_mocks = mock_google_sheets_responses(["sheet_properties.json"])
+        spreadsheet = SpreadsheetApp(http=http_mocks).open_by_id('some_id')
+        sheet = spreadsheet.open_sheet(sid=0)
+        assert sheet.name == "Sheet1"
+        assert sheet.get_max_rows() == 1000
+        uri, method, body, _ = http_mocks.request_sequence[-1]
+        assert ":getByDataFilter?" in uri
+        assert "fields=sheets%2Fproperties" in uri
+        assert json.loads(body)["dataFilters"] == [{"gridRange": {"sheetId": 0}}]
+        with pytest.raises(SheetIdNoMatchError):
+            SpreadsheetApp(http=mock_google_sheets_responses(["sheet_properties.json"])).open_by_id(
+                'some_id').open_sheet(sid=12)
+
+    def test_open_sheet_with_cell_like_name(self):
+        http_mocks = mock_google_sheets_responses(["sheet_properties.json"])
+        spreadsheet = SpreadsheetApp(http=http_mocks).open_by_id('some_id')
+        sheet = spreadsheet.open_sheet(name="Q1")
+        assert sheet.sid == 0
+        assert "ranges=%27Q1%27" in http_mocks.request_sequence[-1][0]
+
+    def test_open_unknown_sheet(self):
+        http_mocks = mock_google_sheets_responses()
+        http_mocks._iterable.append((
+            {'status': '400'},
+            '{"error": {"code": 400, "message": "Unable to parse range: unknown", "status": "INVALID_ARGUMENT"}}'
+        ))
+        spreadsheet = SpreadsheetApp(http=http_mocks).open_by_id('some_id')
+        sheet = spreadsheet.open_sheet(name="unknown")
+        with pytest.raises(SheetNameNoMatchError):
+            sheet.sid
+
+    def test_sheet_properties_other_errors(self):
+        http_mocks = mock_google_sheets_responses()
+        http_mocks._iterable.append((
+            {'status': '400'},
+            '{"error": {"code": 400, "message": "Invalid fields", "status": "INVALID_ARGUMENT"}}'
+        ))
+        spreadsheet = SpreadsheetApp(http=http_mocks).open_by_id('some_id')
+        with pytest.raises(HttpError):
+            spreadsheet.open_sheet(name="people").sid
@@ -1,7 +1,13 @@
-from sheetfu.service import SheetsService
+import os
+
+from sheetfu import SpreadsheetApp
+from sheetfu import service as service_module
+from sheetfu.service import (
+    SheetsService, BaseService, DiscoveryCache, HttpPool, get_user_cache_directory)
 from googleapiclient.http import HttpMockSequence
 from googleapiclient.discovery import Resource
-from tests.utils import open_fixture
+from tests.utils import open_fixture, mock_spreadsheet_instance
+from concurrent.futures import ThreadPoolExecutor
 
 
 class TestServiceCreation:
@@ -14,3 +20,91 @@ class TestServiceCreation:
     def test_mock_instantiation(self):
         service = SheetsService().build(http=self.http_mocks)
         assert isinstance(service, Resource)
+
+
+class TestDiscoveryCache:
+
+    url = 'https://www.googleapis.com/discovery/v1/apis/sheets/v4/rest'
+
+    def test_memory_and_disk_cache(self, tmpdir):
+        cache = DiscoveryCache(directory=str(tmpdir.join('discovery')))
+        assert cache.get(self.url) is None
+        cache.set(self.url, '{"name": "sheets"}')
+        assert cache.get(self.url) == '{"name": "sheets"}'
+        # a new process only has the document saved on disk
+        assert DiscoveryCache(directory=cache.directory).get(self.url) == '{"name": "sheets"}'
+
+    def test_expired_documents(self, tmpdir):
+        cache = DiscoveryCache(directory=str(tmpdir), ttl=60)
+        cache.set(self.url, '{}')
+        old_time = os.path.getmtime(cache.get_path(self.url)) - 120
+        os.utime(cache.get_path(self.url), (old_time, old_time))
+        cache.documents[self.url] = ('{}', old_time)
+        assert cache.get(self.url) is None
+
+    def test_private_user_directory(self, tmpdir, monkeypatch):
+        monkeypatch.setenv('XDG_CACHE_HOME', str(tmpdir))
+        directory = get_user_cache_directory()
+        assert directory == str(tmpdir.join('sheetfu'))
+        if hasattr(os, 'getuid'):
+            assert os.stat(directory).st_mode & 0o777 == 0o700
+            # a directory others can write to is not used
+            os.chmod(directory, 0o777)
+            assert get_user_cache_directory() is None
+            cache = DiscoveryCache()
+            cache.set(self.url, '{}')
+            assert cache.directory is None
+            assert cache.get(self.url) == '{}'
+            assert os.listdir(directory) == []
+
+
+class TestServiceBuild:
+
+    secret_path = os.path.join(os.path.dirname(__file__), 'fake_secret.json')
+
+    def fake_build(self, monkeypatch):
+        built = list()
+
+        def build(service, version, http=None, cache=None):
+            assert cache is service_module.discovery_cache
+            built.append((service, version, http))
+            return object()
+
+        monkeypatch.setattr(service_module, 'build', build)
+        monkeypatch.setattr(BaseService, 'build_http', lambda self: object())
+        return built
+
+    def test_one_service_per_client(self, monkeypatch):
+        built = self.fake_build(monkeypatch)
+        service = SheetsService(path_to_secret=self.secret_path).build()
+        assert SheetsService(path_to_secret=self.secret_path).build() is not service
+        # every service has its own Http object
+        assert built[0][2] is not built[1][2]
+        assert [(name, version) for name, version, _ in built] == [('sheets', 'v4'), ('sheets', 'v4')]
+
+    def test_lazy_drive_service(self, monkeypatch):
+        built = self.fake_build(monkeypatch)
+        client = SpreadsheetApp(path_to_secret=self.secret_path)
+        assert [name for name, _, _ in built] == ['sheets']
+        drive_service = client.drive_service
+        assert client.drive_service is drive_service
+        assert [name for name, _, _ in built] == ['sheets', 'drive']
+
+
+class TestHttpPool:
+
+    def test_one_http_per_thread(self):
+        pool = HttpPool(http_factory=object)
+        assert pool.get() is pool.get()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            thread_http = executor.submit(pool.get).result()
+        assert thread_http is not pool.get()
+
+    def test_thread_safe_client(self):
+        http_mocks = mock_spreadsheet_instance(['people.json'])
+        client = SpreadsheetApp(http=http_mocks, thread_safe=True)
+        assert client.http_pool.get() is http_mocks
+        spreadsheet = client.open_by_id('some_id')
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            data_range = executor.submit(spreadsheet.get_sheet_by_name('people').get_data_range).result()
+        assert data_range.a1 == 'people!A1:D21'
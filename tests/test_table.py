@@ -3,9 +3,10 @@ import datetime
 import pytest
 
 from sheetfu import SpreadsheetApp, Table
+from sheetfu.cache import RangeCache
 from sheetfu.model import Range
 from sheetfu.modules.table import Item
-from tests.utils import mock_google_sheets_responses
+from tests.utils import FakeDriveService, mock_google_sheets_responses
 
 
 class TestTableRanges:
@@ -145,11 +146,76 @@ class TestTableCRUD:
         assert table.full_range.a1 == "Sheet1!A1:C9"
         assert table.items_range.a1 == "Sheet1!A2:C9"
 
+    def test_add_many_items(self, table):
+        table.create_index('name')
+        new_items = table.add_many([
+            {"name": "John", "surname": "Snow", "age": 2},
+            {"name": "Ned", "surname": "Stark"},
+            {"name": "Tyrion", "surname": "Lannister", "age": 4},
+        ])
+        assert table.full_range.a1 == "Sheet1!A1:C9"
+        assert table.items_range.a1 == "Sheet1!A2:C9"
+        assert table.items[5:] == new_items
+        assert [item.row_index for item in new_items] == [5, 6, 7]
+        assert new_items[1].get_field_value("age") is None
+        assert table.select({"name": "Ned"}) == [new_items[1]]
+        # one request for all the new rows, and no grid extension
+        assert len(table.batches) == 1
+        request = table.batches[0]["updateCells"]
+        assert request["range"]["startRowIndex"] == 6
+        assert request["range"]["endRowIndex"] == 9
+        assert request["fields"] == "userEnteredValue,userEnteredFormat"
+        assert request["rows"][2]["values"][0] == {"userEnteredValue": {"stringValue": "Tyrion"}}
+        assert table.add_many([]) == []
+        assert len(table.batches) == 1
+        table.commit()
+        assert len(table.batches) == 0
+
+    def test_add_many_items_attributes(self, full_table):
+        new_item = full_table.add_many([{"name": "John", "surname": "Snow", "age": 2}])[0]
+        assert new_item.get_field_note("name") == ""
+        request = full_table.batches[0]["updateCells"]
+        assert request["fields"] == "userEnteredValue,userEnteredFormat,note"
+        cell = request["rows"][0]["values"][2]
+        assert cell["userEnteredValue"] == {"numberValue": 2}
+        assert cell["note"] == ""
+        assert cell["userEnteredFormat"]["backgroundColor"] == {"red": 1.0, "green": 1.0, "blue": 1.0}
+        assert cell["userEnteredFormat"]["textFormat"]["foregroundColor"] == {"red": 0.0, "green": 0.0, "blue": 0.0}
+
+    def test_add_many_columnar(self, columnar_table):
+        columnar_table.add_many([{"name": "John", "age": 2}, {"name": "Ned", "age": 3}])
+        assert len(columnar_table.items) == 7
+        assert columnar_table.column("age")[-2:] == [2, 3]
+        assert columnar_table[6].get_field_value("name") == "Ned"
+        assert len(columnar_table.batches) == 1
+
+    def test_add_many_extends_grid(self, spreadsheet):
+        sheet = spreadsheet.open_by_id('whatever').get_sheet_by_name('Sheet1')
+        table = Table(
+            sheet.get_range_from_a1('A998:B1000'),
+            data={'values': [['name', 'age'], ['arya', 18], ['jon', 20]]}
+        )
+        table.add_many([{"name": "ned", "age": 40}, {"name": "sansa", "age": 20}])
+        assert table.full_range.a1 == "Sheet1!A998:B1002"
+        assert table.batches[0] == {
+            "appendDimension": {"sheetId": 0, "dimension": "ROWS", "length": 2}
+        }
+        assert table.batches[1]["updateCells"]["range"]["endRowIndex"] == 1002
+        assert sheet.get_max_rows() == 1002
+        table.add_many([{"name": "bran", "age": 10}])
+        assert table.batches[2]["appendDimension"]["length"] == 1
+        assert sheet.get_max_rows() == 1003
+
     def test_sort_table(self, table):
         assert len(table.items) == 5
         table.sort("name")
         assert len(table.items) == 5
-        assert len(table.batches) == 1
+        # john and random keep their rows, only the rows that changed are written
+        assert len(table.batches) == 2
+        assert table.batches[0]["updateCells"]["range"]["startRowIndex"] == 1
+        assert table.batches[0]["updateCells"]["range"]["endRowIndex"] == 2
+        assert table.batches[1]["updateCells"]["range"]["startRowIndex"] == 3
+        assert table.batches[1]["updateCells"]["range"]["endRowIndex"] == 5
         assert table.items[0].get_field_value("name") == "jane"
         assert table.items[0].row_index == 0
         assert table.items[4].get_field_value("name") == "random"
@@ -185,10 +251,9 @@ class TestTableCRUD:
         assert table.batches[0]["updateCells"]["range"]["endRowIndex"] == 6
         assert table.batches[0]["updateCells"]["range"]["startColumnIndex"] == 0
         assert table.batches[0]["updateCells"]["range"]["endColumnIndex"] == 3
-        assert len(table.batches[0]["updateCells"]["rows"]) == 5
-        for row in table.batches[0]["updateCells"]["rows"]:
-            for value in row["values"]:
-                assert value["userEnteredValue"]["stringValue"] == ""
+        # the range is cleared without sending any cell
+        assert "rows" not in table.batches[0]["updateCells"]
+        assert table.batches[0]["updateCells"]["fields"] == "userEnteredValue,userEnteredFormat"
 
     def test_delete_and_add(self, table):
         table.add_one({"name": "John", "surname": "Snpw", "age": 2})
@@ -209,11 +274,12 @@ class TestTableCRUD:
         table.add_one({"name": "John", "surname": "Snow", "age": 2})
         table.sort("age")
         assert len(table.items) == 6
-        assert len(table.batches) == 2
+        # john, jane, mike and random keep their rows
+        assert len(table.batches) == 3
         table.delete_all()
         table.sort("name")
         assert len(table.items) == 0
-        assert len(table.batches) == 3
+        assert len(table.batches) == 4
         table.add_one({"name": "John", "surname": "Snow", "age": 2})
         table.sort("name")
         assert len(table.items) == 1
@@ -221,6 +287,37 @@ class TestTableCRUD:
         assert table.items_range.a1 == "Sheet1!A2:C2"
         assert table.full_range.a1 == "Sheet1!A1:C2"
 
+    def test_sort_unchanged_table(self, table):
+        table.sort("surname")
+        table.batches = list()
+        # sorting again does not move any item
+        table.sort("surname")
+        assert len(table.batches) == 0
+
+    def test_delete_rows_batches(self, table):
+        table.delete([0, 2, 3])
+        assert len(table.batches) == 2
+        # john and random move up, the freed rows are cleared
+        update, clear = [batch["updateCells"] for batch in table.batches]
+        assert update["range"]["startRowIndex"] == 1
+        assert update["range"]["endRowIndex"] == 3
+        assert [row["values"][0]["userEnteredValue"]["stringValue"] for row in update["rows"]] == ["john", "random"]
+        assert clear["range"]["startRowIndex"] == 3
+        assert clear["range"]["endRowIndex"] == 6
+        assert clear["range"]["startColumnIndex"] == 0
+        assert clear["range"]["endColumnIndex"] == 3
+        assert "rows" not in clear
+        # the cells below the table are not shifted
+        assert not any("deleteRange" in batch for batch in table.batches)
+        assert table.items_range.a1 == "Sheet1!A2:C3"
+        assert [item.get_field_value("name") for item in table.items] == ["john", "random"]
+
+    def test_delete_last_rows(self, table):
+        table.delete([3, 4])
+        assert len(table.batches) == 1
+        assert table.batches[0]["updateCells"]["range"]["startRowIndex"] == 4
+        assert table.batches[0]["updateCells"]["range"]["endRowIndex"] == 6
+
     def test_delete_indexes(self, table):
         assert table.items[0].get_field_value("name") == "philippe"
         table.add_one({"name": "John", "surname": "Snow", "age": 2})
@@ -272,6 +369,133 @@ class TestTableCRUD:
         assert len(table.items) == 5
 
 
+class TestHeaderIndex:
+
+    def test_header_index(self, table):
+        assert table.header_index == {'name': 0, 'surname': 1, 'age': 2}
+        assert table[0].header_index is table.header_index
+        assert table[0].get_index('age') == 2
+
+    def test_unknown_field(self, table):
+        with pytest.raises(ValueError):
+            table[0].get_field_value('unknown')
+
+    def test_header_change_invalidates_index(self, table):
+        first_index = table.header_index
+        table.header = ['first_name', 'last_name', 'age']
+        assert table.header_index is not first_index
+        assert table[0].get_field_value('first_name') == 'philippe'
+        assert table[0].to_dict() == {'first_name': 'philippe', 'last_name': 'oger', 'age': 37}
+
+    def test_column(self, table, columnar_table):
+        assert table.column('name') == ['philippe', 'john', 'jane', 'mike', 'random']
+        assert columnar_table.column('name') == table.column('name')
+
+    def test_to_records(self, table, columnar_table):
+        records = table.to_records()
+        assert len(records) == 5
+        assert records[0] == {'name': 'philippe', 'surname': 'oger', 'age': 37}
+        assert records == [item.to_dict() for item in table]
+        assert columnar_table.to_records() == records
+
+
+class TestColumnarTable:
+
+    def test_same_items_as_row_table(self, columnar_table, full_table):
+        assert len(columnar_table) == len(full_table)
+        for item, expected_item in zip(columnar_table, full_table):
+            assert item.values == expected_item.values
+            assert item.notes == expected_item.notes
+            assert item.backgrounds == expected_item.backgrounds
+            assert item.font_colors == expected_item.font_colors
+
+    def test_items_are_views(self, columnar_table):
+        item = columnar_table[0]
+        assert not hasattr(item, '__dict__')
+        item.set_field_value('name', 'phil')
+        item.set_field_note('name', 'a note')
+        assert columnar_table.store.get('values', 0, 0) == 'phil'
+        assert columnar_table[0].get_field_note('name') == 'a note'
+        assert len(columnar_table.batches) == 2
+
+    def test_sort(self, columnar_table):
+        first_item = columnar_table[0]
+        columnar_table.sort('name')
+        assert [item.get_field_value('name') for item in columnar_table] == [
+            'jane', 'john', 'mike', 'philippe', 'random']
+        assert first_item.row_index == 3
+        assert first_item.get_field_value('name') == 'philippe'
+        columnar_table.sort('name', reverse=True)
+        assert columnar_table[0].get_field_value('name') == 'random'
+
+    def test_add_and_delete(self, columnar_table):
+        new_item = columnar_table.add_one({'name': 'Ned', 'surname': 'Stark', 'age': 3})
+        assert new_item.to_dict() == {'name': 'Ned', 'surname': 'Stark', 'age': 3}
+        assert new_item.get_field_note('name') == ''
+        columnar_table.delete([0, 2])
+        assert len(columnar_table) == 4
+        assert len(columnar_table.store) == 4
+        assert columnar_table[0].get_field_value('name') == 'john'
+        assert new_item.get_field_value('surname') == 'Stark'
+        columnar_table.delete_all()
+        columnar_table.add_one({'name': 'Arya'})
+        assert columnar_table[0].to_dict() == {'name': 'Arya', 'surname': None, 'age': None}
+
+    def test_deleted_items_keep_their_data(self, columnar_table, full_table):
+        philippe, john, jane = columnar_table[0], columnar_table[1], columnar_table[2]
+        columnar_table.delete([0])
+        assert philippe.get_field_value('name') == 'philippe'
+        assert philippe.notes == full_table[0].notes
+        assert philippe.backgrounds == full_table[0].backgrounds
+        columnar_table.delete_all()
+        assert john.to_dict() == full_table[1].to_dict()
+        assert jane.font_colors == full_table[2].font_colors
+
+
+class TestTableSingleRequest:
+    http_mocks = mock_google_sheets_responses([
+        'table_get_sheets.json',
+        'table_single_request.json',
+        'table_get_sheets.json',
+        'table_check_data_range.json',
+        'table_values.json',
+        'table_values.json',
+        'table_notes.json',
+        'table_backgrounds.json',
+        'table_font_colors.json'
+    ])
+    sa = SpreadsheetApp(http=http_mocks)
+    table = Table.get_table_from_sheet(
+        spreadsheet=sa.open_by_id('whatever'),
+        sheet_name='Sheet1',
+        notes=True,
+        backgrounds=True,
+        font_colors=True,
+        single_request=True
+    )
+    multi_request_table = Table(
+        full_range=sa.open_by_id('whatever').get_sheet_by_name('Sheet1').get_data_range(),
+        notes=True,
+        backgrounds=True,
+        font_colors=True
+    )
+
+    def test_trimmed_ranges(self):
+        assert self.table.full_range.a1 == 'Sheet1!A1:C6'
+        assert self.table.items_range.a1 == 'Sheet1!A2:C6'
+
+    def test_header(self):
+        assert self.table.header == ['name', 'surname', 'age']
+
+    def test_same_items_as_multiple_requests(self):
+        assert len(self.table) == len(self.multi_request_table)
+        for item, expected_item in zip(self.table, self.multi_request_table):
+            assert item.values == expected_item.values
+            assert item.notes == expected_item.notes
+            assert item.backgrounds == expected_item.backgrounds
+            assert item.font_colors == expected_item.font_colors
+
+
 class TestTableSelector:
 
     def test_or_clause(self, table):
@@ -347,3 +571,198 @@ class TestTableDatetimeField:
 
         for batch in self.table.batches:
             assert batch["updateCells"]["rows"][0]["values"][0]["userEnteredFormat"]["numberFormat"]["type"] == "DATE_TIME"
+
+
+class TestTableIndexes:
+
+    def test_create_index(self, table):
+        index = table.create_index('name')
+        assert table.indexes['name'] is index
+        assert index.lookup('jane') == {table[2]}
+        with pytest.raises(ValueError):
+            table.create_index('unknown')
+        with pytest.raises(ValueError):
+            table.create_index('name', kind='btree')
+
+    @pytest.mark.parametrize('kind', ['hash', 'sorted'])
+    def test_indexed_select_matches_scan(self, table, kind):
+        criteria_list = [
+            [[{"name": "jane"}, {"name": "john"}]],
+            [{"age": 25}, [{"name": "john"}]],
+            [{"name": 'philippe'}, {"surname": 'oger'}],
+            {"name": 'jane', "age": 25},
+            [{"age": 25}, [{"name": "phillipe"}]],
+        ]
+        expected = [table.select(criteria) for criteria in criteria_list]
+        table.create_index('name', kind=kind)
+        table.create_index('age', kind=kind)
+        for criteria, expected_items in zip(criteria_list, expected):
+            assert table.select(criteria) == expected_items
+
+    @pytest.mark.parametrize('kind', ['hash', 'sorted'])
+    def test_index_is_maintained(self, table, kind):
+        table.create_index('name', kind=kind)
+        jane = table[2]
+        new_item = table.add_one({"name": "jane", "surname": "Stark", "age": 3})
+        assert table.select({"name": "jane"}) == [jane, new_item]
+
+        table.sort("age")
+        assert table.select({"name": "jane"}) == [new_item, jane]
+
+        new_item.set_field_value("name", "arya")
+        assert table.select({"name": "arya"}) == [new_item]
+        assert table.select({"name": "jane"}) == [jane]
+
+        table.delete_items(new_item)
+        assert table.select({"name": "arya"}) == []
+
+        table.delete_all()
+        assert table.select({"name": "jane"}) == []
+        jane = table.add_one({"name": "jane"})
+        assert table.select({"name": "jane"}) == [jane]
+
+    def test_value_error_exception(self, table):
+        table.create_index('name')
+        with pytest.raises(ValueError):
+            table.select([[25, 35]])
+
+
+class TestTableIterItems:
+
+    def make_sheet(self, chunks):
+        http_mocks = mock_google_sheets_responses(['table_get_sheets.json', 'table_single_request.json'] + chunks)
+        return http_mocks, SpreadsheetApp(http=http_mocks).open_by_id('whatever').get_sheet_by_name('Sheet1')
+
+    def test_iter_items(self):
+        http_mocks, sheet = self.make_sheet(
+            ['table_chunk_1.json', 'table_chunk_2.json', 'table_chunk_3.json', 'table_empty_chunk.json'])
+        items = list(Table.iter_items(sheet.get_range_from_a1('A1:C9'), chunk_rows=2))
+        assert [item.get_field_value('name') for item in items] == ['philippe', 'john', 'jane', 'mike', 'random']
+        assert len(http_mocks.request_sequence) == 7
+        assert items[0].header == ['name', 'surname', 'age']
+        assert items[4].get_range().a1 == 'Sheet1!A6:C6'
+        # every chunk has its own table, holding the items of the chunk
+        assert [item.row_index for item in items] == [0, 1, 0, 1, 0]
+        assert items[0].table is items[1].table
+        assert items[1].table is not items[2].table
+        for item in items:
+            assert item.table.items[item.row_index] is item
+
+    def test_iter_items_with_blank_rows(self):
+        _, sheet = self.make_sheet(
+            ['table_chunk_1.json', 'table_empty_chunk.json', 'table_chunk_2.json', 'table_chunk_3.json'])
+        items = list(Table.iter_items(sheet.get_range_from_a1('A1:C9'), chunk_rows=2))
+        # a blank chunk does not end the table
+        assert [item.get_field_value('name') for item in items] == [
+            'philippe', 'john', '', '', 'jane', 'mike', 'random']
+        assert items[6].get_range().a1 == 'Sheet1!A8:C8'
+
+    def test_iter_items_max_empty_rows(self):
+        http_mocks, sheet = self.make_sheet(
+            ['table_chunk_1.json', 'table_chunk_2.json', 'table_chunk_3.json', 'table_empty_chunk.json'])
+        items = list(Table.iter_items(sheet.get_full_range(), chunk_rows=2, max_empty_rows=2))
+        assert len(items) == 5
+        assert len(http_mocks.request_sequence) == 7
+
+    def test_items_changes_are_batched(self):
+        http_mocks = mock_google_sheets_responses([
+            'table_get_sheets.json',
+            'table_single_request.json',
+            'table_chunk_1.json',
+        ])
+        sheet = SpreadsheetApp(http=http_mocks).open_by_id('whatever').get_sheet_by_name('Sheet1')
+        item = next(Table.iter_items(sheet.get_full_range(), chunk_rows=2))
+        item.set_field_value('age', 38)
+        assert len(item.table.batches) == 1
+        assert item.table.batches[0]['updateCells']['range']['startRowIndex'] == 1
+
+
+class TestTableRefresh:
+
+    values = [
+        ['name', 'surname', 'age'],
+        ['philippe', 'oger', 37],
+        ['john', 'doe', 25],
+        ['jane', 'doe', 25],
+        ['mike', 'peter', 30],
+        ['random', 'name', 30],
+    ]
+
+    def make_table(self, fixtures, columnar=False, **client_options):
+        http_mocks = mock_google_sheets_responses(['table_get_sheets.json'] + fixtures)
+        sa = SpreadsheetApp(http=http_mocks, **client_options)
+        full_range = sa.open_by_id('whatever').get_sheet_by_name('Sheet1').get_range_from_a1('A1:C6')
+        table = Table(full_range, columnar=columnar, data={'values': [list(row) for row in self.values]})
+        return http_mocks, table
+
+    def test_refresh_patches_items(self):
+        for columnar in (False, True):
+            http_mocks, table = self.make_table(['table_refresh.json'], columnar=columnar)
+            table.create_index('age')
+            philippe, john, jane, mike, random = table.items
+            assert table.refresh() is True
+            # open ended range, read with the grid properties of the sheet
+            assert "ranges=Sheet1%21A1%3AC&" in http_mocks.request_sequence[-1][0]
+            assert "gridProperties" in http_mocks.request_sequence[-1][0]
+            assert table.items[:4] == [philippe, john, mike, random]
+            assert [item.row_index for item in table.items] == [0, 1, 2, 3, 4]
+            assert john.get_field_value('age') == 26
+            assert table.items[4].to_dict() == {'name': 'arya', 'surname': 'stark', 'age': 18}
+            assert table.items[4].get_range().a1 == 'Sheet1!A6:C6'
+            assert jane not in table.items
+            assert jane.to_dict() == {'name': 'jane', 'surname': 'doe', 'age': 25}
+            assert table.select({'age': 26}) == [john]
+            assert table.select({'age': 25}) == []
+            assert table.full_range.a1 == 'Sheet1!A1:C6'
+
+    def test_refresh_bypasses_cache_and_fast_values(self):
+        http_mocks, table = self.make_table(
+            ['table_refresh.json', 'table_refresh.json'], cache=RangeCache(), fast_values=True)
+        assert table.refresh() is True
+        # a second refresh reads the sheet again instead of the cached read
+        assert table.refresh() is True
+        assert len(http_mocks.request_sequence) == 4
+        for uri, _, _, _ in http_mocks.request_sequence[2:]:
+            assert 'includeGridData=true' in uri
+        assert [item.get_field_value('age') for item in table.items] == [37, 26, 30, 30, 18]
+
+    def test_refresh_reads_added_rows(self):
+        http_mocks, table = self.make_table(['table_refresh.json'])
+        sheet = table.full_range.sheet
+        # the sheet grew since it was opened
+        sheet.grid_properties = {'rowCount': 4, 'columnCount': 26}
+        assert table.refresh() is True
+        assert sheet.get_max_rows() == 1000
+        assert len(table) == 5
+        assert table.items[4].get_field_value('name') == 'arya'
+
+    def test_match_repeated_rows(self):
+        _, table = self.make_table([])
+        table.items[2].values = ['john', 'doe', 25]
+        philippe, john, other_john, mike, random = table.items
+        matched_items, removed_items = table._match_items([
+            ['philippe', 'oger', 37],
+            ['john', 'doe', 25],
+            ['', '', ''],
+            ['john', 'doe', 25],
+            ['mike', 'peter', 31],
+            ['random', 'name', 30],
+        ])
+        # equal rows are matched in order, the changed row of mike between
+        # the matched rows around it
+        assert matched_items == [philippe, john, None, other_john, mike, random]
+        assert removed_items == []
+
+    def test_refresh_with_pending_changes(self):
+        _, table = self.make_table([])
+        table.items[0].set_field_value('age', 38)
+        with pytest.raises(ValueError):
+            table.refresh()
+
+    def test_refresh_only_changed_version(self):
+        http_mocks, table = self.make_table(['table_refresh.json'])
+        table.full_range.client.drive_service = FakeDriveService(['7', '7'])
+        assert table.refresh(check_version=True) is True
+        assert table.version == '7'
+        assert table.refresh(check_version=True) is False
+        assert len(http_mocks.request_sequence) == 3
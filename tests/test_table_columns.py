@@ -0,0 +1,84 @@
+from array import array
+
+from sheetfu.modules.table_columns import ColumnStore, ValueColumn, ColorColumn
+
+
+class TestValueColumn:
+
+    def test_integer_column(self):
+        column = ValueColumn([1, 2, 3])
+        assert isinstance(column.data, array)
+        assert column.data.typecode == 'q'
+        assert column[1] == 2
+        assert type(column[1]) is int
+
+    def test_float_column(self):
+        column = ValueColumn([1.5, 2.0])
+        assert column.data.typecode == 'd'
+        assert column[0] == 1.5
+
+    def test_mixed_column(self):
+        column = ValueColumn(['a', 1, True])
+        assert type(column.data) is list
+        assert column.to_list() == ['a', 1, True]
+
+    def test_falls_back_to_list(self):
+        column = ValueColumn([1, 2, 3])
+        column[1] = 'two'
+        column.append(4.5)
+        assert type(column.data) is list
+        assert column.to_list() == [1, 'two', 3, 4.5]
+
+    def test_bool_is_not_integer(self):
+        column = ValueColumn([1, 2])
+        column[0] = True
+        assert column[0] is True
+
+
+class TestColorColumn:
+
+    def test_packed_colors(self):
+        column = ColorColumn(['#ff0000', '', '#00ff00'])
+        assert column.data.typecode == 'i'
+        assert column.to_list() == ['#ff0000', '', '#00ff00']
+
+    def test_falls_back_to_list(self):
+        column = ColorColumn(['#ff0000'])
+        column.append(None)
+        assert column.to_list() == ['#ff0000', None]
+
+
+class TestColumnStore:
+
+    def get_store(self):
+        return ColumnStore(
+            number_of_columns=2,
+            values=[['john', 30], ['jane', 25], ['mike', 40]],
+            backgrounds=[['', '#ff0000'], ['', ''], ['#00ff00', '']]
+        )
+
+    def test_rows(self):
+        store = self.get_store()
+        assert len(store) == 3
+        assert store.get_row('values', 1) == ['jane', 25]
+        assert store.get_row('backgrounds', 2) == ['#00ff00', '']
+        assert store.get_row('notes', 0) is None
+        assert store.get_column('values', 1) == [30, 25, 40]
+
+    def test_set(self):
+        store = self.get_store()
+        store.set('values', 0, 1, 31)
+        store.set_row('backgrounds', 1, ['#0000ff', '#0000ff'])
+        assert store.get('values', 0, 1) == 31
+        assert store.get_row('backgrounds', 1) == ['#0000ff', '#0000ff']
+
+    def test_append_delete_reorder(self):
+        store = self.get_store()
+        store.append(['ned', 50])
+        assert len(store) == 4
+        assert store.get_row('backgrounds', 3) == ['', '']
+        store.delete([0, 2])
+        assert store.get_column('values', 0) == ['jane', 'ned']
+        store.reorder([1, 0])
+        assert store.get_column('values', 0) == ['ned', 'jane']
+        assert store.get_column('values', 1) == [50, 25]
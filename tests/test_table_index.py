@@ -0,0 +1,64 @@
+import datetime
+
+import pytest
+
+from sheetfu.modules.table import Item
+from sheetfu.modules.table_index import HashIndex, SortedIndex
+
+
+def make_items(values):
+    return [Item(row_index=i, header=['field'], values=[value]) for i, value in enumerate(values)]
+
+
+class TestHashIndex:
+
+    def test_lookup(self):
+        items = make_items(['a', 'b', 'a', None])
+        index = HashIndex('field', items)
+        assert index.lookup('a') == {items[0], items[2]}
+        assert index.lookup(None) == {items[3]}
+        assert index.lookup('c') == set()
+
+    def test_update(self):
+        items = make_items(['a', 'b'])
+        index = HashIndex('field', items)
+        index.update(items[0], 'a', 'b')
+        assert index.lookup('a') == set()
+        assert index.lookup('b') == set(items)
+        index.remove(items[1])
+        assert len(index) == 1
+
+
+class TestSortedIndex:
+
+    def test_lookup(self):
+        items = make_items([3, 'x', 1, 3.0, None])
+        index = SortedIndex('field', items)
+        assert index.lookup(3) == {items[0], items[3]}
+        assert index.lookup('x') == {items[1]}
+        assert index.lookup(None) == {items[4]}
+
+    def test_lookup_range(self):
+        items = make_items([5, 1, 3, 'a', 7, 9])
+        index = SortedIndex('field', items)
+        assert index.lookup_range(3, 7) == {items[0], items[2], items[4]}
+        assert index.lookup_range(3, 7, include_lower=False, include_upper=False) == {items[0]}
+        assert index.lookup_range(lower=6) == {items[4], items[5]}
+        assert index.lookup_range(upper=3) == {items[1], items[2]}
+        with pytest.raises(ValueError):
+            index.lookup_range()
+
+    def test_dates_range(self):
+        items = make_items([datetime.datetime(2021, 1, day) for day in range(1, 5)])
+        index = SortedIndex('field', items)
+        assert index.lookup_range(lower=datetime.datetime(2021, 1, 3)) == {items[2], items[3]}
+
+    def test_add_remove(self):
+        items = make_items([2, 1])
+        index = SortedIndex('field', items)
+        new_items = make_items([1])
+        index.add(new_items[0])
+        assert index.lookup(1) == {items[1], new_items[0]}
+        index.remove(items[1])
+        assert index.lookup(1) == {new_items[0]}
+        assert index.items[0] is new_items[0]
@@ -0,0 +1,127 @@
+import datetime
+
+import pytest
+
+from sheetfu import SpreadsheetApp, Table
+from sheetfu.exceptions import SnapshotFormatError
+from sheetfu.modules.table_snapshot import encode_column, decode_column, read_snapshot
+from tests.utils import mock_google_sheets_responses
+
+
+class TestSnapshotColumns:
+
+    def test_typed_columns(self):
+        dates = [datetime.datetime(2019, 1, 2, 3, 4, 5, 6), datetime.datetime(1899, 12, 30)]
+        for cells, expected_encoding in (
+                ([1, 2, -3], 'int64'),
+                ([1.5, 2.0], 'float64'),
+                (dates, 'datetime64'),
+                (['a', 1, None, True, dates[0]], 'json'),
+                ([2 ** 70], 'json'),
+                ([], 'json'),
+        ):
+            encoding, block = encode_column(cells)
+            assert encoding == expected_encoding
+            assert decode_column(encoding, block) == cells
+
+    def test_json_datetimes(self):
+        cells = [
+            datetime.datetime(2019, 1, 2, 3, 4, 5, 6),
+            datetime.datetime(2019, 1, 2, tzinfo=datetime.timezone(datetime.timedelta(hours=2))),
+            'a',
+        ]
+        encoding, block = encode_column(cells)
+        assert encoding == 'json'
+        decoded = decode_column(encoding, block)
+        assert decoded == cells
+        assert decoded[1].utcoffset() == datetime.timedelta(hours=2)
+
+    def test_arrays_are_raw(self):
+        encoding, block = encode_column([1, 2, 3])
+        assert len(block) == 3 * 8
+
+
+class TestTableSnapshot:
+
+    values = [
+        ['name', 'age', 'height', 'birthday'],
+        ['philippe', 37, 1.8, datetime.datetime(1981, 5, 2)],
+        ['john', 25, 1.75, datetime.datetime(1993, 1, 12)],
+        ['jane', 25, '', datetime.datetime(1993, 7, 30, 12, 30)],
+    ]
+    notes = [
+        ['', '', '', ''],
+        ['a note', '', '', ''],
+        ['', '', '', 'another note'],
+        ['', '', '', ''],
+    ]
+
+    def make_table(self, columnar=False):
+        http_mocks = mock_google_sheets_responses(['table_get_sheets.json'])
+        sheet = SpreadsheetApp(http=http_mocks).open_by_id('whatever').get_sheet_by_name('Sheet1')
+        return Table(
+            sheet.get_range_from_a1('B2:E5'),
+            notes=True,
+            columnar=columnar,
+            data={'values': [list(row) for row in self.values], 'notes': [list(row) for row in self.notes]}
+        )
+
+    def test_save_and_load(self, tmpdir):
+        for columnar in (False, True):
+            table = self.make_table(columnar=columnar)
+            table.version = '12'
+            path = str(tmpdir.join('table.snapshot'))
+            table.save_snapshot(path)
+
+            http_mocks = mock_google_sheets_responses()
+            loaded_table = Table.load_snapshot(path, SpreadsheetApp(http=http_mocks))
+            # only the discovery document was requested
+            assert len(http_mocks.request_sequence) == 1
+            assert loaded_table.header == table.header
+            assert loaded_table.to_records() == table.to_records()
+            assert loaded_table[1].get_field_note('birthday') == 'another note'
+            assert loaded_table.columnar is columnar
+            assert loaded_table.version == '12'
+            assert loaded_table.full_range.a1 == 'Sheet1!B2:E5'
+            assert loaded_table.full_range.sheet.sid == 0
+            assert loaded_table[2].get_range().a1 == 'Sheet1!B5:E5'
+
+    def test_snapshot_encodings(self, tmpdir):
+        path = str(tmpdir.join('table.snapshot'))
+        self.make_table().save_snapshot(path)
+        metadata, columns = read_snapshot(path)
+        assert metadata['header'] == self.values[0]
+        assert columns['values'][1] == [37, 25, 25]
+        assert columns['values'][3][2] == datetime.datetime(1993, 7, 30, 12, 30)
+        assert 'backgrounds' not in columns
+
+    def test_pending_changes_not_saved(self, tmpdir):
+        table = self.make_table()
+        table[0].set_field_value('age', 38)
+        with pytest.raises(ValueError):
+            table.save_snapshot(str(tmpdir.join('table.snapshot')))
+
+    def test_invalid_file(self, tmpdir):
+        path = tmpdir.join('table.snapshot')
+        path.write('not a snapshot')
+        with pytest.raises(SnapshotFormatError):
+            Table.load_snapshot(str(path), SpreadsheetApp(http=mock_google_sheets_responses()))
+
+    def test_truncated_file(self, tmpdir):
+        path = str(tmpdir.join('table.snapshot'))
+        self.make_table().save_snapshot(path)
+        with open(path, 'rb') as snapshot_file:
+            content = snapshot_file.read()
+        for length in (10, 20, len(content) - 8):
+            with open(path, 'wb') as snapshot_file:
+                snapshot_file.write(content[:length])
+            with pytest.raises(SnapshotFormatError):
+                read_snapshot(path)
+
+    def test_datetime_header(self, tmpdir):
+        table = self.make_table()
+        table.header = ['name', 'age', 'height', datetime.datetime(2020, 1, 1)]
+        path = str(tmpdir.join('table.snapshot'))
+        table.save_snapshot(path)
+        loaded_table = Table.load_snapshot(path, SpreadsheetApp(http=mock_google_sheets_responses()))
+        assert loaded_table.header[3] == datetime.datetime(2020, 1, 1)
@@ -24,6 +24,27 @@ def mock_google_sheets_responses(fixture_files=None):
     return http_mocks
 
 
+class FakeDriveService:
+    """
+    Drive service replying to the version requests (see
+    Spreadsheet.get_version) with the given versions, in order.
+    """
+
+    def __init__(self, versions):
+        self.versions = list(versions)
+        self.requests = list()
+
+    def files(self):
+        return self
+
+    def get(self, fileId, fields):
+        self.requests.append((fileId, fields))
+        return self
+
+    def execute(self):
+        return {'version': self.versions.pop(0)}
+
+
 def mock_spreadsheet_instance(fixtures=None):
     if fixtures is None:
         fixtures = []